@@ -0,0 +1,187 @@
+import os
+import hashlib
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from .media_probe import probe_media
+from .audio_extractor import EXTRACTED_FROM_PREFIX
+from .output_writer import atomic_move, get_background_copy_bytes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "archive-manifest.sha256"
+ARCHIVE_FORMATS = {
+    'flac': ('.flac', ["-acodec", "flac", "-compression_level", "8"]),
+    'opus': ('.opus', ["-acodec", "libopus", "-application", "voip"]),
+}
+# Lossless sources worth transcoding, compressed formats are archived as they are
+TRANSCODE_EXTENSIONS = frozenset({'.wav'})
+
+_manifest_lock = threading.Lock()
+_background_executor = None
+_background_jobs = []
+
+
+def get_archive_config(config):
+    """
+    Return the output_structure.archive section of the config with defaults filled in.
+    """
+    output_config = config.get('output_structure', {}) or {}
+    archive_config = output_config.get('archive', {}) or {}
+    audio_format = str(archive_config.get('audio_format', 'keep')).lower()
+    if audio_format not in ARCHIVE_FORMATS:
+        audio_format = 'keep'
+    return {
+        'base_folder': output_config.get('base_folder', 'output'),
+        'audio_format': audio_format,
+        'opus_bitrate': str(archive_config.get('opus_bitrate', '24k')),
+        'drop_extracted_audio': str(archive_config.get('drop_extracted_audio', False)).lower() == "true",
+        'background': str(archive_config.get('background', False)).lower() == "true",
+        'manifest': str(archive_config.get('manifest', False)).lower() == "true",
+    }
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def add_to_manifest(path, archive_config):
+    """
+    Append an archived file's checksum to the manifest in the base folder, in sha256sum's
+    format so the archive can be verified with `sha256sum -c archive-manifest.sha256`.
+    """
+    if not archive_config['manifest']:
+        return
+    base_folder = archive_config['base_folder']
+    checksum = sha256_file(path)
+    relative_path = os.path.relpath(path, base_folder).replace(os.sep, "/")
+    with _manifest_lock:
+        os.makedirs(base_folder, exist_ok=True)
+        with open(os.path.join(base_folder, MANIFEST_FILENAME), "a", encoding="utf-8") as manifest:
+            manifest.write(f"{checksum}  {relative_path}\n")
+
+
+def is_extracted_audio(path):
+    """
+    True for WAV files extract_audio made from a video, which still holds the same audio.
+    """
+    info = probe_media(path)
+    return info is not None and (info.comment or "").startswith(EXTRACTED_FROM_PREFIX)
+
+
+def low_priority_command(command):
+    """
+    Prefix a command with nice (and ionice's idle class where available) so it runs at the lowest
+    CPU and IO priority. Done in the command itself rather than in a preexec_fn, which isn't safe
+    to run between fork and exec in a process that has threads.
+    """
+    prefix = []
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c", "3"]
+    if shutil.which("nice"):
+        prefix += ["nice", "-n", "19"]
+    return prefix + command
+
+
+def transcode_for_archive(source_path, destination_path, archive_config, low_priority=False):
+    """
+    Transcode an audio file into the archive format next to destination_path and remove the source.
+    Returns the archived path. If ffmpeg fails the source is archived unchanged instead.
+    """
+    extension, codec_args = ARCHIVE_FORMATS[archive_config['audio_format']]
+    archived_path = os.path.splitext(destination_path)[0] + extension
+    if archive_config['audio_format'] == 'opus':
+        codec_args = codec_args + ["-b:a", archive_config['opus_bitrate']]
+    partial_path = os.path.join(os.path.dirname(archived_path), f".{os.path.basename(archived_path)}.partial")
+    try:
+        command = ["ffmpeg", "-nostdin", "-y", "-i", source_path, *codec_args, "-f", extension[1:], partial_path]
+        subprocess.run(low_priority_command(command) if low_priority else command, check=True, capture_output=True, text=True)
+        os.replace(partial_path, archived_path)
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.warning(f"Could not transcode {source_path} for the archive, keeping it as is: {str(e)}")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        if os.path.abspath(source_path) != os.path.abspath(destination_path):
+            atomic_move(source_path, destination_path)
+        return destination_path
+    saved_mb = (os.path.getsize(source_path) - os.path.getsize(archived_path)) / (1024 * 1024)
+    os.remove(source_path)
+    print(f"Archived as {archive_config['audio_format'].upper()}: {archived_path} ({saved_mb:.1f} MB saved)")
+    return archived_path
+
+
+def _transcode_in_background(path, archive_config):
+    archived_path = transcode_for_archive(path, path, archive_config, low_priority=True)
+    add_to_manifest(archived_path, archive_config)
+
+
+def archive_file(source_path, destination_path, config, on_complete=None):
+    """
+    Move a processed file into the output folder, applying the output_structure.archive policy:
+    WAV files extracted from videos can be dropped, other WAV files transcoded to FLAC or Opus
+    (in a low-priority background worker if requested), and every archived file checksummed.
+    Returns the archived path, or None if the file was dropped. on_complete is called with the
+    same once the file has left the queue, which for a background copy is after this returns.
+    """
+    def done(archived_path):
+        if on_complete:
+            on_complete(archived_path)
+        return archived_path
+
+    archive_config = get_archive_config(config)
+    extension = os.path.splitext(source_path)[1].lower()
+
+    if extension in TRANSCODE_EXTENSIONS and archive_config['drop_extracted_audio'] and is_extracted_audio(source_path):
+        os.remove(source_path)
+        print(f"Dropped extracted audio (the original video is archived): {os.path.basename(source_path)}")
+        return done(None)
+
+    if extension in TRANSCODE_EXTENSIONS and archive_config['audio_format'] != 'keep':
+        if archive_config['background']:
+            # Free up the queue straight away and transcode inside the archive afterwards
+            atomic_move(source_path, destination_path)
+            print(f"Moved file to: {destination_path} (archive transcode queued)")
+            _background_jobs.append(_get_background_executor().submit(_transcode_in_background, destination_path, archive_config))
+            return done(destination_path)
+        archived_path = transcode_for_archive(source_path, destination_path, archive_config)
+        add_to_manifest(archived_path, archive_config)
+        return done(archived_path)
+
+    def moved():
+        print(f"Moved file to: {destination_path}")
+        add_to_manifest(destination_path, archive_config)
+        done(destination_path)
+
+    if not atomic_move(source_path, destination_path, get_background_copy_bytes(config), moved):
+        print(f"Moving file to: {destination_path} (copying in the background)")
+    return destination_path
+
+
+def _get_background_executor():
+    global _background_executor
+    if _background_executor is None:
+        _background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archiver")
+    return _background_executor
+
+
+def wait_for_archive_jobs():
+    """
+    Block until queued background archive transcodes have finished.
+    """
+    pending = len(_background_jobs)
+    if pending:
+        print(f"Waiting for {pending} background archive job(s) to finish...")
+    while _background_jobs:
+        job = _background_jobs.pop(0)
+        try:
+            job.result()
+        except Exception as e:
+            logger.error(f"Background archive job failed: {str(e)}")
@@ -1,22 +1,192 @@
 import os
+import time
+import shutil
+import struct
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .media_probe import probe_media
+from .profiler import profiled
 
-def extract_audio(video_file_path, output_folder):
+# Audio codecs that can be copied out of a video untouched, and the container each is copied into
+STREAM_COPY_EXTENSIONS = {'aac': '.m4a', 'alac': '.m4a', 'mp3': '.mp3', 'flac': '.flac'}
+
+# Comment written into extracted audio so the archiver can recognise it as a copy of a video's audio
+EXTRACTED_FROM_PREFIX = "Extracted from "
+
+# ffmpeg's atempo filter takes 0.5 to 2.0 per instance, faster speeds are chained
+MAX_ATEMPO = 2.0
+
+def atempo_filter(tempo):
+    """
+    Build the ffmpeg audio filter that plays audio back at `tempo` times normal speed
+    without changing its pitch, e.g. "atempo=1.5" or "atempo=2.0,atempo=1.5" for 3x.
+    """
+    if not 0.5 <= tempo <= 4.0:
+        raise ValueError(f"Playback speed must be between 0.5 and 4.0, got {tempo}")
+    filters = []
+    while tempo > MAX_ATEMPO:
+        filters.append(f"atempo={MAX_ATEMPO}")
+        tempo /= MAX_ATEMPO
+    filters.append(f"atempo={tempo:g}")
+    return ",".join(filters)
+
+def audio_filter_args(tempo=1.0):
+    if tempo == 1.0:
+        return []
+    return ["-filter:a", atempo_filter(tempo)]
+
+def get_extraction_config(config):
+    """
+    Return the extraction section of the config with defaults filled in.
+    """
+    extraction_config = config.get('extraction', {}) or {}
+    return {
+        'parallel': str(extraction_config.get('parallel', False)).lower() == "true",
+        'max_workers': max(int(extraction_config.get('max_workers', 2)), 1),
+        'segment_minutes': float(extraction_config.get('segment_minutes', 10)),
+        'min_parallel_minutes': float(extraction_config.get('min_parallel_minutes', 30)),
+        'stream_copy': str(extraction_config.get('stream_copy', False)).lower() == "true",
+    }
+
+def run_ffmpeg(args):
+    try:
+        subprocess.run(["ffmpeg", "-nostdin", *args], check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error extracting audio: {e}")
+        print(f"ffmpeg stderr: {e.stderr}")
+        raise
+
+def report_throughput(output_path, video_file_path, duration, start_time):
+    elapsed = max(time.time() - start_time, 1e-6)
+    size_mb = os.path.getsize(video_file_path) / (1024 * 1024)
+    speed = f"{duration / elapsed:.0f}x realtime, " if duration else ""
+    print(f"Audio extracted: {output_path} ({speed}{size_mb / elapsed:.1f} MB/s of video)")
+
+def wav_info_chunk(comment):
+    """
+    A LIST/INFO chunk holding an ICMT comment, as ffmpeg writes for -metadata comment=...
+    """
+    text = comment.encode("utf-8") + b"\x00"
+    if len(text) % 2:
+        text += b"\x00"
+    info = b"INFO" + b"ICMT" + struct.pack("<I", len(text)) + text
+    return b"LIST" + struct.pack("<I", len(info)) + info
+
+def extract_audio_segmented(video_file_path, output_path, duration, tempo, extraction_config):
+    """
+    Extract audio as several time ranges decoded by parallel ffmpeg processes, then join them.
+    Each range seeks straight to its start, so the processes read different parts of the file.
+    Ranges are written as raw PCM and concatenated into the final WAV in order.
+    """
+    segment_seconds = extraction_config['segment_minutes'] * 60
+    starts = [i * segment_seconds for i in range(int(duration // segment_seconds) + 1) if i * segment_seconds < duration]
+    folder, name = os.path.split(output_path)
+    part_paths = [os.path.join(folder, f".{name}.part{index}") for index in range(len(starts))]
+
+    def extract_range(index):
+        run_ffmpeg([
+            "-ss", f"{starts[index]:.3f}",
+            "-t", f"{segment_seconds:.3f}",
+            "-i", video_file_path,
+            "-vn",
+            *audio_filter_args(tempo),
+            "-acodec", "pcm_s16le",
+            "-ac", "1",
+            "-ar", "16000",
+            "-f", "s16le",
+            part_paths[index]
+        ])
+
+    try:
+        with ThreadPoolExecutor(max_workers=extraction_config['max_workers']) as executor:
+            list(executor.map(extract_range, range(len(starts))))
+        data_size = sum(os.path.getsize(part_path) for part_path in part_paths)
+        info_chunk = wav_info_chunk(EXTRACTED_FROM_PREFIX + os.path.basename(video_file_path))
+        with open(output_path, "wb") as output:
+            # 16 kHz mono 16-bit PCM WAV header, followed by the ranges in order
+            output.write(b"RIFF" + struct.pack("<I", 36 + len(info_chunk) + data_size) + b"WAVE")
+            output.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+            output.write(info_chunk)
+            output.write(b"data" + struct.pack("<I", data_size))
+            for part_path in part_paths:
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, output, 1024 * 1024)
+    finally:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+@profiled("extract_audio")
+def extract_audio(video_file_path, output_folder, tempo=1.0, extraction_config=None):
+    """
+    Extract a video's audio as 16 kHz mono WAV for transcription.
+
+    With extraction_config, long videos can be split into time ranges extracted by up to
+    max_workers parallel ffmpeg processes, and stream_copy copies AAC/MP3/FLAC/ALAC audio out
+    without re-encoding (the transcriber converts it when it loads it).
+    """
+    extraction_config = extraction_config or {}
     file_name = os.path.splitext(os.path.basename(video_file_path))[0]
     output_path = os.path.join(output_folder, f"{file_name}.wav")
+    start_time = time.time()
+    info = probe_media(video_file_path) if extraction_config else None
+    duration = info.duration if info is not None else None
+    source_comment = EXTRACTED_FROM_PREFIX + os.path.basename(video_file_path)
 
-    try:
-        subprocess.run([
-            "ffmpeg",
+    if extraction_config.get('stream_copy') and tempo == 1.0 and info is not None and info.codec in STREAM_COPY_EXTENSIONS:
+        output_path = os.path.join(output_folder, f"{file_name}{STREAM_COPY_EXTENSIONS[info.codec]}")
+        run_ffmpeg(["-i", video_file_path, "-vn", "-acodec", "copy", "-metadata", f"comment={source_comment}", output_path])
+    elif (extraction_config.get('parallel') and extraction_config['max_workers'] > 1 and duration
+          and duration >= extraction_config['min_parallel_minutes'] * 60):
+        extract_audio_segmented(video_file_path, output_path, duration, tempo, extraction_config)
+    else:
+        run_ffmpeg([
             "-i", video_file_path,
+            "-vn",
+            *audio_filter_args(tempo),
             "-acodec", "pcm_s16le",
             "-ac", "1",
             "-ar", "16000",
+            "-metadata", f"comment={source_comment}",
             output_path
-        ], check=True, capture_output=True, text=True)
-        print(f"Audio extracted: {output_path}")
-        return output_path
+        ])
+    report_throughput(output_path, video_file_path, duration, start_time)
+    return output_path
+
+def decode_audio_at_tempo(audio_file_path, tempo, sample_rate=16000):
+    """
+    Decode a recording to the 16 kHz mono float32 array Whisper expects, played back at
+    `tempo` times normal speed. Times in the result are divided by tempo.
+    """
+    return _decode_to_samples(["-nostdin", "-i", audio_file_path], tempo, sample_rate)
+
+def decode_audio_clip(audio_file_path, seconds, sample_rate=16000):
+    """
+    Decode only the first `seconds` of a recording, e.g. as a short benchmark sample.
+    """
+    return _decode_to_samples(["-nostdin", "-t", str(seconds), "-i", audio_file_path], 1.0, sample_rate)
+
+def decode_audio_bytes(data, tempo=1.0, sample_rate=16000):
+    """
+    decode_audio_at_tempo for a recording held in memory, piped through ffmpeg without a temporary file.
+    """
+    return _decode_to_samples(["-i", "pipe:0"], tempo, sample_rate, data)
+
+def _decode_to_samples(input_args, tempo, sample_rate, input_data=None):
+    try:
+        result = subprocess.run([
+            "ffmpeg",
+            *input_args,
+            *audio_filter_args(tempo),
+            "-f", "s16le",
+            "-acodec", "pcm_s16le",
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-"
+        ], check=True, capture_output=True, input=input_data)
     except subprocess.CalledProcessError as e:
-        print(f"Error extracting audio: {e}")
-        print(f"ffmpeg stderr: {e.stderr}")
-        raise
\ No newline at end of file
+        print(f"Error decoding audio: {e}")
+        print(f"ffmpeg stderr: {e.stderr.decode(errors='replace')}")
+        raise
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
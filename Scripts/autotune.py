@@ -0,0 +1,339 @@
+import os
+import gc
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from .transcriber_utils import SAMPLE_RATE, transcribe_samples, load_transcription_model, clear_model_cache
+from .audio_extractor import decode_audio_clip
+from .queue_scanner import scan_queue
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RESULTS_FILENAME = ".autotune.json"
+ENGINES = ("faster_whisper", "whisper")
+# Approximate parameter counts, to skip settings whose model wouldn't fit in memory
+MODEL_PARAMETERS = (("turbo", 809e6), ("large", 1550e6), ("medium", 769e6), ("small", 244e6), ("base", 74e6), ("tiny", 39e6))
+BYTES_PER_PARAMETER = {
+    'float32': 4, 'float16': 2, 'bfloat16': 2, 'int16': 2,
+    'int8': 1, 'int8_float32': 1, 'int8_float16': 1, 'int8_bfloat16': 1,
+}
+# CPU compute types worth trying, in the order they're tried
+CPU_COMPUTE_TYPES = ("int8", "int8_float32", "int8_bfloat16", "bfloat16", "float32")
+WARM_UP_SECONDS = 5
+
+
+def get_autotune_config(config):
+    """
+    Return the autotune section of the config with defaults filled in. Results are kept per
+    host in .autotune.json in the queue folder, so every node sharing a queue tunes itself once.
+    """
+    autotune_config = config.get('autotune', {}) or {}
+    queue_folder = config.get('meeting_recordings_folder', '.')
+    return {
+        'enabled': str(autotune_config.get('enabled', False)).lower() == "true",
+        'sample': autotune_config.get('sample') or None,
+        'sample_seconds': max(WARM_UP_SECONDS * 2, float(autotune_config.get('sample_seconds', 30))),
+        'results_file': autotune_config.get('results_file') or os.path.join(queue_folder, RESULTS_FILENAME),
+    }
+
+
+def _read_proc(path):
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _cuda_devices():
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count()
+    except ImportError:
+        pass
+    try:
+        import torch
+        return torch.cuda.device_count()
+    except ImportError:
+        return 0
+
+
+def _supported_compute_types(device):
+    try:
+        import ctranslate2
+        return set(ctranslate2.get_supported_compute_types(device))
+    except (ImportError, RuntimeError, ValueError):
+        return None
+
+
+def detect_hardware():
+    """
+    The host's CPU model, core counts, SIMD extensions that matter for int8 and bfloat16
+    inference, memory and CUDA devices, read from /proc where available.
+    """
+    cpuinfo = _read_proc("/proc/cpuinfo")
+    flags, model, cores = set(), "unknown", set()
+    physical_id = None
+    for line in cpuinfo.splitlines():
+        name, _, value = (part.strip() for part in line.partition(":"))
+        if name == "flags" and not flags:
+            flags = set(value.split())
+        elif name == "model name" and model == "unknown":
+            model = value
+        elif name == "physical id":
+            physical_id = value
+        elif name == "core id":
+            cores.add((physical_id, value))
+    logical_cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+    meminfo = {}
+    for line in _read_proc("/proc/meminfo").splitlines():
+        name, _, value = line.partition(":")
+        if value.strip().endswith("kB"):
+            meminfo[name] = int(value.split()[0]) * 1024
+    return {
+        'host': socket.gethostname(),
+        'cpu': model,
+        'logical_cores': logical_cores,
+        'physical_cores': min(len(cores), logical_cores) if cores else logical_cores,
+        'avx2': "avx2" in flags,
+        'avx512': "avx512f" in flags,
+        'vnni': "avx512_vnni" in flags or "avx_vnni" in flags,
+        'bf16': "avx512_bf16" in flags or "amx_bf16" in flags,
+        'memory_total': meminfo.get('MemTotal'),
+        'memory_available': meminfo.get('MemAvailable'),
+        'cuda_devices': _cuda_devices(),
+    }
+
+
+def estimate_model_bytes(model_name, compute_type):
+    """
+    Rough memory a model needs with a compute type, weights plus half again for activations.
+    None for models of unknown size.
+    """
+    for name, parameters in MODEL_PARAMETERS:
+        if name in str(model_name):
+            return int(parameters * BYTES_PER_PARAMETER.get(compute_type, 4) * 1.5)
+    return None
+
+
+def search_dimensions(engine, hardware, config):
+    """
+    The settings to try for an engine on this hardware as (name, options) pairs, best guess
+    first. They are searched one at a time, so the cost grows with the sum of the options
+    rather than their product.
+    """
+    thread_options = sorted({hardware['physical_cores'], hardware['logical_cores']})
+    model_name = (config.get(engine, {}) or {}).get('model', 'base')
+    fits = lambda compute_type: (hardware['memory_available'] is None or estimate_model_bytes(model_name, compute_type) is None
+                                 or estimate_model_bytes(model_name, compute_type) < hardware['memory_available'] * 0.8)
+
+    if engine == "whisper":
+        if hardware['cuda_devices']:
+            return [('device', ["cuda"]), ('use_fp16', ["true"]), ('cpu_threads', ["auto"])]
+        return [('device', ["cpu"]), ('use_fp16', ["false"]), ('cpu_threads', thread_options)]
+
+    if hardware['cuda_devices']:
+        supported = _supported_compute_types("cuda") or {"float16", "int8_float16", "int8"}
+        compute_types = [compute_type for compute_type in ("float16", "int8_float16", "int8") if compute_type in supported and fits(compute_type)]
+        return [('device', ["cuda"]), ('compute_type', compute_types or ["auto"]), ('cpu_threads', ["auto"]), ('batch_size', ["auto", 8, 16])]
+
+    supported = _supported_compute_types("cpu")
+    if supported is None:
+        supported = {"int8", "float32"} if hardware['avx2'] else {"float32"}
+    compute_types = [compute_type for compute_type in CPU_COMPUTE_TYPES if compute_type in supported and fits(compute_type)
+                     and ("bfloat16" not in compute_type or hardware['bf16'])]
+    if not (hardware['avx2'] or hardware['vnni']):
+        # Without AVX2 int8 kernels have little to work with, start from float32
+        compute_types.sort(key=lambda compute_type: compute_type != "float32")
+    return [('device', ["cpu"]), ('compute_type', compute_types or ["auto"]), ('cpu_threads', thread_options), ('batch_size', ["auto", 8])]
+
+
+def apply_settings(config, settings, only_auto=True):
+    """
+    Return a copy of config with tuned settings for an engine. With only_auto, settings the
+    config spells out are kept and only 'auto' (or missing) ones are filled in.
+    """
+    tuned = dict(config)
+    engine = settings['engine']
+    section = dict(config.get(engine, {}) or {})
+    for name, value in settings.items():
+        if name != 'engine' and (not only_auto or str(section.get(name, "auto")).lower() == "auto"):
+            section[name] = value
+    tuned[engine] = section
+    tuned['transcription_engine'] = engine
+    return tuned
+
+
+def describe(settings):
+    return ", ".join(f"{name}={value}" for name, value in settings.items())
+
+
+def benchmark(config, settings, sample):
+    """
+    Transcribe the sample with the settings, after a short warm-up, and return how many
+    seconds of audio it transcribes per second (0 if the settings don't work here).
+    """
+    tuned = apply_settings(config, settings, only_auto=False)
+    clear_model_cache()
+    try:
+        load_transcription_model(tuned)
+        transcribe_samples(sample[:WARM_UP_SECONDS * SAMPLE_RATE], tuned)
+        start = time.perf_counter()
+        transcribe_samples(sample, tuned)
+        speed = len(sample) / SAMPLE_RATE / max(time.perf_counter() - start, 1e-6)
+    except Exception as e:
+        logger.warning(f"Could not benchmark {describe(settings)}: {str(e)}")
+        speed = 0.0
+    finally:
+        clear_model_cache()
+        gc.collect()
+    print(f"  {describe(settings)}: {speed:.1f}x realtime")
+    return speed
+
+
+def tune(config, hardware, sample, engines):
+    """
+    Find the fastest settings for each engine with a coordinate search over its dimensions
+    and return (settings, speed, every result) for the fastest overall. Settings that failed
+    to benchmark are never picked, settings is None if none of them worked.
+    """
+    results = []
+    best, best_speed = None, 0.0
+    for engine in engines:
+        dimensions = search_dimensions(engine, hardware, config)
+        current = {'engine': engine, **{name: options[0] for name, options in dimensions}}
+        measured = {}
+
+        def measure(settings):
+            key = json.dumps(settings, sort_keys=True)
+            if key not in measured:
+                measured[key] = benchmark(config, settings, sample)
+                results.append({'settings': settings, 'speed': round(measured[key], 2)})
+            return measured[key]
+
+        current_speed = measure(current)
+        for name, options in dimensions:
+            for option in options:
+                candidate = {**current, name: option}
+                speed = measure(candidate)
+                if speed > current_speed:
+                    current, current_speed = candidate, speed
+        if current_speed > best_speed:
+            best, best_speed = current, current_speed
+    return best, best_speed, results
+
+
+def find_sample(config, autotune_config):
+    """
+    The first sample_seconds of autotune.sample, or else of the first recording in the queue,
+    as 16 kHz samples. None if there is nothing to benchmark with yet.
+    """
+    if autotune_config['sample']:
+        paths = [autotune_config['sample']]
+    else:
+        plan = scan_queue(config['meeting_recordings_folder'])
+        paths = [item.path for item in plan.audio + plan.videos]
+    for path in paths:
+        try:
+            sample = decode_audio_clip(path, autotune_config['sample_seconds'], SAMPLE_RATE)
+        except (subprocess.CalledProcessError, OSError):
+            continue
+        if len(sample) >= WARM_UP_SECONDS * 2 * SAMPLE_RATE:
+            return sample
+    return None
+
+
+def _fingerprint(hardware, config, engines):
+    # Retune when the hardware, the engines compared or their models change
+    stable = {name: value for name, value in hardware.items() if name != 'memory_available'}
+    return json.dumps([stable, {engine: (config.get(engine, {}) or {}).get('model') for engine in engines}], sort_keys=True)
+
+
+def _load_results(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read autotune results {path}: {str(e)}")
+        return {}
+
+
+def _save_results(path, results):
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    os.replace(partial_path, path)
+
+
+def apply_autotune(config, retune=False):
+    """
+    Return the config with the transcription settings tuned for this host. The first run on
+    a host (or after its hardware or models change) benchmarks the candidate settings on a
+    short sample and saves the fastest; later runs reuse them. transcription_engine: "auto"
+    lets the tuner pick the engine too, and only engine settings left at 'auto' are changed.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    engines = list(ENGINES) if engine == "auto" else [engine]
+    autotune_config = get_autotune_config(config)
+    untuned = config if engine != "auto" else {**config, 'transcription_engine': ENGINES[0]}
+    if not autotune_config['enabled']:
+        return untuned
+
+    hardware = detect_hardware()
+    fingerprint = _fingerprint(hardware, config, engines)
+    results = _load_results(autotune_config['results_file'])
+    entry = results.get(hardware['host'])
+    if retune or not entry or entry.get('fingerprint') != fingerprint:
+        sample = find_sample(config, autotune_config)
+        if sample is None:
+            print("Auto-tuning needs a recording to benchmark with, using the configured settings for now")
+            return untuned
+        print(f"Auto-tuning transcription for {hardware['host']} ({hardware['cpu']}, {hardware['logical_cores']} threads"
+              f"{', AVX-512' if hardware['avx512'] else ', AVX2' if hardware['avx2'] else ''}{', VNNI' if hardware['vnni'] else ''}"
+              f"{', ' + str(hardware['cuda_devices']) + ' CUDA device(s)' if hardware['cuda_devices'] else ''})...")
+        settings, speed, measured = tune(config, hardware, sample, engines)
+        if settings is None or speed <= 0:
+            # Nothing saved, so the next run benchmarks again
+            logger.warning("Every auto-tuning benchmark failed, using the configured settings")
+            return untuned
+        entry = {
+            'fingerprint': fingerprint, 'hardware': hardware, 'settings': settings, 'speed': round(speed, 2),
+            'results': measured, 'tuned_at': datetime.now().isoformat(timespec="seconds"),
+        }
+        results = _load_results(autotune_config['results_file'])
+        results[hardware['host']] = entry
+        _save_results(autotune_config['results_file'], results)
+        print(f"Fastest: {describe(settings)} ({speed:.1f}x realtime), saved to {autotune_config['results_file']}")
+    else:
+        logger.info(f"Using auto-tuned settings: {describe(entry['settings'])} ({entry['speed']}x realtime)")
+    return apply_settings(config, entry['settings'])
+
+
+def main(argv=None):
+    from .config_handler import get_config
+    parser = argparse.ArgumentParser(description="Benchmark the transcription settings on this host and save the fastest")
+    parser.add_argument("--sample", help="Recording to benchmark with (default: autotune.sample, or the first recording in the queue)")
+    args = parser.parse_args(argv)
+    config = get_config()
+    config['autotune'] = {**(config.get('autotune', {}) or {}), 'enabled': True}
+    if args.sample:
+        config['autotune']['sample'] = args.sample
+    print(json.dumps(detect_hardware(), indent=2))
+    tuned = apply_autotune(config, retune=True)
+    engine = tuned['transcription_engine']
+    print(f"Transcription settings: engine={engine}, {describe(tuned.get(engine, {}))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Local stand-in for the OpenAI files/batches API, for developing batch mode without a provider account.
+
+    python -m Scripts.batch_standin --port 8089 [--delay 30] [--forward]
+
+Then set llm.client_type to local_openai and llm.batch.base_url to http://localhost:8089/v1.
+Batches report in_progress for --delay seconds and then complete. Without --forward each request
+gets a canned reply; with --forward it is answered through call_llm_api using llm.batch.forward_client_type.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class BatchStandIn:
+    def __init__(self, delay=0, responder=None):
+        self.delay = delay
+        self.responder = responder or (lambda body: f"Stand-in summary of {len(body['messages'][-1]['content'])} characters.")
+        self.files = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+
+    def add_file(self, filename, content, purpose):
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self.lock:
+            self.files[file_id] = {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": int(time.time()),
+                "filename": filename,
+                "purpose": purpose,
+                "content": content,
+            }
+        return {k: v for k, v in self.files[file_id].items() if k != "content"}
+
+    def create_batch(self, input_file_id, endpoint, completion_window):
+        if input_file_id not in self.files:
+            raise KeyError(input_file_id)
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        output_lines = []
+        for line in self.files[input_file_id]["content"].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                content = self.responder(request["body"])
+                response = {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request["body"].get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    },
+                }
+                output_lines.append({"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": request["custom_id"], "response": response, "error": None})
+            except Exception as e:
+                output_lines.append({"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": request["custom_id"], "response": {"status_code": 500, "body": {}}, "error": {"message": str(e)}})
+        output_file = self.add_file(f"{batch_id}_output.jsonl", ("\n".join(json.dumps(line) for line in output_lines) + "\n").encode("utf-8"), "batch_output")
+        with self.lock:
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": endpoint,
+                "input_file_id": input_file_id,
+                "completion_window": completion_window,
+                "created_at": int(time.time()),
+                "error_file_id": None,
+                "request_counts": {"total": len(output_lines), "completed": len(output_lines), "failed": 0},
+                "_output_file_id": output_file["id"],
+            }
+        return self.get_batch(batch_id)
+
+    def get_batch(self, batch_id):
+        batch = dict(self.batches[batch_id])
+        output_file_id = batch.pop("_output_file_id")
+        if time.time() - batch["created_at"] < self.delay:
+            batch.update(status="in_progress", output_file_id=None)
+        else:
+            batch.update(status="completed", output_file_id=output_file_id)
+        return batch
+
+
+def make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_POST(self):
+            path = self.path.rstrip("/")
+            if path.endswith("/files"):
+                message = BytesParser(policy=default_policy).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self._read_body()
+                )
+                fields = {}
+                for part in message.iter_parts():
+                    fields[part.get_param("name", header="content-disposition")] = (part.get_filename(), part.get_payload(decode=True))
+                filename, content = fields.get("file", (None, b""))
+                purpose = fields.get("purpose", (None, b"batch"))[1].decode("utf-8")
+                self._send_json(standin.add_file(filename or "upload.jsonl", content, purpose))
+            elif path.endswith("/batches"):
+                payload = json.loads(self._read_body() or b"{}")
+                try:
+                    batch = standin.create_batch(payload.get("input_file_id"), payload.get("endpoint"), payload.get("completion_window", "24h"))
+                except KeyError:
+                    self._send_json({"error": {"message": "Unknown input_file_id"}}, status=404)
+                    return
+                self._send_json(batch)
+            else:
+                self._send_json({"error": {"message": f"Unknown endpoint: {self.path}"}}, status=404)
+
+        def do_GET(self):
+            parts = self.path.rstrip("/").split("/")
+            if len(parts) >= 2 and parts[-2] == "batches" and parts[-1] in standin.batches:
+                self._send_json(standin.get_batch(parts[-1]))
+            elif len(parts) >= 3 and parts[-1] == "content" and parts[-2] in standin.files:
+                content = standin.files[parts[-2]]["content"]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            else:
+                self._send_json({"error": {"message": f"Unknown endpoint: {self.path}"}}, status=404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(host="127.0.0.1", port=8089, delay=0, responder=None):
+    return ThreadingHTTPServer((host, port), make_handler(BatchStandIn(delay, responder)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI batch API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0, help="Seconds each batch reports in_progress before completing")
+    parser.add_argument("--forward", action="store_true", help="Answer requests through call_llm_api instead of a canned reply")
+    args = parser.parse_args()
+
+    responder = None
+    if args.forward:
+        from Scripts.config_handler import get_config
+        from Scripts.llm_utils import call_llm_api
+        llm_config = get_config().get('llm', {})
+        client_type = llm_config.get('batch', {}).get('forward_client_type', llm_config.get('client_type'))
+
+        def responder(body):
+            return call_llm_api(
+                model=body.get("model"),
+                content=body["messages"][-1]["content"],
+                systemPrompt=body["messages"][0]["content"],
+                max_tokens=body.get("max_tokens"),
+                temperature=body.get("temperature"),
+                client_type=client_type,
+                base_url=llm_config.get('base_url')
+            )
+
+    server = make_server(args.host, args.port, args.delay, responder)
+    print(f"Batch stand-in listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime
+from .llm_utils import get_llm_client
+from .leases import file_lock
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BATCH_STATE_FILENAME = ".batch_jobs.json"
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def get_batch_config(config):
+    """
+    Return the llm.batch section of the config with defaults filled in.
+    """
+    llm_config = config.get('llm', {}) or {}
+    batch_config = llm_config.get('batch', {}) or {}
+    return {
+        'enabled': str(batch_config.get('enabled', False)).lower() == "true",
+        'wait': str(batch_config.get('wait', False)).lower() == "true",
+        'poll_interval': float(batch_config.get('poll_interval', 60)),
+        'completion_window': batch_config.get('completion_window', "24h"),
+        'base_url': batch_config.get('base_url', llm_config.get('base_url')),
+    }
+
+
+def make_custom_id(transcript_path, summary_name=None):
+    """
+    Stable request id for a transcript (and named summary), valid for both OpenAI and Anthropic batch APIs.
+    """
+    key = os.path.abspath(transcript_path) + "\0" + (summary_name or "")
+    return "transcript-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:32]
+
+
+def build_batch_request(custom_id, model, content, systemPrompt, max_tokens=4000, temperature=0, client_type="openai"):
+    """
+    Build one line of a provider batch JSONL file, mirroring the request call_llm_api would make.
+    """
+    if client_type == "openai" or client_type == "local_openai":
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": OPENAI_BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": systemPrompt},
+                    {"role": "user", "content": content}
+                ],
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            }
+        }
+    elif client_type == "anthropic":
+        params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": content}]
+        }
+        if systemPrompt:
+            params["system"] = systemPrompt
+        return {"custom_id": custom_id, "params": params}
+    else:
+        raise ValueError(f"Batch mode is not supported for client type: {client_type}")
+
+
+def _get_client(client_type, base_url=None):
+    if client_type not in ("openai", "local_openai", "anthropic"):
+        raise ValueError(f"Batch mode is not supported for client type: {client_type}")
+    return get_llm_client(client_type, base_url)
+
+
+def submit_batch(requests, client_type, base_url=None, completion_window="24h"):
+    """
+    Submit a list of batch request lines and return the provider's batch id.
+    """
+    client = _get_client(client_type, base_url)
+    if client_type == "openai" or client_type == "local_openai":
+        jsonl = "\n".join(json.dumps(request) for request in requests) + "\n"
+        input_file = client.files.create(file=("batch_input.jsonl", jsonl.encode("utf-8")), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=OPENAI_BATCH_ENDPOINT,
+            completion_window=completion_window
+        )
+        return batch.id
+    else:
+        batch = client.messages.batches.create(requests=requests)
+        return batch.id
+
+
+def fetch_batch_results(batch_id, client_type, base_url=None):
+    """
+    Check on a submitted batch.
+    Returns None while the batch is still running, otherwise a dict mapping
+    custom_id to the summary text (or None for requests that failed).
+    """
+    client = _get_client(client_type, base_url)
+    results = {}
+    if client_type == "openai" or client_type == "local_openai":
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            return None
+        if batch.status != "completed":
+            logger.error(f"Batch {batch_id} finished with status: {batch.status}")
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[entry["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                else:
+                    logger.error(f"Batch request {entry.get('custom_id')} failed: {entry.get('error') or response}")
+                    results[entry["custom_id"]] = None
+    else:
+        batch = client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                try:
+                    results[entry.custom_id] = entry.result.message.content[0].text
+                except (IndexError, AttributeError) as e:
+                    raise ValueError(f"Error parsing Anthropic response: {e}")
+            else:
+                logger.error(f"Batch request {entry.custom_id} failed: {entry.result.type}")
+                results[entry.custom_id] = None
+    return results
+
+
+def batch_state_lock(queue_folder):
+    """
+    Hold an exclusive lock on the batch state while reading and updating it, so runs on several
+    nodes sharing the queue don't overwrite each other's jobs.
+    """
+    return file_lock(os.path.join(queue_folder, BATCH_STATE_FILENAME + ".lock"))
+
+
+def load_batch_state(queue_folder):
+    state_path = os.path.join(queue_folder, BATCH_STATE_FILENAME)
+    if not os.path.exists(state_path):
+        return {"jobs": []}
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_batch_state(queue_folder, state):
+    """
+    Persist batch job state so polling survives restarts. Written to a temp
+    file and renamed so an interrupted run never leaves a truncated state file.
+    Read-modify-write it under batch_state_lock.
+    """
+    state_path = os.path.join(queue_folder, BATCH_STATE_FILENAME)
+    temp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, state_path)
+
+
+def get_pending_transcripts(queue_folder):
+    """
+    Return the set of transcript paths that belong to a batch job still awaiting results.
+    """
+    state = load_batch_state(queue_folder)
+    return {item["transcript_path"] for job in state["jobs"] for item in job["items"].values()}
+
+
+def submit_transcript_batch(transcript_paths, queue_folder, config, prepare_request):
+    """
+    Build and submit one batch job for a list of transcripts and record it in the state file.
+    prepare_request(transcript_path, config) returns the transcript text and its list of
+    (name, rules) summaries; each summary becomes its own request in the job.
+    """
+    llm_config = config.get('llm')
+    if not llm_config:
+        raise ValueError("'llm' configuration not found in config")
+    batch_config = get_batch_config(config)
+    client_type = llm_config.get('client_type')
+
+    requests = []
+    items = {}
+    for transcript_path in transcript_paths:
+        transcript, rule_sets = prepare_request(transcript_path, config)
+        for summary_name, summary_rules in rule_sets:
+            custom_id = make_custom_id(transcript_path, summary_name)
+            requests.append(build_batch_request(
+                custom_id,
+                model=llm_config.get('model'),
+                content=transcript,
+                systemPrompt=summary_rules,
+                max_tokens=llm_config.get('max_tokens'),
+                temperature=llm_config.get('temperature'),
+                client_type=client_type
+            ))
+            items[custom_id] = {"transcript_path": transcript_path, "summary_name": summary_name}
+
+    batch_id = submit_batch(requests, client_type, batch_config['base_url'], batch_config['completion_window'])
+    with batch_state_lock(queue_folder):
+        state = load_batch_state(queue_folder)
+        state["jobs"].append({
+            "id": batch_id,
+            "client_type": client_type,
+            "base_url": batch_config['base_url'],
+            "submitted_at": datetime.now().isoformat(timespec="seconds"),
+            "items": items
+        })
+        save_batch_state(queue_folder, state)
+    print(f"Submitted batch {batch_id} with {len(requests)} summary request(s) for {len(transcript_paths)} transcript(s)")
+    return batch_id
+
+
+def poll_batch_jobs(queue_folder, config, complete_item, wait=False):
+    """
+    Check every recorded batch job and hand finished results to complete_item(transcript_path, summaries),
+    where summaries maps each summary name (None for the folder's own rules) to its text.
+    A transcript is only completed once all of its summaries succeeded. Jobs are removed from the state file once all of their results have been handled.
+    Results are fetched without holding the state lock; a finished job is completed and removed under
+    it, and skipped if another run got there first, so each job is completed once.
+    If wait is True, keep polling until no jobs are outstanding.
+    """
+    poll_interval = get_batch_config(config)['poll_interval']
+    while True:
+        finished = {}
+        for job in load_batch_state(queue_folder)["jobs"]:
+            try:
+                results = fetch_batch_results(job["id"], job["client_type"], job.get("base_url"))
+            except Exception as e:
+                logger.error(f"Error polling batch {job['id']}: {str(e)}")
+                continue
+            if results is None:
+                print(f"Batch {job['id']} is still running ({len(job['items'])} transcript(s))")
+                continue
+            finished[job["id"]] = results
+
+        with batch_state_lock(queue_folder):
+            state = load_batch_state(queue_folder)
+            remaining_jobs = []
+            for job in state["jobs"]:
+                if job["id"] not in finished:
+                    remaining_jobs.append(job)
+                    continue
+                results = finished[job["id"]]
+                transcript_summaries = {}
+                for custom_id, item in job["items"].items():
+                    transcript_summaries.setdefault(item["transcript_path"], {})[item.get("summary_name")] = results.get(custom_id)
+                for transcript_path, summaries in transcript_summaries.items():
+                    if any(summary is None for summary in summaries.values()):
+                        print(f"Error: batch returned no summary for {transcript_path}, it will be resubmitted on the next run")
+                        continue
+                    try:
+                        complete_item(transcript_path, summaries)
+                    except Exception as e:
+                        print(f"Error processing transcript {os.path.basename(transcript_path)}: {str(e)}")
+                print(f"Batch {job['id']} completed")
+            state["jobs"] = remaining_jobs
+            save_batch_state(queue_folder, state)
+        if not wait or not remaining_jobs:
+            return
+        time.sleep(poll_interval)
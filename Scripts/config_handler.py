@@ -26,6 +26,23 @@ def load_config():
 def get_config():
     return load_config()
 
+FOLDER_CONFIG_FILENAME = "summary-config.yaml"
+
+def load_folder_config(folder_path):
+    """
+    Load the optional summary-config.yaml that sits alongside a folder's summary-rules.txt.
+    Returns an empty dict if the folder has none.
+    """
+    folder_config_path = os.path.join(folder_path, FOLDER_CONFIG_FILENAME)
+    if not os.path.exists(folder_config_path):
+        return {}
+    try:
+        with open(folder_config_path, 'r') as file:
+            return yaml.safe_load(file) or {}
+    except Exception as e:
+        logger.error(f"Error loading folder config {folder_config_path}: {str(e)}")
+        raise
+
 def get_summary_prompt(config):
     try:
         summary_type = config.get('summary_type')
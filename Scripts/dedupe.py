@@ -0,0 +1,81 @@
+import os
+import hashlib
+import logging
+from collections import defaultdict
+from .archiver import sha256_file
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bytes read from the start, middle and end of a file for its partial fingerprint
+SAMPLE_BYTES = 64 * 1024
+
+
+def get_dedupe_config(config):
+    """
+    Return the deduplication section of the config with defaults filled in.
+    """
+    dedupe_config = config.get('deduplication', {}) or {}
+    return {
+        'enabled': str(dedupe_config.get('enabled', True)).lower() == "true",
+    }
+
+
+def partial_fingerprint(path, size):
+    """
+    Hash of a file's size and three samples from its start, middle and end. Cheap whatever
+    the file's length, and enough to tell almost all different recordings of the same size apart.
+    """
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(size // 2 - SAMPLE_BYTES // 2, 0), max(size - SAMPLE_BYTES, 0)}):
+            f.seek(offset)
+            digest.update(f.read(SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def _split_by(items, fingerprint):
+    groups = defaultdict(list)
+    for item in items:
+        try:
+            groups[fingerprint(item)].append(item)
+        except OSError as e:
+            logger.warning(f"Could not fingerprint {item.path}: {str(e)}")
+            groups[("unreadable", item.path)].append(item)
+    return list(groups.values())
+
+
+def group_duplicates(items, key=None):
+    """
+    Group queue items whose files have identical content, keeping the items' order.
+
+    Files are only compared with others of the same size (and the same key(item), e.g. the
+    transcription settings of their folder); those are split by partial fingerprint, and only
+    files that still collide are hashed in full. Returns a list of groups, the first item of
+    each being the one to process.
+    """
+    candidates = defaultdict(list)
+    for item in items:
+        candidates[(item.size, key(item) if key else None)].append(item)
+
+    group_of = {}
+    for same_size in candidates.values():
+        if len(same_size) < 2:
+            continue
+        for same_partial in _split_by(same_size, lambda item: partial_fingerprint(item.path, item.size)):
+            if len(same_partial) < 2:
+                continue
+            for same_content in _split_by(same_partial, lambda item: sha256_file(item.path)):
+                for item in same_content:
+                    group_of[item.path] = same_content
+
+    groups = []
+    seen = set()
+    for item in items:
+        if item.path in seen:
+            continue
+        group = group_of.get(item.path, [item])
+        seen.update(member.path for member in group)
+        groups.append(group)
+    return groups
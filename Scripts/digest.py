@@ -0,0 +1,250 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from .summarizer import summarize_text
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = ".digest-cache.json"
+LEVELS = ("daily", "weekly", "monthly")
+DEFAULT_PROMPTS = {
+    'daily': "The following are summaries of the meetings held on one day. Combine them into one daily digest: "
+             "key decisions, action items with their owners, open questions and notable topics. Be concise and "
+             "don't repeat points that appear in several meetings.",
+    'weekly': "The following are daily digests of one week's meetings. Combine them into one weekly digest: "
+              "the main decisions and outcomes, action items still open, recurring topics and how they developed "
+              "over the week. Be concise.",
+    'monthly': "The following are weekly digests of one month's meetings. Combine them into one monthly digest: "
+               "the main decisions and outcomes, themes and how they developed, and what is still open at the "
+               "end of the month. Be concise.",
+}
+# Named summaries (<file>_transcript_<name>_summary.md) are other views of a meeting already in its main summary
+NAMED_SUMMARY_PATTERN = re.compile(r"_transcript_[\w-]+_summary(_\d+)?\.md$")
+SUMMARY_SUFFIX_PATTERN = re.compile(r"(_transcript)?_summary(_\d+)?\.md$")
+
+
+def get_digest_config(config):
+    """
+    Return the digest section of the config with defaults filled in.
+    """
+    digest_config = config.get('digest', {}) or {}
+    output_config = config.get('output_structure', {}) or {}
+    prompts = dict(DEFAULT_PROMPTS)
+    prompts.update({level: prompt for level, prompt in (digest_config.get('prompts') or {}).items() if prompt})
+    return {
+        'base_folder': output_config.get('base_folder', 'output'),
+        'structure': output_config.get('structure', []) or [],
+        'folder': str(digest_config.get('folder', 'digests')),
+        'max_workers': max(1, int(digest_config.get('max_workers', 4))),
+        'prompts': prompts,
+    }
+
+
+def node_key(level, day):
+    """
+    The key of the daily, weekly (ISO week) or monthly digest covering day, e.g. 2024-05-06,
+    2024-W19 or 2024-05.
+    """
+    if level == "daily":
+        return day.isoformat()
+    if level == "weekly":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.strftime("%Y-%m")
+
+
+def child_keys(level, key):
+    """
+    The keys of the digests one level down that a weekly or monthly digest is built from.
+    A week belongs to the month its Thursday falls in, so every week is in exactly one month.
+    """
+    if level == "weekly":
+        year, week = key.split("-W")
+        return [date.fromisocalendar(int(year), int(week), weekday).isoformat() for weekday in range(1, 8)]
+    year, month = (int(part) for part in key.split("-"))
+    first = date(year, month, 1)
+    weeks = []
+    for offset in range(31):
+        day = first + timedelta(days=offset)
+        if day.month == month and day.weekday() == 3:
+            weeks.append(node_key("weekly", day))
+    return weeks
+
+
+def find_summaries(digest_config):
+    """
+    Map (summary type, date) to the summary files in the output folder. The type and date come
+    from the SUMMARY-TYPE and DATE parts of output_structure when present, otherwise every summary
+    is of type "all" and dated by its modification time.
+    """
+    base_folder = digest_config['base_folder']
+    structure = digest_config['structure']
+    summaries = {}
+    for directory, directories, filenames in os.walk(base_folder):
+        if os.path.abspath(directory) == os.path.abspath(base_folder) and digest_config['folder'] in directories:
+            directories.remove(digest_config['folder'])
+        for filename in filenames:
+            if filename.startswith(".") or not SUMMARY_SUFFIX_PATTERN.search(filename) or NAMED_SUMMARY_PATTERN.search(filename):
+                continue
+            path = os.path.join(directory, filename)
+            parts = os.path.relpath(directory, base_folder).split(os.sep)
+            fields = dict(zip(structure, parts)) if len(parts) == len(structure) else {}
+            try:
+                day = datetime.strptime(fields.get("DATE", ""), "%Y-%m-%d").date()
+            except ValueError:
+                day = date.fromtimestamp(os.path.getmtime(path))
+            summaries.setdefault((fields.get("SUMMARY-TYPE", "all"), day.isoformat()), []).append(path)
+    return summaries
+
+
+class _DigestBuilder:
+    def __init__(self, config, digest_config, summaries):
+        self.config = config
+        self.digest_config = digest_config
+        self.summaries = summaries
+        self.folder = os.path.join(digest_config['base_folder'], digest_config['folder'])
+        self.cache_path = os.path.join(self.folder, CACHE_FILENAME)
+        self.cache = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        self.lock = threading.Lock()
+        self.texts = {}
+        self.llm_calls = 0
+
+    def path(self, summary_type, level, key):
+        return os.path.join(self.folder, summary_type, level, f"{key}.md")
+
+    def inputs(self, summary_type, level, key):
+        """
+        The (title, text) inputs of a digest: the day's summaries for a daily digest, otherwise
+        the digests one level down that have content.
+        """
+        if level == "daily":
+            inputs = []
+            for path in sorted(self.summaries.get((summary_type, key), [])):
+                with open(path, "r", encoding="utf-8") as f:
+                    inputs.append((SUMMARY_SUFFIX_PATTERN.sub("", os.path.basename(path)), f.read().strip()))
+            return inputs
+        child_level = LEVELS[LEVELS.index(level) - 1]
+        return [(child, self.texts[(summary_type, child_level, child)]) for child in child_keys(level, key)
+                if self.texts.get((summary_type, child_level, child))]
+
+    def build(self, summary_type, level, key):
+        """
+        Build one digest, or reuse the cached one if its inputs haven't changed. A digest with a
+        single input is that input, without an LLM call.
+        """
+        inputs = self.inputs(summary_type, level, key)
+        if not inputs:
+            return None
+        prompt = self.digest_config['prompts'][level]
+        inputs_hash = hashlib.sha256(json.dumps([prompt, inputs]).encode("utf-8")).hexdigest()
+        path = self.path(summary_type, level, key)
+        cache_key = f"{summary_type}/{level}/{key}"
+        with self.lock:
+            cached = self.cache.get(cache_key) == inputs_hash
+        if cached and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        else:
+            if len(inputs) == 1:
+                text = inputs[0][1]
+            else:
+                content = "\n\n".join(f"## {title}\n\n{text}" for title, text in inputs)
+                llm_config = self.config.get('llm')
+                if not llm_config:
+                    raise ValueError("'llm' configuration not found in config")
+                text = summarize_text(content, [(None, prompt)], llm_config)[0][1]
+                with self.lock:
+                    self.llm_calls += 1
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial_path = path + ".partial"
+            with open(partial_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(partial_path, path)
+            with self.lock:
+                self.cache[cache_key] = inputs_hash
+            print(f"Digest updated: {path}")
+        with self.lock:
+            self.texts[(summary_type, level, key)] = text
+        return text
+
+    def save_cache(self):
+        os.makedirs(self.folder, exist_ok=True)
+        partial_path = self.cache_path + ".partial"
+        with open(partial_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, indent=2, sort_keys=True)
+        os.replace(partial_path, self.cache_path)
+
+
+def build_digests(config, period="weekly", day=None, summary_type=None):
+    """
+    Build the daily, weekly or monthly digest covering day (default today) for every summary
+    type, or only summary_type. Digests are built bottom-up, daily from the summaries, weekly
+    from the daily digests and monthly from the weekly ones, each level's digests requested
+    concurrently. Every digest is cached under digests/ in the output folder with a hash of its
+    inputs and only rebuilt when they change, so this week's digest after a new meeting costs
+    one call for the day and one for the week.
+    Returns ({summary type: digest path}, number of LLM calls made).
+    """
+    digest_config = get_digest_config(config)
+    day = day or date.today()
+    summaries = find_summaries(digest_config)
+    summary_types = sorted({found_type for found_type, _ in summaries})
+    if summary_type:
+        summary_types = [summary_type] if summary_type in summary_types else []
+
+    # The keys needed at each level, from the requested digest down to its days
+    top = LEVELS.index(period)
+    needed = {period: [node_key(period, day)]}
+    for index in range(top, 0, -1):
+        level = LEVELS[index]
+        needed[LEVELS[index - 1]] = [child for key in needed[level] for child in child_keys(level, key)]
+
+    builder = _DigestBuilder(config, digest_config, summaries)
+    try:
+        with ThreadPoolExecutor(max_workers=digest_config['max_workers']) as executor:
+            for level in LEVELS[:top + 1]:
+                nodes = [(found_type, level, key) for found_type in summary_types for key in needed[level]]
+                list(executor.map(lambda node: builder.build(*node), nodes))
+    finally:
+        builder.save_cache()
+
+    key = needed[period][0]
+    digests = {found_type: builder.path(found_type, period, key) for found_type in summary_types
+               if builder.texts.get((found_type, period, key))}
+    return digests, builder.llm_calls
+
+
+def main(argv=None):
+    from .config_handler import get_config
+    parser = argparse.ArgumentParser(description="Roll the meeting summaries in the output folder up into digests")
+    parser.add_argument("period", nargs="?", default="week", choices=["day", "week", "month"])
+    parser.add_argument("--date", help="A day in the period to digest, YYYY-MM-DD (default: today)")
+    parser.add_argument("--type", help="Only this summary type (summary folder)")
+    args = parser.parse_args(argv)
+
+    day = datetime.strptime(args.date, "%Y-%m-%d").date() if args.date else None
+    period = {'day': "daily", 'week': "weekly", 'month': "monthly"}[args.period]
+    digests, llm_calls = build_digests(get_config(), period, day, args.type)
+    if not digests:
+        print("No summaries in that period.")
+        return 1
+    for found_type, path in digests.items():
+        print(f"{found_type}: {path}")
+    print(f"{llm_calls} LLM call(s) made")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,20 @@
 import os
+import time
 import shutil
 from datetime import datetime
-from .audio_extractor import extract_audio
-from .transcriber import transcribe_audio_flow
-from .summarizer import summarize_transcript
+from .pipeline import Pipeline
+from .summarizer import prepare_summary_request, save_summary
+from .batch_utils import get_batch_config, get_pending_transcripts, submit_transcript_batch, poll_batch_jobs
 from .config_handler import get_config
 from .utils import move_file
+from .queue_scanner import scan_queue, make_work_item, TRANSCRIPT_SUFFIX
+from .scheduler import order_work, estimate_duration
+from .media_probe import probe_item, format_duration
+from .dedupe import get_dedupe_config, group_duplicates
+from .transcriber_utils import get_playback_speed, preload_transcription_model
+from .llm_utils import preload_llm_client
+from .leases import claim, release, lost
+from .worker_pool import start_transcription_pool, submit_transcription, collect_transcription, stop_transcription_pool
 
 def add_timestamp_to_filename(filename, config):
     if config.get('add_timestamp') == True:
@@ -14,73 +23,258 @@ def add_timestamp_to_filename(filename, config):
             return f"{timestamp}{filename}"
     return filename
 
-def process_videos(queue_folder, config):
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
-    for filename in os.listdir(queue_folder):
-        if any(filename.lower().endswith(ext) for ext in video_extensions):
-            new_filename = add_timestamp_to_filename(filename, config)
-            old_path = os.path.join(queue_folder, filename)
-            new_path = os.path.join(queue_folder, new_filename)
-            os.rename(old_path, new_path)
-            
-            try:
-                print(f"Processing video: {new_filename}")
-                audio_path = extract_audio(new_path, queue_folder)
-                move_file(new_path, config)
-                print(f"Video processed and moved: {new_filename}")
-            except Exception as e:
-                print(f"Error processing video {new_filename}: {str(e)}")
-
-def process_audio_files(queue_folder, config):
-    audio_extensions = ['.mp3', '.wav', '.m4a', '.flac']
-    
-    for item in os.listdir(queue_folder):
-        item_path = os.path.join(queue_folder, item)
-        if os.path.isdir(item_path):
-            # Check if the subdirectory contains a summary-rules.txt file
-            summary_rules_path = os.path.join(item_path, "summary-rules.txt")
-            if os.path.exists(summary_rules_path):
-                # Process audio files in this subdirectory
-                for filename in os.listdir(item_path):
-                    if any(filename.lower().endswith(ext) for ext in audio_extensions):
-                        new_filename = add_timestamp_to_filename(filename, config)
-                        old_path = os.path.join(item_path, filename)
-                        new_path = os.path.join(item_path, new_filename)
-                        os.rename(old_path, new_path)
-                        
-                        try:
-                            print(f"Processing audio: {new_filename}")
-                            
-                            transcript_path = transcribe_audio_flow(new_path, queue_folder, config)
-                            move_file(new_path, config)
-                            print(f"Audio processed and moved: {new_filename}")
-                        except Exception as e:
-                            print(f"Error processing audio {new_filename}: {str(e)}")
-            else:
-                print(f"Warning: Skipping directory {item} as it does not contain a summary-rules.txt file.")
-                
-def process_transcripts(queue_folder, config):
-    for item in os.listdir(queue_folder):
-        item_path = os.path.join(queue_folder, item)
-        if os.path.isdir(item_path):
-            # Check if the subdirectory contains a summary-rules.txt file
-            summary_rules_path = os.path.join(item_path, "summary-rules.txt")
-            if os.path.exists(summary_rules_path):
-                # Process transcript files in this subdirectory
-                for filename in os.listdir(item_path):
-                    if filename.endswith('_transcript.md'):
-                        new_filename = add_timestamp_to_filename(filename, config)
-                        old_path = os.path.join(item_path, filename)
-                        new_path = os.path.join(item_path, new_filename)
-                        if old_path != new_path:
-                            os.rename(old_path, new_path)
-                        
-                        try:
-                            print(f"Processing transcript: {new_filename}")
-                            summary_path = summarize_transcript(new_path, config)
-                            move_file(new_path, config)
-                            print(f"Transcript processed and moved: {new_filename}")
-                        except Exception as e:
-                            print(f"Error processing transcript {new_filename}: {str(e)}")
+def rename_with_timestamp(item, config):
+    """
+    Apply the add_timestamp setting to a queued file and return its new path.
+    """
+    new_filename = add_timestamp_to_filename(item.filename, config)
+    new_path = os.path.join(os.path.dirname(item.path), new_filename)
+    if item.path != new_path:
+        # Keep the file claimed under its new name as well
+        claim(new_path, config, must_exist=False)
+        os.rename(item.path, new_path)
+    return new_path
+
+def claim_item(item, config):
+    """
+    Claim a queued file before working on it, so several nodes can drain one shared queue.
+    """
+    if claim(item.path, config):
+        return True
+    print(f"Skipping {item.filename}, another worker has claimed it")
+    return False
+
+def release_item(item, new_path):
+    release(item.path)
+    release(new_path)
+
+def check_claimed(item, new_path):
+    """
+    Raise if another node has reclaimed a file this process was working on, so its results
+    aren't handed on or moved a second time.
+    """
+    if lost(item.path) or lost(new_path):
+        raise RuntimeError(f"{os.path.basename(new_path)} was taken over by another worker, abandoning it")
+
+def move_and_release(item, new_path, config):
+    """
+    Move a processed file to the output folder and release its leases once it has left the
+    queue. A large cross-device move finishes in the background, until then the file is still
+    in the queue and must stay claimed. Nothing is moved if another node has taken it over.
+    """
+    check_claimed(item, new_path)
+    move_file(new_path, config, on_complete=lambda archived_path: release_item(item, new_path))
+
+def warn_skipped_folders(plan):
+    for folder in plan.skipped_folders:
+        print(f"Warning: Skipping directory {os.path.basename(folder)} as it does not contain a summary-rules.txt file.")
+
+def is_empty_recording(item):
+    """
+    Check a queued recording's header for a zero-length file or a duration known to be zero so it
+    can be skipped without decoding. An unknown duration (None) is never treated as empty. Empty
+    files are left in the queue, a recorder may still be writing them.
+    """
+    info = probe_item(item)
+    if item.size == 0 or (info is not None and info.duration == 0):
+        print(f"Warning: Skipping empty recording {item.filename}")
+        return True
+    return False
+
+def preload_models(config, plan, pool=None):
+    """
+    Start loading the transcription model and LLM client in the background as soon as the plan
+    shows they will be needed, so the load overlaps with video extraction instead of delaying
+    the first transcript. The model is left to the workers of a transcription pool if there is
+    one. Turned off with preload_models: false.
+    """
+    if str(config.get('preload_models', True)).lower() != "true":
+        return
+    if (plan.videos or plan.audio) and pool is None:
+        preload_transcription_model(config)
+    llm_config = config.get('llm') or {}
+    if llm_config.get('client_type') and not get_batch_config(config)['enabled'] and (plan.videos or plan.audio or plan.transcripts):
+        preload_llm_client(llm_config.get('client_type'), llm_config.get('base_url'))
+
+def process_videos(queue_folder, config, plan=None, pipeline=None):
+    if plan is None:
+        plan = scan_queue(queue_folder)
+    pipeline = pipeline or Pipeline(config)
+    for item in plan.videos:
+        if is_empty_recording(item) or not claim_item(item, config):
+            continue
+        new_path = rename_with_timestamp(item, config)
+        new_filename = os.path.basename(new_path)
+        moved = False
+
+        try:
+            print(f"Processing video: {new_filename}")
+            audio_path = pipeline.extract_audio_file(new_path, queue_folder)
+            move_and_release(item, new_path, config)
+            moved = True
+            print(f"Video processed and moved: {new_filename}")
+        except Exception as e:
+            print(f"Error processing video {new_filename}: {str(e)}")
+        finally:
+            if not moved:
+                release_item(item, new_path)
+
+def find_duplicate_recordings(audio_items, config):
+    """
+    Group identical recordings dropped into several summary folders so each is transcribed once.
+    Only folders that transcribe the same way (same playback speed) share a transcript.
+    """
+    if not get_dedupe_config(config)['enabled']:
+        return [[item] for item in audio_items]
+    groups = group_duplicates(audio_items, key=lambda item: get_playback_speed(item.summary_folder))
+    duplicates = len(audio_items) - len(groups)
+    if duplicates:
+        print(f"Found {duplicates} duplicate recording(s), each recording will be transcribed once")
+    return groups
+
+def share_transcript(duplicate, original_filename, transcript_path, config, plan):
+    """
+    Give a duplicate recording a copy of the transcript made from the original and move it to the output folder.
+    """
+    new_path = rename_with_timestamp(duplicate, config)
+    if transcript_path:
+        file_name = os.path.splitext(os.path.basename(new_path))[0]
+        duplicate_transcript_path = os.path.join(duplicate.summary_folder, f"{file_name}{TRANSCRIPT_SUFFIX}")
+        claim(duplicate_transcript_path, config, must_exist=False)
+        shutil.copyfile(transcript_path, duplicate_transcript_path)
+        plan.transcripts.append(make_work_item(duplicate_transcript_path, "transcript", duplicate.summary_folder))
+    move_and_release(duplicate, new_path, config)
+    print(f"Audio {os.path.basename(new_path)} is a duplicate of {original_filename}, reused its transcript and moved")
+
+def process_audio_files(queue_folder, config, plan=None, pipeline=None, pool=None):
+    if plan is None:
+        plan = scan_queue(queue_folder)
+    pipeline = pipeline or Pipeline(config)
+    warn_skipped_folders(plan)
+    audio_items = [item for item in order_work(plan.audio, config) if not is_empty_recording(item)]
+    groups = find_duplicate_recordings(audio_items, config)
+    # Another node may hold some of the files, the first claimed copy of a recording leads its group
+    groups = [claimed for claimed in ([item for item in group if claim_item(item, config)] for group in groups) if claimed]
+    durations = [estimate_duration(group[0]) for group in groups]
+    new_paths = [rename_with_timestamp(group[0], config) for group in groups]
+    for path in new_paths:
+        # Hold the transcript from before it is written until the transcript stage has summarized it
+        claim(os.path.splitext(path)[0] + TRANSCRIPT_SUFFIX, config, must_exist=False)
+    # With worker_pool enabled every file is handed to the workers up front and the results
+    # are taken in queue order below, so moves and transcript hand-off stay in this process.
+    # main starts the pool before any other thread; otherwise it is started (and stopped) here.
+    own_pool = pool is None
+    if own_pool:
+        pool = start_transcription_pool(config, len(groups))
+    submitted = [submit_transcription(pool, path, queue_folder, config) for path in new_paths] if pool else None
+    audio_seconds_done = 0.0
+    processing_seconds = 0.0
+    for index, group in enumerate(groups):
+        item = group[0]
+        new_path = new_paths[index]
+        new_filename = os.path.basename(new_path)
+        moved = False
+
+        try:
+            eta = ""
+            if audio_seconds_done > 0:
+                # Real-time factor measured on this run so far, applied to what's left in the queue
+                remaining_seconds = sum(durations[index:]) * processing_seconds / audio_seconds_done
+                eta = f", queue ETA ~{format_duration(remaining_seconds)}"
+            print(f"Processing audio: {new_filename} ({format_duration(durations[index])}{eta})")
+
+            start_time = time.time()
+            if submitted:
+                transcript_path = collect_transcription(submitted[index])
             else:
-                print(f"Warning: Skipping directory {item} as it does not contain a summary-rules.txt file.")
+                transcript_path = pipeline.transcribe_file(new_path)
+            processing_seconds += time.time() - start_time
+            audio_seconds_done += durations[index]
+            check_claimed(item, new_path)
+            if transcript_path:
+                # Hand the new transcript straight to the transcript stage without rescanning
+                plan.transcripts.append(make_work_item(transcript_path, "transcript", item.summary_folder))
+            move_and_release(item, new_path, config)
+            moved = True
+            print(f"Audio processed and moved: {new_filename}")
+            for duplicate in group[1:]:
+                share_transcript(duplicate, new_filename, transcript_path, config, plan)
+        except Exception as e:
+            print(f"Error processing audio {new_filename}: {str(e)}")
+        finally:
+            if not moved:
+                release_item(item, new_path)
+    if pool and own_pool:
+        stop_transcription_pool(pool)
+
+def complete_batch_transcript(transcript_path, summaries, config):
+    """
+    Save the summaries returned by a batch job and move their transcript to the output folder.
+    The transcript is claimed first, so a run summarizing it the normal way doesn't race the batch.
+    """
+    if not os.path.exists(transcript_path):
+        print(f"Warning: Transcript {transcript_path} no longer exists, discarding its batch summary.")
+        return
+    if not claim(transcript_path, config):
+        print(f"Warning: Transcript {transcript_path} is being processed by another worker, discarding its batch summary.")
+        return
+    try:
+        for summary_name, summary in summaries.items():
+            save_summary(transcript_path, summary, config, summary_name)
+        move_file(transcript_path, config, on_complete=lambda archived_path: release(transcript_path))
+    except BaseException:
+        release(transcript_path)
+        raise
+    print(f"Transcript processed and moved: {os.path.basename(transcript_path)}")
+
+def process_transcripts(queue_folder, config, plan=None, pipeline=None):
+    if plan is None:
+        plan = scan_queue(queue_folder)
+    pipeline = pipeline or Pipeline(config)
+    batch_config = get_batch_config(config)
+    batch_mode = batch_config['enabled']
+    pending_transcripts = set()
+    batch_transcripts = []
+    if batch_mode:
+        # Collect results from batch jobs submitted on earlier runs before queueing anything new
+        poll_batch_jobs(queue_folder, config, lambda path, summaries: complete_batch_transcript(path, summaries, config))
+        pending_transcripts = get_pending_transcripts(queue_folder)
+
+    warn_skipped_folders(plan)
+    for item in order_work(plan.transcripts, config):
+        if item.path in pending_transcripts:
+            print(f"Transcript awaiting batch results: {item.filename}")
+            continue
+        if batch_mode and not os.path.exists(item.path):
+            # Already completed and moved by the batch poll above
+            continue
+        if not claim_item(item, config):
+            continue
+        new_path = rename_with_timestamp(item, config)
+        new_filename = os.path.basename(new_path)
+
+        if batch_mode:
+            batch_transcripts.append(new_path)
+            continue
+
+        moved = False
+        try:
+            print(f"Processing transcript: {new_filename}")
+            summary_path = pipeline.summarize_file(new_path)
+            move_and_release(item, new_path, config)
+            moved = True
+            print(f"Transcript processed and moved: {new_filename}")
+        except Exception as e:
+            print(f"Error processing transcript {new_filename}: {str(e)}")
+        finally:
+            if not moved:
+                release_item(item, new_path)
+
+    if batch_transcripts:
+        try:
+            submit_transcript_batch(batch_transcripts, queue_folder, config, prepare_summary_request)
+        except Exception as e:
+            print(f"Error submitting transcript batch: {str(e)}")
+            return
+        if batch_config['wait']:
+            poll_batch_jobs(queue_folder, config, lambda path, summaries: complete_batch_transcript(path, summaries, config), wait=True)
@@ -0,0 +1,83 @@
+import os
+import json
+import logging
+from .leases import file_lock
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = ".languages.json"
+
+
+def get_language_config(config):
+    """
+    Return the language_detection section of the config with defaults filled in. pin_after
+    is how many recordings in a row a summary folder needs in the same language before that
+    language is pinned for it (0 never pins).
+    """
+    language_config = config.get('language_detection', {}) or {}
+    queue_folder = config.get('meeting_recordings_folder', '.')
+    return {
+        'pin_after': max(0, int(language_config.get('pin_after', 0))),
+        'cache_file': language_config.get('cache_file') or os.path.join(queue_folder, CACHE_FILENAME),
+    }
+
+
+def _folder_key(folder):
+    return os.path.basename(os.path.normpath(folder))
+
+
+def _load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read language cache {path}: {str(e)}")
+        return {}
+
+
+def _save_cache(path, cache):
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(partial_path, path)
+
+
+def pinned_language(folder, config):
+    """
+    The language pinned for a summary folder, or None if its recordings still need detecting.
+    """
+    language_config = get_language_config(config)
+    if not language_config['pin_after']:
+        return None
+    return _load_cache(language_config['cache_file']).get(_folder_key(folder), {}).get('pinned')
+
+
+def record_language(folder, language, config):
+    """
+    Remember the language detected for a recording in a summary folder, and pin it for the
+    folder once the last pin_after recordings all agree. Returns the pinned language, if any.
+    The cache is updated under a file lock, since worker_pool workers and other nodes share it.
+    """
+    language_config = get_language_config(config)
+    if not language_config['pin_after'] or not language:
+        return None
+    key = _folder_key(folder)
+    with file_lock(language_config['cache_file'] + ".lock"):
+        cache = _load_cache(language_config['cache_file'])
+        entry = cache.setdefault(key, {})
+        if entry.get('pinned'):
+            return entry['pinned']
+        detected = (entry.get('detected', []) + [language])[-language_config['pin_after']:]
+        entry['detected'] = detected
+        if len(detected) == language_config['pin_after'] and len(set(detected)) == 1:
+            entry['pinned'] = language
+            print(f"Pinned language '{language}' for {key} after {len(detected)} recordings, later ones skip detection")
+        try:
+            _save_cache(language_config['cache_file'], cache)
+        except OSError as e:
+            logger.warning(f"Could not save language cache {language_config['cache_file']}: {str(e)}")
+        return entry.get('pinned')
@@ -0,0 +1,241 @@
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    # Windows: no flock, files guarded by file_lock are only safe for one process at a time
+    fcntl = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+LEASE_FOLDER = ".leases"
+LEASE_SUFFIX = ".lease"
+
+# Leases held by this process, lease path -> token written into the lease file
+_held = {}
+# Leases this process held until another node reclaimed them; the work on those files is abandoned
+_lost = set()
+_held_lock = threading.Lock()
+_heartbeat_thread = None
+_heartbeat_stop = threading.Event()
+
+
+def get_lease_config(config):
+    """
+    Return the leases section of the config with defaults filled in.
+    """
+    lease_config = config.get('leases', {}) or {}
+    ttl_seconds = float(lease_config.get('ttl_seconds', 300))
+    return {
+        'enabled': str(lease_config.get('enabled', False)).lower() == "true",
+        'ttl_seconds': ttl_seconds,
+        'heartbeat_seconds': float(lease_config.get('heartbeat_seconds', ttl_seconds / 10)),
+    }
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    Hold an exclusive flock on lock_path (created if needed) for a read-modify-write of a shared
+    state file, across threads, processes and nodes; Linux also honours flock over NFS.
+    """
+    with open(lock_path, "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def lease_path(path):
+    """
+    Lease file for a queued file: <folder>/.leases/<filename>.lease. The folder is hidden, so the
+    queue scanner never treats leases as work.
+    """
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, LEASE_FOLDER, filename + LEASE_SUFFIX)
+
+
+def _read_token(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().split(" ", 1)[0].strip()
+    except OSError:
+        return None
+
+
+def _create_lease(path):
+    """
+    Create the lease file if nobody holds it. O_EXCL makes creation atomic, also on NFSv3 and later.
+    """
+    token = uuid.uuid4().hex
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return None
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(f"{token} {socket.gethostname()}:{os.getpid()}\n")
+    return token
+
+
+def _reclaim_if_expired(path, ttl_seconds):
+    """
+    Remove a lease whose holder stopped heartbeating more than ttl_seconds ago. The lease is
+    renamed aside first so only one node can win the reclaim, and put back if it turns out to
+    have been renewed or replaced in the meantime.
+    """
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        return True
+    if time.time() - stat_result.st_mtime < ttl_seconds:
+        return False
+    expired_token = _read_token(path)
+    aside_path = f"{path}.{uuid.uuid4().hex}.expired"
+    try:
+        os.rename(path, aside_path)
+    except FileNotFoundError:
+        # Another node reclaimed it first
+        return True
+    if _read_token(aside_path) != expired_token or time.time() - os.stat(aside_path).st_mtime < ttl_seconds:
+        # Took a lease that was renewed after we looked, hand it back
+        try:
+            os.link(aside_path, path)
+        except FileExistsError:
+            pass
+        os.remove(aside_path)
+        return False
+    os.remove(aside_path)
+    logger.info(f"Reclaimed expired lease {os.path.basename(path)} (held by {expired_token})")
+    return True
+
+
+def claim(path, config, must_exist=True):
+    """
+    Claim a queued file for this process so other nodes draining the same queue skip it.
+    Returns True if the file is ours to process (always when leases are disabled), False if
+    another live node holds it or it has already left the queue. Claims are re-entrant.
+    With must_exist=False a file that is about to be written (e.g. a transcript) can be claimed.
+    """
+    lease_config = get_lease_config(config)
+    if not lease_config['enabled']:
+        return True
+    lease_file = lease_path(path)
+    with _held_lock:
+        if lease_file in _held:
+            return True
+    os.makedirs(os.path.dirname(lease_file), exist_ok=True)
+
+    token = _create_lease(lease_file)
+    if token is None and _reclaim_if_expired(lease_file, lease_config['ttl_seconds']):
+        token = _create_lease(lease_file)
+    if token is None:
+        return False
+    with _held_lock:
+        _held[lease_file] = token
+        _lost.discard(lease_file)
+    _start_heartbeat(lease_config['heartbeat_seconds'])
+
+    if must_exist and not os.path.exists(path):
+        # Processed and moved by another node between our scan and the claim
+        release(path)
+        return False
+    return True
+
+
+def release(path):
+    """
+    Give up the claim on a file, removing its lease if it is still ours.
+    """
+    _release_lease(lease_path(path))
+
+
+def lost(path):
+    """
+    True if this process claimed path but another node has since reclaimed its lease (e.g. after
+    this process stalled past the TTL). The file is the other node's now: don't move it or hand
+    its results on, give up on it instead.
+    """
+    lease_file = lease_path(path)
+    with _held_lock:
+        if lease_file in _lost:
+            return True
+        token = _held.get(lease_file)
+    if token is None or _read_token(lease_file) == token:
+        return False
+    _mark_lost(lease_file)
+    return True
+
+
+def _mark_lost(lease_file):
+    logger.warning(f"Lost lease {os.path.basename(lease_file)} to another node")
+    with _held_lock:
+        _held.pop(lease_file, None)
+        _lost.add(lease_file)
+
+
+def _release_lease(lease_file):
+    with _held_lock:
+        _lost.discard(lease_file)
+        token = _held.pop(lease_file, None)
+    if token is not None and _read_token(lease_file) == token:
+        try:
+            os.remove(lease_file)
+        except FileNotFoundError:
+            pass
+
+
+def release_all():
+    """
+    Release every lease this process holds and stop the heartbeat.
+    """
+    with _held_lock:
+        lease_files = list(_held)
+        _lost.clear()
+    for lease_file in lease_files:
+        _release_lease(lease_file)
+    global _heartbeat_thread
+    if _heartbeat_thread is not None:
+        _heartbeat_stop.set()
+        _heartbeat_thread.join()
+        _heartbeat_thread = None
+        _heartbeat_stop.clear()
+
+
+def renew_leases():
+    """
+    Touch every held lease so other nodes see it is still alive. Leases another node has
+    reclaimed (e.g. after this process was suspended past the TTL) are marked lost, see lost().
+    """
+    with _held_lock:
+        held = list(_held.items())
+    for lease_file, token in held:
+        if _read_token(lease_file) != token:
+            _mark_lost(lease_file)
+            continue
+        try:
+            os.utime(lease_file)
+        except FileNotFoundError:
+            pass
+
+
+def _heartbeat(interval):
+    while not _heartbeat_stop.wait(interval):
+        renew_leases()
+
+
+def _start_heartbeat(interval):
+    global _heartbeat_thread
+    with _held_lock:
+        if _heartbeat_thread is None:
+            _heartbeat_thread = threading.Thread(target=_heartbeat, args=(interval,), name="lease-heartbeat", daemon=True)
+            _heartbeat_thread.start()
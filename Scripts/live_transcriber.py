@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from .pipeline import Pipeline
+from .transcriber_utils import (SAMPLE_RATE, transcribe_segments, get_transcript_settings, format_segment, preload_transcription_model,
+                                get_folder_language, set_language)
+from .media_probe import probe_media, format_duration
+from .queue_scanner import scan_queue, TRANSCRIPT_SUFFIX
+from .output_writer import wait_for_output_moves
+from .archiver import wait_for_archive_jobs
+from .leases import claim, release, release_all
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Recordings tailed at the same time share the model, their windows are transcribed one at a time
+_transcribe_lock = threading.Lock()
+
+
+def get_live_config(config):
+    """
+    Return the live section of the config with defaults filled in.
+    """
+    live_config = config.get('live', {}) or {}
+    return {
+        'window_seconds': max(5.0, float(live_config.get('window_seconds', 30))),
+        'idle_seconds': float(live_config.get('idle_seconds', 15)),
+        'poll_seconds': float(live_config.get('poll_seconds', 2)),
+    }
+
+
+def read_pcm_window(path, info, start_seconds, max_seconds):
+    """
+    Read up to max_seconds of a 16-bit PCM WAV's samples from start_seconds, as 16 kHz mono
+    float32. Other sample rates and channel counts are mixed down and resampled linearly.
+    Returns the samples and the seconds of the recording they cover.
+    """
+    rate, channels = info.sample_rate, info.channels
+    frame_bytes = 2 * channels
+    first_frame = int(round(start_seconds * rate))
+    frames = max(0, min(int(info.duration * rate) - first_frame, int(max_seconds * rate)))
+    with open(path, "rb") as f:
+        f.seek(info.data_offset + first_frame * frame_bytes)
+        data = f.read(frames * frame_bytes)
+    frames = len(data) // frame_bytes
+    samples = np.frombuffer(data[:frames * frame_bytes], dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and frames:
+        positions = np.arange(0, frames, rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(frames), samples).astype(np.float32)
+    return samples, frames / rate
+
+
+def _load_progress(live_path, state_path):
+    if os.path.exists(live_path) and os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            return float(json.load(f)['committed_seconds'])
+    open(live_path, "w", encoding="utf-8").close()
+    return 0.0
+
+
+def _save_progress(live_path, state_path, segments, offset, committed, timestamps):
+    """
+    Append a window's segments to the live transcript and record how far the recording has
+    been transcribed, flushed to disk so an interrupted meeting resumes where it left off.
+    """
+    separator = "\n" if timestamps else " "
+    with open(live_path, "a", encoding="utf-8") as f:
+        for start, _, text in segments:
+            f.write(format_segment(text, offset + start, None, timestamps).strip() + separator)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(state_path + ".partial", "w", encoding="utf-8") as f:
+        json.dump({'committed_seconds': committed}, f)
+    os.replace(state_path + ".partial", state_path)
+
+
+def tail_recording(path, pipeline, stop_event=None):
+    """
+    Transcribe a WAV recording while it is still being written. Whenever window_seconds of new
+    audio have arrived they are transcribed and the segments appended to a hidden live
+    transcript next to the recording. The last segment of a window may be cut off, so the next
+    window starts where it started instead of keeping it. Once the file hasn't grown for
+    idle_seconds the rest is transcribed, the transcript is put in place and the recording is
+    summarized and moved like any other, so a summary arrives about one window plus the summary
+    call after the meeting ends. Live windows are transcribed at normal speed without VAD.
+
+    Returns a PipelineResult, or None if stop_event was set first (progress is kept, and the
+    next call picks up from it) or nothing was transcribed.
+    """
+    config = pipeline.config
+    live_config = get_live_config(config)
+    stop_event = stop_event or threading.Event()
+    folder, filename = os.path.split(path)
+    transcript_path = os.path.join(folder, os.path.splitext(filename)[0] + TRANSCRIPT_SUFFIX)
+    live_path = os.path.join(folder, f".{os.path.basename(transcript_path)}.live")
+    state_path = live_path + ".json"
+    timestamps = get_transcript_settings(config)[2]
+    config, record_language = get_folder_language(config, folder)
+
+    def use_language(language):
+        # The language detected on the first window with speech is kept for the rest of the recording
+        nonlocal config
+        config = set_language(config, language)
+        record_language(language)
+
+    committed = _load_progress(live_path, state_path)
+    print(f"Live transcribing {filename}" + (f", resuming at {format_duration(committed)}" if committed else ""))
+    last_size, last_growth = None, time.monotonic()
+    while not stop_event.is_set():
+        size = os.path.getsize(path)
+        now = time.monotonic()
+        if size != last_size:
+            last_size, last_growth = size, now
+        finished = now - last_growth >= live_config['idle_seconds']
+
+        info = probe_media(path)
+        if info is not None and info.container == "wav" and info.codec != "pcm_s16le":
+            raise ValueError(f"{filename} is {info.codec}, only 16-bit PCM WAV can be transcribed live")
+        pending = info.duration - committed if info is not None and info.duration is not None else 0
+        if pending >= live_config['window_seconds'] or (finished and pending > 0):
+            samples, read_seconds = read_pcm_window(path, info, committed, live_config['window_seconds'])
+            last_window = finished and read_seconds >= pending - 1e-3
+            with _transcribe_lock:
+                segments = transcribe_segments(samples, config, use_language if record_language else None)
+            advance = read_seconds
+            if not last_window and len(segments) > 1 and segments[-1][0] >= 1.0:
+                # The last segment may run past the end of the window, transcribe it again with the next one
+                advance = segments[-1][0]
+                segments = segments[:-1]
+            _save_progress(live_path, state_path, segments, committed, committed + advance, timestamps)
+            committed += advance
+            logger.info(f"{filename}: transcribed up to {format_duration(committed)}")
+            continue
+        if finished:
+            break
+        stop_event.wait(live_config['poll_seconds'])
+
+    if stop_event.is_set():
+        return None
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    if os.path.getsize(live_path) == 0:
+        os.remove(live_path)
+        print(f"No speech transcribed from {filename}")
+        return None
+    os.replace(live_path, transcript_path)
+    print(f"Recording finished, transcript saved: {transcript_path}")
+    return pipeline.finish_recording(path, transcript_path)
+
+
+def watch_queue(config, pipeline=None):
+    """
+    Live mode: watch the queue's summary folders and tail every WAV recording that appears,
+    each on its own thread, until interrupted. Other formats can't be read while they are
+    written and are left for a normal run.
+    """
+    pipeline = pipeline or Pipeline(config)
+    live_config = get_live_config(config)
+    queue_folder = config['meeting_recordings_folder']
+    preload_transcription_model(config)
+    stop_event = threading.Event()
+    tailing = {}
+    skipped = set()
+
+    def tail(path):
+        transcript_path = os.path.splitext(path)[0] + TRANSCRIPT_SUFFIX
+        claim(transcript_path, config, must_exist=False)
+        try:
+            if tail_recording(path, pipeline, stop_event) is None and not stop_event.is_set():
+                # Nothing to summarize, don't transcribe it again on the next scan
+                skipped.add(path)
+        except Exception as e:
+            logger.error(f"Live transcription of {os.path.basename(path)} failed: {str(e)}")
+            skipped.add(path)
+        finally:
+            release(transcript_path)
+            release(path)
+
+    print(f"Watching {queue_folder} for recordings (Ctrl+C to stop)...")
+    try:
+        while True:
+            for item in scan_queue(queue_folder).audio:
+                if item.path in tailing or item.path in skipped:
+                    continue
+                if os.path.splitext(item.filename)[1].lower() != ".wav":
+                    print(f"{item.filename} isn't a WAV recording, leaving it for a normal run")
+                    skipped.add(item.path)
+                    continue
+                if not claim(item.path, config):
+                    continue
+                tailing[item.path] = threading.Thread(target=tail, args=(item.path,), name=f"live-{item.filename}", daemon=True)
+                tailing[item.path].start()
+            for path, thread in list(tailing.items()):
+                if not thread.is_alive():
+                    del tailing[path]
+            time.sleep(live_config['poll_seconds'])
+    except KeyboardInterrupt:
+        print("\nStopping, unfinished recordings will resume where they left off...")
+        stop_event.set()
+        for thread in tailing.values():
+            thread.join()
+    finally:
+        wait_for_output_moves()
+        wait_for_archive_jobs()
+        release_all()
@@ -1,17 +1,79 @@
 import os
+import logging
+import threading
 from dotenv import load_dotenv
+from .profiler import profiled
 
 load_dotenv()
 
-def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, client_type="default", base_url=None):
+# SDK clients are built once per run and reused, so each summary doesn't pay for the SDK
+# import, client construction and a fresh connection pool (and TLS handshake) again
+_clients = {}
+# Providers whose client takes llm.base_url (a proxy or local stand-in); the others ignore it
+BASE_URL_CLIENT_TYPES = ("openai", "local_openai", "anthropic")
+_clients_lock = threading.Lock()
+
+def _make_client(client_type, base_url=None):
     if client_type == "openai" or client_type == "local_openai":
         from openai import OpenAI
         if client_type == "openai":
             api_key = os.getenv("OPENAI_API_KEY")
         else:
             api_key = os.getenv("LOCAL_LLM_API_KEY", "not-needed")
-        
-        client = OpenAI(api_key=api_key, base_url=base_url)
+        return OpenAI(api_key=api_key, base_url=base_url)
+    elif client_type == "groq":
+        from groq import Groq
+        return Groq(api_key=os.getenv("GROQ_API_KEY"))
+    elif client_type == "anthropic":
+        from anthropic import Anthropic
+        if base_url:
+            return Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), base_url=base_url)
+        return Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    elif client_type == "gemini":
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+        return genai
+    elif client_type == "replicate":
+        import replicate
+        return replicate.Client(api_token=os.getenv("REPLICATE_API_KEY"))
+    elif client_type == "togetherai":
+        from openai import OpenAI
+        return OpenAI(
+            api_key=os.getenv("TOGETHERAI_API_KEY"),
+            base_url="https://api.together.xyz/v1",
+        )
+    else:
+        raise ValueError(f"Unsupported client type: {client_type}")
+
+def get_llm_client(client_type, base_url=None):
+    """
+    Return the shared SDK client for a provider, creating it on first use. Only the OpenAI and
+    Anthropic clients take a base_url, so the others are shared however base_url was passed.
+    Batch and direct calls both get their clients here.
+    """
+    key = (client_type, base_url if client_type in BASE_URL_CLIENT_TYPES else None)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = _make_client(client_type, base_url)
+        return _clients[key]
+
+def preload_llm_client(client_type, base_url=None):
+    """
+    Build the provider's client on a background thread so the SDK import is out of the way
+    by the time the first summary is requested. Failures are left for call_llm_api to report.
+    """
+    def preload():
+        try:
+            get_llm_client(client_type, base_url)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Could not preload the {client_type} client: {str(e)}")
+
+    threading.Thread(target=preload, name="llm-client-preload", daemon=True).start()
+
+@profiled("call_llm_api")
+def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, client_type="default", base_url=None):
+    if client_type == "openai" or client_type == "local_openai":
+        client = get_llm_client(client_type, base_url)
         response = client.chat.completions.create(
             model=model,
             messages=[
@@ -24,8 +86,7 @@ def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, c
         response_content = response.choices[0].message.content
         return response_content
     elif client_type == "groq":
-        from groq import Groq
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        client = get_llm_client(client_type)
         chat_completion = client.chat.completions.create(
             model=model,
             max_tokens=max_tokens,
@@ -38,8 +99,7 @@ def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, c
         response_content = chat_completion.choices[0].message.content
         return response_content
     elif client_type == "anthropic":
-        from anthropic import Anthropic
-        client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        client = get_llm_client(client_type, base_url)
         chat_completion = client.messages.create(
             model=model,
             max_tokens=max_tokens,
@@ -53,12 +113,9 @@ def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, c
         except (IndexError, AttributeError) as e:
             raise ValueError(f"Error parsing Anthropic response: {e}")
     elif client_type == "gemini":
-        from google.generativeai import GenerativeModel
-        from google.generativeai import configure
+        genai = get_llm_client(client_type)
         from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
-        configure(api_key=os.environ["GEMINI_API_KEY"])
-
         generation_config = {
             "temperature": temperature,
             "top_p": 0.95,
@@ -67,7 +124,7 @@ def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, c
             "response_mime_type": "text/plain",
         }
 
-        gemini_model = GenerativeModel(
+        gemini_model = genai.GenerativeModel(
             model_name=model,
             generation_config=generation_config,
             system_instruction=systemPrompt,
@@ -88,8 +145,7 @@ def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, c
         except (IndexError, AttributeError) as e:
             raise ValueError(f"Error parsing Gemini response: {e}")
     elif client_type == "replicate":
-        import replicate
-        client = replicate.Client(api_token=os.getenv("REPLICATE_API_KEY"))
+        client = get_llm_client(client_type)
         output = client.run(
             model,
             input={
@@ -106,12 +162,7 @@ def call_llm_api(model, content, systemPrompt, max_tokens=4000, temperature=0, c
         response_content = "".join(output)
         return response_content
     elif client_type == "togetherai":
-        from openai import OpenAI
-
-        client = OpenAI(
-            api_key=os.getenv("TOGETHERAI_API_KEY"),
-            base_url="https://api.together.xyz/v1",
-        )
+        client = get_llm_client(client_type)
 
         response = client.chat.completions.create(
             model=model,
@@ -0,0 +1,304 @@
+import os
+import json
+import shutil
+import struct
+import logging
+import subprocess
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+class MediaInfo(NamedTuple):
+    container: str               # "wav", "flac", "mp4", "mp3" or ffprobe's format name
+    codec: Optional[str]         # e.g. "pcm_s16le", "flac", "aac", "mp3"
+    duration: Optional[float]    # seconds
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    data_offset: Optional[int] = None  # Byte offset of the PCM samples, WAV only
+    comment: Optional[str] = None      # LIST/INFO ICMT comment, WAV only
+
+
+def probe_wav(f, file_size):
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] not in (b"RIFF", b"RF64") or riff[8:12] != b"WAVE":
+        return None
+    codec = sample_rate = channels = byte_rate = comment = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size)
+            audio_format, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+            if audio_format == 0xFFFE and len(fmt) >= 26:
+                # WAVE_FORMAT_EXTENSIBLE, the real format is the start of the sub-format GUID
+                audio_format = struct.unpack("<H", fmt[24:26])[0]
+            if audio_format == 1:
+                codec = f"pcm_s{bits}le" if bits > 8 else "pcm_u8"
+            elif audio_format == 3:
+                codec = f"pcm_f{bits}le"
+            else:
+                codec = f"wav_format_{audio_format:#06x}"
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b"LIST":
+            info = f.read(chunk_size + (chunk_size % 2))
+            if info[:4] == b"INFO":
+                comment = _read_info_comment(info[4:chunk_size]) or comment
+        elif chunk_id == b"data":
+            data_offset = f.tell()
+            # Recorders that are still writing (or streamed WAVs) leave the size as 0 or 0xFFFFFFFF
+            if chunk_size in (0, 0xFFFFFFFF) or data_offset + chunk_size > file_size:
+                chunk_size = file_size - data_offset
+            duration = chunk_size / byte_rate if byte_rate else None
+            return MediaInfo("wav", codec, duration, sample_rate, channels, data_offset, comment)
+        else:
+            f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+
+def _read_info_comment(info):
+    offset = 0
+    while offset + 8 <= len(info):
+        sub_id, sub_size = struct.unpack("<4sI", info[offset:offset + 8])
+        if sub_id == b"ICMT":
+            return info[offset + 8:offset + 8 + sub_size].rstrip(b"\x00").decode("utf-8", errors="replace")
+        offset += 8 + sub_size + (sub_size % 2)
+    return None
+
+
+def probe_flac(f):
+    if f.read(4) != b"fLaC":
+        return None
+    header = f.read(4)
+    if len(header) < 4 or header[0] & 0x7F != 0:
+        return None
+    streaminfo = f.read(34)
+    if len(streaminfo) < 34:
+        return None
+    # 20 bits sample rate, 3 bits channels - 1, 5 bits bits-per-sample - 1, 36 bits total samples
+    packed = int.from_bytes(streaminfo[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    duration = total_samples / sample_rate if sample_rate and total_samples else None
+    return MediaInfo("flac", "flac", duration, sample_rate, channels)
+
+
+def _iter_boxes(f, end):
+    while f.tell() + 8 <= end:
+        start = f.tell()
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - start
+        if size < header_size:
+            return
+        yield box_type, start + header_size, start + size
+        f.seek(start + size)
+
+
+def _find_box(f, start, end, box_type):
+    f.seek(start)
+    for found_type, body_start, body_end in _iter_boxes(f, end):
+        if found_type == box_type:
+            return body_start, body_end
+    return None
+
+
+def probe_mp4(f, file_size):
+    f.seek(4)
+    if f.read(4) not in (b"ftyp", b"moov", b"mdat", b"wide", b"free"):
+        return None
+    # The moov box may sit after a large mdat; the box walk seeks past it without reading it
+    moov = _find_box(f, 0, file_size, b"moov")
+    if not moov:
+        return None
+    duration = codec = sample_rate = channels = None
+    mvhd = _find_box(f, moov[0], moov[1], b"mvhd")
+    if mvhd:
+        f.seek(mvhd[0])
+        version = f.read(1)[0]
+        f.seek(3, os.SEEK_CUR)
+        if version == 1:
+            f.seek(16, os.SEEK_CUR)
+            timescale, movie_duration = struct.unpack(">IQ", f.read(12))
+        else:
+            f.seek(8, os.SEEK_CUR)
+            timescale, movie_duration = struct.unpack(">II", f.read(8))
+        if timescale and movie_duration:
+            duration = movie_duration / timescale
+        elif timescale:
+            # Fragmented MP4/MOV (OBS, browsers, screen recorders) leave mvhd at 0 and keep the length in
+            # the fragments, so 0 only means empty without an mvex box. mehd holds the total if written.
+            mvex = _find_box(f, moov[0], moov[1], b"mvex")
+            mehd = mvex and _find_box(f, mvex[0], mvex[1], b"mehd")
+            if mehd:
+                f.seek(mehd[0])
+                version = f.read(1)[0]
+                f.seek(3, os.SEEK_CUR)
+                fragment_duration = struct.unpack(">Q" if version == 1 else ">I", f.read(8 if version == 1 else 4))[0]
+                duration = fragment_duration / timescale or None
+            elif not mvex:
+                duration = 0.0
+
+    f.seek(moov[0])
+    traks = [(body_start, body_end) for box_type, body_start, body_end in _iter_boxes(f, moov[1]) if box_type == b"trak"]
+    for trak_start, trak_end in traks:
+        mdia = _find_box(f, trak_start, trak_end, b"mdia")
+        if not mdia:
+            continue
+        hdlr = _find_box(f, mdia[0], mdia[1], b"hdlr")
+        if not hdlr:
+            continue
+        f.seek(hdlr[0] + 8)
+        if f.read(4) != b"soun":
+            continue
+        minf = _find_box(f, mdia[0], mdia[1], b"minf")
+        stbl = minf and _find_box(f, minf[0], minf[1], b"stbl")
+        stsd = stbl and _find_box(f, stbl[0], stbl[1], b"stsd")
+        if not stsd:
+            continue
+        # stsd: version/flags, entry count, then the first sample entry box
+        f.seek(stsd[0] + 8)
+        entry_header = f.read(8)
+        if len(entry_header) < 8:
+            continue
+        entry_type = entry_header[4:8]
+        entry = f.read(28)
+        if len(entry) < 28:
+            continue
+        channels = struct.unpack(">H", entry[16:18])[0]
+        sample_rate = struct.unpack(">I", entry[24:28])[0] >> 16
+        codec = {b"mp4a": "aac", b"alac": "alac", b"Opus": "opus", b"fLaC": "flac", b"ac-3": "ac3", b"ec-3": "eac3"}.get(
+            entry_type, entry_type.decode("latin-1").strip())
+        break
+    return MediaInfo("mp4", codec, duration, sample_rate, channels)
+
+
+MP3_BITRATES = {
+    (3, 1): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],   # MPEG-1 Layer III
+    (2, 1): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],        # MPEG-2/2.5 Layer III
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def probe_mp3(f, file_size):
+    header = f.read(10)
+    offset = 0
+    if header[:3] == b"ID3" and len(header) == 10:
+        offset = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+    # Look for the first frame sync within the first few KB after any ID3 tag
+    f.seek(offset)
+    data = f.read(4096)
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or (data[i + 1] & 0xE0) != 0xE0:
+            continue
+        version = (data[i + 1] >> 3) & 0x3
+        layer = (data[i + 1] >> 1) & 0x3
+        bitrate_index = data[i + 2] >> 4
+        sample_rate_index = (data[i + 2] >> 2) & 0x3
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            continue
+        bitrate = MP3_BITRATES[(3 if version == 3 else 2, 1)][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+        channels = 1 if (data[i + 3] >> 6) == 3 else 2
+        samples_per_frame = 1152 if version == 3 else 576
+        # A Xing/Info header in the first frame carries the frame count for VBR files
+        side_info = (32 if channels == 2 else 17) if version == 3 else (17 if channels == 2 else 9)
+        xing_at = i + 4 + side_info
+        if data[xing_at:xing_at + 4] in (b"Xing", b"Info") and struct.unpack(">I", data[xing_at + 4:xing_at + 8])[0] & 0x1:
+            frames = struct.unpack(">I", data[xing_at + 8:xing_at + 12])[0]
+            duration = frames * samples_per_frame / sample_rate
+        else:
+            duration = (file_size - offset - i) * 8 / bitrate
+        return MediaInfo("mp3", "mp3", duration, sample_rate, channels)
+    return None
+
+
+def probe_with_ffprobe(path):
+    if not shutil.which("ffprobe"):
+        return None
+    try:
+        result = subprocess.run([
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=format_name,duration:stream=codec_type,codec_name,sample_rate,channels",
+            "-of", "json", path
+        ], check=True, capture_output=True, text=True)
+        probe = json.loads(result.stdout)
+    except (subprocess.CalledProcessError, ValueError) as e:
+        logger.warning(f"ffprobe failed for {path}: {str(e)}")
+        return None
+    audio = next((stream for stream in probe.get("streams", []) if stream.get("codec_type") == "audio"), {})
+    duration = probe.get("format", {}).get("duration")
+    return MediaInfo(
+        probe.get("format", {}).get("format_name", "unknown"),
+        audio.get("codec_name"),
+        float(duration) if duration else None,
+        int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+        audio.get("channels"),
+    )
+
+
+def probe_media(path):
+    """
+    Read a recording's container, codec, duration, sample rate and channel count from its
+    header without decoding it. WAV, FLAC, MP4/M4A/MOV and MP3 are parsed directly, so
+    probing costs the same few reads whatever the file's length; anything else falls back
+    to ffprobe if it is installed. Returns None if the file can't be probed.
+    """
+    try:
+        file_size = os.path.getsize(path)
+        if file_size == 0:
+            return MediaInfo("empty", None, 0.0, None, None)
+        with open(path, "rb") as f:
+            extension = os.path.splitext(path)[1].lower()
+            parsers = {
+                ".wav": lambda: probe_wav(f, file_size),
+                ".flac": lambda: probe_flac(f),
+                ".mp3": lambda: probe_mp3(f, file_size),
+            }
+            parser = parsers.get(extension, lambda: probe_mp4(f, file_size) if extension in (".mp4", ".m4a", ".mov") else None)
+            info = parser()
+    except (OSError, struct.error, IndexError) as e:
+        logger.warning(f"Could not read media header of {path}: {str(e)}")
+        info = None
+    if info is not None and info.duration is None and info.container == "mp4":
+        # A fragmented MP4 without a total length, ffprobe can work it out from the fragments
+        return probe_with_ffprobe(path) or info
+    return info or probe_with_ffprobe(path)
+
+
+@lru_cache(maxsize=4096)
+def _probe_cached(path, size, mtime):
+    return probe_media(path)
+
+
+def probe_item(item):
+    """
+    probe_media for a queue WorkItem, cached on path, size and mtime so every stage can ask.
+    """
+    return _probe_cached(item.path, item.size, item.mtime)
+
+
+def is_whisper_native_wav(info):
+    """
+    True if a file is already 16 kHz mono 16-bit PCM WAV, the format Whisper works in,
+    so it can be read directly without an ffmpeg conversion.
+    """
+    return (info is not None and info.container == "wav" and info.codec == "pcm_s16le"
+            and info.sample_rate == WHISPER_SAMPLE_RATE and info.channels == 1)
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds or 0))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
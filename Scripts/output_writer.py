@@ -0,0 +1,105 @@
+import os
+import errno
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cross-device moves of files at least this large are copied by the background I/O thread
+DEFAULT_BACKGROUND_COPY_MB = 64
+
+_io_executor = None
+_pending_moves = []
+
+
+def get_background_copy_bytes(config):
+    output_config = config.get('output_structure', {}) or {}
+    return int(float(output_config.get('background_copy_mb', DEFAULT_BACKGROUND_COPY_MB)) * 1024 * 1024)
+
+
+def staging_path(destination_path):
+    """
+    Hidden temporary name next to the destination, so the copy lands on the destination's
+    filesystem and the queue scanner and other readers never see a half-written file.
+    """
+    directory, filename = os.path.split(destination_path)
+    return os.path.join(directory, f".{filename}.{os.getpid()}.partial")
+
+
+def copy_then_replace(source_path, destination_path):
+    """
+    Copy a file to a staging name beside the destination, flush it to disk, atomically
+    rename it into place and only then remove the source.
+    """
+    staged_path = staging_path(destination_path)
+    try:
+        with open(source_path, "rb") as source, open(staged_path, "wb") as staged:
+            shutil.copyfileobj(source, staged, 1024 * 1024)
+            staged.flush()
+            os.fsync(staged.fileno())
+        shutil.copystat(source_path, staged_path)
+        os.replace(staged_path, destination_path)
+    except BaseException:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        raise
+    os.remove(source_path)
+
+
+def atomic_move(source_path, destination_path, background_copy_bytes=0, on_complete=None):
+    """
+    Move a file so it appears at its destination complete or not at all.
+
+    Within one filesystem this is a single rename. Across filesystems (EXDEV, e.g. a local
+    queue and an NFS output folder) the file is copied to a staging name on the destination
+    and renamed into place. Copies of files of at least background_copy_bytes are handed to a
+    background I/O thread so the caller isn't blocked; wait_for_output_moves waits for them.
+    on_complete is called once the file is in place, from whichever thread moved it.
+    Returns True if the move has completed, False if it was queued.
+    """
+    def move():
+        try:
+            os.replace(source_path, destination_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            copy_then_replace(source_path, destination_path)
+        if on_complete:
+            on_complete()
+
+    if background_copy_bytes and os.path.getsize(source_path) >= background_copy_bytes and not same_device(source_path, destination_path):
+        _pending_moves.append((destination_path, _get_io_executor().submit(move)))
+        return False
+    move()
+    return True
+
+
+def same_device(source_path, destination_path):
+    try:
+        return os.stat(source_path).st_dev == os.stat(os.path.dirname(destination_path) or ".").st_dev
+    except OSError:
+        return False
+
+
+def _get_io_executor():
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output-io")
+    return _io_executor
+
+
+def wait_for_output_moves():
+    """
+    Block until background copies to the output folder have finished.
+    """
+    if _pending_moves:
+        print(f"Waiting for {len(_pending_moves)} background file move(s) to finish...")
+    while _pending_moves:
+        destination_path, move = _pending_moves.pop(0)
+        try:
+            move.result()
+        except Exception as e:
+            logger.error(f"Background move to {destination_path} failed, the file is still in the queue: {str(e)}")
@@ -0,0 +1,185 @@
+import os
+import time
+import logging
+import numpy as np
+from typing import NamedTuple
+from .config_handler import get_config
+from .audio_extractor import extract_audio, get_extraction_config, decode_audio_bytes
+from .transcriber import transcribe_audio_flow
+from .transcriber_utils import (SAMPLE_RATE, load_audio, load_audio_faster_whisper, read_native_wav_bytes,
+                                transcribe_samples, load_transcription_model)
+from .transcript_cleaner import clean_transcript
+from .summarizer import summarize_transcript, summarize_text, generate_summaries, save_summary, get_summary_rule_sets
+from .llm_utils import get_llm_client
+from .queue_scanner import VIDEO_EXTENSIONS, TRANSCRIPT_SUFFIX
+from .leases import claim, release, lost
+from .autotune import apply_autotune
+from .utils import move_file
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def check_claimed(*paths):
+    """
+    Raise if another node has reclaimed any of the files, so they aren't moved a second time.
+    """
+    for path in paths:
+        if lost(path):
+            raise RuntimeError(f"{os.path.basename(path)} was taken over by another worker, abandoning it")
+
+
+class Transcription(NamedTuple):
+    text: str
+    audio_seconds: float       # Length of the recording
+    processing_seconds: float  # Time spent decoding and transcribing it
+
+
+class PipelineResult(NamedTuple):
+    transcript: str
+    summaries: dict  # Summary name ('summary' for the folder's summary-rules.txt) -> summary text
+
+
+class Pipeline:
+    """
+    The transcription and summary pipeline as an in-process API, for embedding it in other
+    programs. It holds the config; the transcription model and LLM client are loaded on first
+    use (or by warm_up) and shared by every call.
+
+    transcribe and summarize work on data in memory and return results without touching the
+    queue. process, and the *_file methods the folder flow in file_processor is built on,
+    work on files in a summary folder and move them to the output folder.
+    """
+
+    def __init__(self, config=None):
+        self.config = config if config is not None else apply_autotune(get_config())
+
+    def warm_up(self):
+        """
+        Load the transcription model and LLM client now rather than on the first call.
+        """
+        load_transcription_model(self.config)
+        llm_config = self.config.get('llm') or {}
+        if llm_config.get('client_type'):
+            get_llm_client(llm_config['client_type'], llm_config.get('base_url'))
+        return self
+
+    def decode(self, audio, tempo=1.0):
+        """
+        Decode audio to 16 kHz mono float32 samples. audio can be a file path, the bytes of a
+        recording, a binary stream, or samples that are already decoded (used as they are).
+        """
+        if isinstance(audio, np.ndarray):
+            return audio.astype(np.float32, copy=False)
+        if isinstance(audio, (str, os.PathLike)):
+            decode = load_audio if self.config.get('transcription_engine', 'whisper') == 'whisper' else load_audio_faster_whisper
+            return decode(os.fspath(audio), tempo)
+        if hasattr(audio, "read"):
+            audio = audio.read()
+        data = bytes(audio)
+        samples = read_native_wav_bytes(data) if tempo == 1.0 else None
+        return samples if samples is not None else decode_audio_bytes(data, tempo, SAMPLE_RATE)
+
+    def transcribe(self, audio, tempo=1.0):
+        """
+        Transcribe a recording (see decode for what audio can be) and return a Transcription.
+        A tempo above 1.0 transcribes it played back faster.
+        """
+        start_time = time.perf_counter()
+        samples = self.decode(audio, tempo)
+        text = transcribe_samples(samples, self.config, tempo)
+        return Transcription(text, len(samples) * tempo / SAMPLE_RATE, time.perf_counter() - start_time)
+
+    def summarize(self, text, rules=None, folder=None):
+        """
+        Summarize transcript text. rules is a summary prompt, or a dict of summary name to prompt;
+        without rules, the summaries configured for a summary folder are used. Returns a dict of
+        summary name ('summary' for a single prompt or the folder's summary-rules.txt) to summary.
+        """
+        if isinstance(rules, str):
+            rule_sets = [(None, rules)]
+        elif rules:
+            rule_sets = list(rules.items())
+        elif folder:
+            rule_sets = get_summary_rule_sets(folder)
+        else:
+            raise ValueError("summarize needs rules or a summary folder")
+        llm_config = self.config.get('llm')
+        if not llm_config:
+            raise ValueError("'llm' configuration not found in config")
+        text, _ = clean_transcript(text, self.config)
+        return {summary_name or "summary": summary for summary_name, summary in summarize_text(text, rule_sets, llm_config)}
+
+    def extract_audio_file(self, video_path, output_folder):
+        """
+        Extract a video's audio to a WAV file in output_folder and return its path.
+        """
+        return extract_audio(video_path, output_folder, extraction_config=get_extraction_config(self.config))
+
+    def transcribe_file(self, audio_file_path):
+        """
+        Transcribe a recording in a summary folder to <name>_transcript.md next to it, using the
+        folder's playback speed. Returns the transcript path, or None if nothing was transcribed.
+        """
+        return transcribe_audio_flow(audio_file_path, os.path.dirname(audio_file_path), self.config)
+
+    def summarize_file(self, transcript_path):
+        """
+        Summarize a transcript with its folder's rules, saving each summary to the output folder.
+        """
+        return summarize_transcript(transcript_path, self.config)
+
+    def process(self, path, on_stage=None):
+        """
+        Take one recording in a summary folder through every stage straight away: extract the audio
+        of a video, transcribe, summarize and move everything to the output folder, as the folder
+        flow would. on_stage(stage) is called as each stage starts. Returns a PipelineResult.
+        The recording, the audio extracted from it and its transcript stay claimed until each has
+        left the queue, so a folder run on the same queue leaves them alone.
+        """
+        on_stage = on_stage or (lambda stage: None)
+        folder = os.path.dirname(path)
+        audio_path = path
+        expected_transcript_path = None
+        claim(path, self.config, must_exist=False)
+        try:
+            if os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS:
+                on_stage("extracting")
+                audio_path = self.extract_audio_file(path, folder)
+                claim(audio_path, self.config, must_exist=False)
+                check_claimed(path)
+                move_file(path, self.config, on_complete=lambda archived_path: release(path))
+
+            on_stage("transcribing")
+            expected_transcript_path = os.path.splitext(audio_path)[0] + TRANSCRIPT_SUFFIX
+            claim(expected_transcript_path, self.config, must_exist=False)
+            transcript_path = self.transcribe_file(audio_path)
+            if not transcript_path:
+                raise RuntimeError(f"Transcription failed for {os.path.basename(audio_path)}")
+            return self.finish_recording(audio_path, transcript_path, on_stage)
+        except BaseException:
+            for held_path in (path, audio_path, expected_transcript_path):
+                if held_path:
+                    release(held_path)
+            raise
+
+    def finish_recording(self, audio_path, transcript_path, on_stage=None):
+        """
+        Summarize a recording's finished transcript and move the recording, transcript and
+        summaries to the output folder. Returns a PipelineResult.
+        """
+        on_stage = on_stage or (lambda stage: None)
+        check_claimed(audio_path, transcript_path)
+        # Claims on the files are given up once each has left the queue
+        move_file(audio_path, self.config, on_complete=lambda archived_path: release(audio_path))
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            transcript = f.read()
+
+        on_stage("summarizing")
+        summaries = generate_summaries(transcript_path, self.config)
+        check_claimed(transcript_path)
+        for summary_name, summary in summaries:
+            save_summary(transcript_path, summary, self.config, summary_name)
+        move_file(transcript_path, self.config, on_complete=lambda archived_path: release(transcript_path))
+        return PipelineResult(transcript, {summary_name or "summary": summary for summary_name, summary in summaries})
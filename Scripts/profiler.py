@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from collections import defaultdict
+
+MB = 1024 * 1024
+
+# None while profiling is off, so a profiled function costs one global lookup and a call
+_settings = None
+_lock = threading.Lock()
+_local = threading.local()
+_events = []
+_thread_names = {}
+_stage_stats = defaultdict(list)
+
+
+class _StatsSnapshot:
+    """
+    Profile statistics that came back from a worker process, in the form pstats.Stats loads.
+    """
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def enable_profiling(folder, memory=False):
+    """
+    Start collecting per-stage profiles, a trace-event timeline and (with memory) tracemalloc
+    samples. write_profile saves them to folder.
+    """
+    global _settings
+    start_tracing = memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    _settings = {'folder': folder, 'memory': memory, 'started_tracemalloc': start_tracing}
+    print(f"Profiling enabled, results will be written to {folder}")
+
+
+def disable_profiling():
+    """
+    Stop profiling and drop everything collected so far.
+    """
+    global _settings
+    if _settings is not None and _settings['started_tracemalloc']:
+        tracemalloc.stop()
+    _settings = None
+    reset_for_worker()
+
+
+def is_profiling():
+    return _settings is not None
+
+
+def profiled(stage):
+    """
+    Decorator marking a function as a pipeline stage. While profiling is enabled every call is
+    profiled with cProfile (merged per stage) and recorded on the timeline; otherwise the
+    function is called straight through.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _settings is None:
+                return function(*args, **kwargs)
+            return _run_profiled(stage, function, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def _run_profiled(stage, function, args, kwargs):
+    # cProfile can't nest within a thread, so a stage called from inside another stage is only
+    # timed, its profile is part of the outer stage's
+    depth = getattr(_local, "depth", 0)
+    profile = cProfile.Profile() if depth == 0 else None
+    memory = _settings['memory']
+    memory_before = tracemalloc.get_traced_memory()[0] if memory else 0
+    _local.depth = depth + 1
+    start = time.perf_counter_ns()
+    try:
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is already active in this thread
+                profile = None
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+    finally:
+        end = time.perf_counter_ns()
+        _local.depth = depth
+        _record(stage, start, end, profile, args, memory_before if memory else None)
+
+
+def _record(stage, start, end, profile, args, memory_before):
+    thread = threading.current_thread()
+    event_args = {}
+    if args and isinstance(args[0], str):
+        event_args['input'] = os.path.basename(args[0])
+    events = [{
+        'name': stage, 'cat': "stage", 'ph': "X", 'pid': os.getpid(), 'tid': thread.ident,
+        'ts': start / 1000, 'dur': (end - start) / 1000, 'args': event_args,
+    }]
+    if memory_before is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        event_args['memory_delta_mb'] = round((current - memory_before) / MB, 2)
+        events.append({
+            'name': "traced memory", 'ph': "C", 'pid': os.getpid(), 'ts': end / 1000,
+            'args': {'MB': round(current / MB, 2)},
+        })
+    with _lock:
+        _events.extend(events)
+        _thread_names[(os.getpid(), thread.ident)] = thread.name
+        if profile is not None:
+            _stage_stats[stage].append(profile)
+
+
+def reset_for_worker():
+    """
+    Drop what a forked worker inherited from its parent, so it only reports its own work.
+    """
+    with _lock:
+        _events.clear()
+        _thread_names.clear()
+        _stage_stats.clear()
+
+
+def take_worker_profile():
+    """
+    Hand what this worker process has collected since the last call to the parent process.
+    Returns None when profiling is off.
+    """
+    if _settings is None:
+        return None
+    with _lock:
+        data = {
+            'events': list(_events),
+            'thread_names': dict(_thread_names),
+            'stats': {stage: [pstats.Stats(profile).stats for profile in profiles] for stage, profiles in _stage_stats.items()},
+        }
+    reset_for_worker()
+    return data
+
+
+def merge_worker_profile(data):
+    """
+    Add what a worker process collected (from take_worker_profile) to this process's profile.
+    """
+    if not data:
+        return
+    with _lock:
+        _events.extend(data['events'])
+        _thread_names.update(data['thread_names'])
+        for stage, stats in data['stats'].items():
+            _stage_stats[stage].extend(_StatsSnapshot(snapshot) for snapshot in stats)
+
+
+def write_profile():
+    """
+    Save the profile: one <stage>.pstats file per stage (open with `python -m pstats` or snakeviz),
+    trace.json for chrome://tracing or https://ui.perfetto.dev showing how stages overlapped across
+    threads and worker processes, and with memory sampling the top allocation sites in memory.txt.
+    """
+    if _settings is None:
+        return
+    folder = _settings['folder']
+    os.makedirs(folder, exist_ok=True)
+    with _lock:
+        events = list(_events)
+        thread_names = dict(_thread_names)
+        stage_stats = {stage: list(profiles) for stage, profiles in _stage_stats.items()}
+
+    for stage, profiles in stage_stats.items():
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(os.path.join(folder, f"{stage}.pstats"))
+
+    metadata = [
+        {'name': "thread_name", 'ph': "M", 'pid': pid, 'tid': tid, 'args': {'name': name}}
+        for (pid, tid), name in thread_names.items()
+    ]
+    with open(os.path.join(folder, "trace.json"), "w", encoding="utf-8") as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': "ms"}, f)
+
+    if _settings['memory'] and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:30]
+        with open(os.path.join(folder, "memory.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Traced memory: {current / MB:.1f} MB now, {peak / MB:.1f} MB peak\n\n")
+            f.write("\n".join(str(statistic) for statistic in top) + "\n")
+
+    totals = defaultdict(lambda: [0, 0.0])
+    for event in events:
+        if event['ph'] == "X":
+            totals[event['name']][0] += 1
+            totals[event['name']][1] += event['dur'] / 1e6
+    print(f"\nProfile written to {folder}")
+    for stage, (calls, seconds) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        print(f"  {stage}: {calls} call(s), {seconds:.2f}s")
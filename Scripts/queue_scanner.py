@@ -0,0 +1,79 @@
+import os
+from typing import NamedTuple
+
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv'})
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.m4a', '.flac'})
+TRANSCRIPT_SUFFIX = "_transcript.md"
+SUMMARY_RULES_FILENAME = "summary-rules.txt"
+
+
+class WorkItem(NamedTuple):
+    path: str
+    filename: str
+    kind: str            # "video", "audio" or "transcript"
+    summary_folder: str  # Folder whose summary-rules.txt applies (the queue folder itself for top-level videos)
+    size: int
+    mtime: float
+
+
+class WorkPlan(NamedTuple):
+    videos: list
+    audio: list
+    transcripts: list
+    skipped_folders: list  # Subfolders without a summary-rules.txt
+
+
+def make_work_item(path, kind, summary_folder, stat_result=None):
+    """
+    Build a WorkItem for a file, e.g. one produced by an earlier stage after the scan.
+    """
+    stat_result = stat_result or os.stat(path)
+    return WorkItem(path, os.path.basename(path), kind, summary_folder, stat_result.st_size, stat_result.st_mtime)
+
+
+def scan_queue(queue_folder):
+    """
+    Scan the queue folder once and return the work for every stage.
+
+    Uses os.scandir so directory checks come from the directory listing itself
+    rather than a stat per entry, and only stats the files that are actually work.
+    Top-level videos are picked up from the queue folder; audio files and transcripts
+    from subfolders that contain a summary-rules.txt. Hidden files are ignored.
+    """
+    videos, audio, transcripts, skipped_folders = [], [], [], []
+    subfolders = []
+
+    with os.scandir(queue_folder) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                subfolders.append(entry)
+            elif os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS and entry.is_file():
+                videos.append(make_work_item(entry.path, "video", queue_folder, entry.stat()))
+
+    for folder in sorted(subfolders, key=lambda entry: entry.name):
+        files = []
+        has_summary_rules = False
+        with os.scandir(folder.path) as entries:
+            for entry in entries:
+                if entry.name == SUMMARY_RULES_FILENAME:
+                    has_summary_rules = True
+                elif not entry.name.startswith("."):
+                    files.append(entry)
+        if not has_summary_rules:
+            skipped_folders.append(folder.path)
+            continue
+        for entry in files:
+            if os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                kind = "audio"
+            elif entry.name.endswith(TRANSCRIPT_SUFFIX):
+                kind = "transcript"
+            else:
+                continue
+            if not entry.is_file():
+                continue
+            item = make_work_item(entry.path, kind, folder.path, entry.stat())
+            (audio if kind == "audio" else transcripts).append(item)
+
+    return WorkPlan(videos, audio, transcripts, skipped_folders)
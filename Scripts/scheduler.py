@@ -0,0 +1,86 @@
+import os
+import time
+import logging
+from .config_handler import load_folder_config
+from .media_probe import probe_item
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Typical bitrates (bytes per second of audio) used to estimate duration from file size
+# when a file's header can't be probed
+ESTIMATED_BYTES_PER_SECOND = {
+    '.mp3': 16000,    # 128 kbps
+    '.m4a': 16000,    # 128 kbps AAC
+    '.flac': 88000,   # ~700 kbps for 44.1 kHz stereo speech
+    '.wav': 32000,    # 16 kHz mono 16-bit PCM
+}
+DEFAULT_BYTES_PER_SECOND = 16000
+
+# Rough rate at which the LLM consumes a transcript (about 1000 input tokens per second),
+# so transcript sizes can be compared the same way as audio durations
+TRANSCRIPT_BYTES_PER_SECOND = 4000
+
+
+def get_scheduling_config(config):
+    """
+    Return the scheduling section of the config with defaults filled in.
+    """
+    scheduling_config = config.get('scheduling', {}) or {}
+    return {
+        'enabled': str(scheduling_config.get('enabled', True)).lower() == "true",
+        'aging_rate': float(scheduling_config.get('aging_rate', 0.1)),
+        'max_wait_hours': float(scheduling_config.get('max_wait_hours', 12)),
+    }
+
+
+def estimate_duration(item):
+    """
+    Estimate the seconds of audio in a queued file without decoding it, from its
+    header where it can be probed and from its size and a typical bitrate otherwise.
+    """
+    info = probe_item(item)
+    if info is not None and info.duration is not None:
+        return info.duration
+    extension = os.path.splitext(item.filename)[1].lower()
+    return item.size / ESTIMATED_BYTES_PER_SECOND.get(extension, DEFAULT_BYTES_PER_SECOND)
+
+
+def estimate_work_seconds(item):
+    if item.kind == "transcript":
+        return item.size / TRANSCRIPT_BYTES_PER_SECOND
+    return estimate_duration(item)
+
+
+def order_work(items, config, now=None):
+    """
+    Order queued items so short jobs run first (shortest-job-first minimizes mean turnaround).
+
+    Each item's estimated work is divided by 2 ** priority, where priority comes from the
+    'priority' setting in its folder's summary-config.yaml (default 0, higher runs sooner),
+    and reduced by aging_rate seconds for every second it has waited so long jobs move up.
+    Anything that has waited longer than max_wait_hours jumps the queue, oldest first.
+    """
+    scheduling_config = get_scheduling_config(config)
+    if not scheduling_config['enabled'] or len(items) < 2:
+        return list(items)
+
+    now = time.time() if now is None else now
+    max_wait_seconds = scheduling_config['max_wait_hours'] * 3600
+    folder_priorities = {}
+
+    def sort_key(item):
+        if item.summary_folder not in folder_priorities:
+            try:
+                folder_priorities[item.summary_folder] = float(load_folder_config(item.summary_folder).get('priority', 0))
+            except Exception as e:
+                logger.warning(f"Could not read priority for {item.summary_folder}: {str(e)}")
+                folder_priorities[item.summary_folder] = 0.0
+        age = max(now - item.mtime, 0)
+        if age > max_wait_seconds:
+            return (0, -age)
+        score = estimate_work_seconds(item) / (2 ** folder_priorities[item.summary_folder])
+        return (1, score - scheduling_config['aging_rate'] * age)
+
+    return sorted(items, key=sort_key)
@@ -0,0 +1,271 @@
+import os
+import re
+import sys
+import sqlite3
+import logging
+import argparse
+import threading
+from .queue_scanner import TRANSCRIPT_SUFFIX
+from .media_probe import format_duration
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "search-index.sqlite"
+# Passages are built from whole segments or paragraphs up to about this many characters
+PASSAGE_CHARS = 600
+# and timestamped passages cover at most this much of the recording, so a hit's time is close
+PASSAGE_SECONDS = 30
+TIMESTAMP_PATTERN = re.compile(r"^\[(\d+):(\d{2}):(\d{2})\]\s*(.*)$")
+# Filesystems WAL mode can't be used on, its shared-memory index only works on local disks
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "lustre", "gpfs", "fuse.sshfs", "fuse.glusterfs", "fuse.cephfs"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text, document_id UNINDEXED, start_seconds UNINDEXED, tokenize='porter unicode61'
+);
+"""
+
+# Writers in this process take turns; other processes wait on SQLite's own lock
+_write_lock = threading.Lock()
+
+
+def get_search_index_config(config):
+    """
+    Return the search_index section of the config with defaults filled in. The index lives in
+    the output base folder unless path is set.
+    """
+    index_config = config.get('search_index', {}) or {}
+    base_folder = (config.get('output_structure', {}) or {}).get('base_folder', 'output')
+    return {
+        'enabled': str(index_config.get('enabled', False)).lower() == "true",
+        'path': index_config.get('path') or os.path.join(base_folder, INDEX_FILENAME),
+        'base_folder': base_folder,
+    }
+
+
+def is_local_path(path):
+    """
+    True if path is on a local filesystem according to /proc/mounts. Anything else, including
+    platforms without /proc/mounts, counts as possibly shared.
+    """
+    path = os.path.realpath(path)
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False
+    fstype = None
+    mount_point_length = -1
+    for mount_point, mount_fstype in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) > mount_point_length:
+            fstype, mount_point_length = mount_fstype, len(mount_point)
+    return fstype is not None and fstype not in NETWORK_FILESYSTEMS
+
+
+def connect(index_path):
+    """
+    Open the index, creating it if needed. On a local disk WAL lets searches run while a
+    pipeline run is adding files. On shared storage (e.g. an NFS output folder) WAL isn't safe,
+    so the default rollback journal is used and writers wait up to 30s for each other's locks.
+    """
+    index_folder = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(index_folder, exist_ok=True)
+    connection = sqlite3.connect(index_path, timeout=30)
+    connection.execute(f"PRAGMA journal_mode={'WAL' if is_local_path(index_folder) else 'DELETE'}")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def split_passages(text):
+    """
+    Split a transcript or summary into (start_seconds, passage) pairs. Timestamped transcript
+    lines ([H:MM:SS] text) are grouped into passages of up to PASSAGE_SECONDS with the time of
+    their first line, other text is split on paragraphs with no time.
+    """
+    passages = []
+    current, start, length = [], None, 0
+
+    def flush():
+        if current:
+            passages.append((start, " ".join(current)))
+
+    for line in text.splitlines():
+        match = TIMESTAMP_PATTERN.match(line)
+        if match:
+            hours, minutes, seconds, line = match.groups()
+            line_start = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+        else:
+            line_start = None
+        line = line.strip()
+        if not line:
+            if match is None and start is None:
+                # A blank line ends a paragraph of untimed text
+                flush()
+                current, length = [], 0
+            continue
+        if current and (length + len(line) > PASSAGE_CHARS or (line_start is None) != (start is None)
+                        or (line_start is not None and line_start - start >= PASSAGE_SECONDS)):
+            flush()
+            current, length = [], 0
+        if not current:
+            start = line_start
+        current.append(line)
+        length += len(line) + 1
+    flush()
+    return passages
+
+
+def _index_text(connection, path, text, mtime):
+    kind = "transcript" if path.endswith(TRANSCRIPT_SUFFIX) else "summary"
+    _remove_document(connection, path)
+    document_id = connection.execute(
+        "INSERT INTO documents (path, kind, mtime) VALUES (?, ?, ?)", (path, kind, mtime)
+    ).lastrowid
+    connection.executemany(
+        "INSERT INTO passages (text, document_id, start_seconds) VALUES (?, ?, ?)",
+        [(passage, document_id, start) for start, passage in split_passages(text)],
+    )
+
+
+def _remove_document(connection, path):
+    row = connection.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+    if row:
+        connection.execute("DELETE FROM passages WHERE document_id = ?", (row[0],))
+        connection.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+
+
+def index_document(path, text, config):
+    """
+    Add (or replace) a transcript or summary in the search index. move_file calls this as
+    files land in the output folder. Does nothing if the index is disabled, and a failure to
+    index is logged rather than failing the run.
+    """
+    index_config = get_search_index_config(config)
+    if not index_config['enabled']:
+        return
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else 0
+    try:
+        with _write_lock:
+            connection = connect(index_config['path'])
+            try:
+                with connection:
+                    _index_text(connection, path, text, mtime)
+            finally:
+                connection.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not add {os.path.basename(path)} to the search index: {str(e)}")
+
+
+def rebuild_index(config, full=False):
+    """
+    Bring the index in line with the output folder in one transaction: add new or changed
+    transcripts and summaries and drop those that are gone. full re-indexes everything.
+    Returns (indexed, removed) counts.
+    """
+    index_config = get_search_index_config(config)
+    found = {}
+    for directory, _, filenames in os.walk(index_config['base_folder']):
+        for filename in filenames:
+            if filename.endswith(".md") and not filename.startswith("."):
+                path = os.path.abspath(os.path.join(directory, filename))
+                found[path] = os.path.getmtime(path)
+
+    indexed = removed = 0
+    with _write_lock:
+        connection = connect(index_config['path'])
+        try:
+            with connection:
+                if full:
+                    connection.execute("DELETE FROM passages")
+                    connection.execute("DELETE FROM documents")
+                known = dict(connection.execute("SELECT path, mtime FROM documents"))
+                for path in known.keys() - found.keys():
+                    _remove_document(connection, path)
+                    removed += 1
+                for path, mtime in found.items():
+                    if known.get(path) == mtime:
+                        continue
+                    with open(path, "r", encoding="utf-8", errors="replace") as f:
+                        _index_text(connection, path, f.read(), mtime)
+                    indexed += 1
+            # Merge the index segments the bulk insert left behind
+            with connection:
+                connection.execute("INSERT INTO passages(passages) VALUES ('optimize')")
+        finally:
+            connection.close()
+    return indexed, removed
+
+
+def _quote_terms(query):
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(query, config, limit=10, kind=None):
+    """
+    Search the index, best matches first. query uses FTS5 syntax (words, "exact phrases",
+    OR, NOT, prefix*); if it isn't valid FTS5 its words are searched as plain terms.
+    Returns a list of dicts with path, kind, start_seconds (None without timestamps) and a snippet.
+    """
+    index_config = get_search_index_config(config)
+    if not os.path.exists(index_config['path']):
+        return []
+    sql = (
+        "SELECT documents.path, documents.kind, passages.start_seconds, "
+        "snippet(passages, 0, '[', ']', '...', 16) "
+        "FROM passages JOIN documents ON documents.id = passages.document_id "
+        "WHERE passages MATCH ?" + (" AND documents.kind = ?" if kind else "") +
+        " ORDER BY bm25(passages) LIMIT ?"
+    )
+    connection = connect(index_config['path'])
+    try:
+        for match in (query, _quote_terms(query)):
+            try:
+                rows = connection.execute(sql, (match, kind, limit) if kind else (match, limit)).fetchall()
+                break
+            except sqlite3.OperationalError:
+                rows = []
+    finally:
+        connection.close()
+    return [{'path': path, 'kind': kind, 'start_seconds': start, 'snippet': snippet} for path, kind, start, snippet in rows]
+
+
+def main(argv=None):
+    from .config_handler import get_config
+    parser = argparse.ArgumentParser(description="Search the transcripts and summaries in the output folder")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_parser = commands.add_parser("search", help="Search the index")
+    search_parser.add_argument("query", nargs="+")
+    search_parser.add_argument("--limit", type=int, default=10)
+    search_parser.add_argument("--kind", choices=["transcript", "summary"])
+    rebuild_parser = commands.add_parser("rebuild", help="Index the existing output folder")
+    rebuild_parser.add_argument("--full", action="store_true", help="Re-index every file, not only new and changed ones")
+    args = parser.parse_args(argv)
+    config = get_config()
+
+    if args.command == "rebuild":
+        indexed, removed = rebuild_index(config, args.full)
+        print(f"Indexed {indexed} file(s), removed {removed}: {get_search_index_config(config)['path']}")
+        return 0
+
+    hits = search(" ".join(args.query), config, args.limit, args.kind)
+    if not hits:
+        print("No matches.")
+        return 1
+    for hit in hits:
+        offset = f" @ {format_duration(hit['start_seconds'])}" if hit['start_seconds'] is not None else ""
+        print(f"{hit['path']}{offset}\n    {hit['snippet']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from .file_processor import add_timestamp_to_filename
+from .pipeline import Pipeline
+from .transcriber_utils import preload_transcription_model
+from .llm_utils import preload_llm_client
+from .queue_scanner import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, SUMMARY_RULES_FILENAME
+from .summarizer import get_unique_filename
+from .output_writer import staging_path, wait_for_output_moves
+from .archiver import wait_for_archive_jobs
+from .leases import claim, release, release_all, get_lease_config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Jobs by id. Each job is a dict updated by its worker thread under _jobs_lock.
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_order = []
+# Upload paths chosen but not yet renamed into place (uploads wait under a hidden name until their
+# job starts), so concurrent uploads of the same name don't collide
+_reserved_paths = set()
+
+
+def get_service_config(config):
+    """
+    Return the service section of the config with defaults filled in.
+    """
+    service_config = config.get('service', {}) or {}
+    return {
+        'host': str(service_config.get('host', '127.0.0.1')),
+        'port': int(service_config.get('port', 8765)),
+        'workers': max(1, int(service_config.get('workers', 1))),
+        'max_upload_mb': float(service_config.get('max_upload_mb', 2048)),
+        'keep_results_seconds': float(service_config.get('keep_results_seconds', 3600)),
+        'max_finished_jobs': max(0, int(service_config.get('max_finished_jobs', 1000))),
+    }
+
+
+def _evict_jobs(service_config, now=None):
+    """
+    Forget what finished jobs no longer need, so a long-running service doesn't grow without
+    bound: results are dropped keep_results_seconds after the job finished, and beyond
+    max_finished_jobs the oldest finished jobs are forgotten altogether. Call with _jobs_lock held.
+    """
+    now = time.time() if now is None else now
+    finished = [job_id for job_id in _job_order if _jobs[job_id]['finished_at'] is not None]
+    for job_id in finished:
+        job = _jobs[job_id]
+        if job['result'] is not None and now - job['finished_at'] >= service_config['keep_results_seconds']:
+            job['result'] = None
+            job['result_expired'] = True
+    for job_id in finished[:max(0, len(finished) - service_config['max_finished_jobs'])]:
+        del _jobs[job_id]
+        _job_order.remove(job_id)
+
+
+def _job_status(job):
+    status = {key: value for key, value in job.items() if key not in ('result', 'path', 'staged_path')}
+    if job['status'] == "queued":
+        queued = [job_id for job_id in _job_order if _jobs[job_id]['status'] == "queued"]
+        status['queue_position'] = queued.index(job['id']) + 1
+    return status
+
+
+def _set_stage(job_id, stage):
+    now = time.time()
+    with _jobs_lock:
+        job = _jobs[job_id]
+        if job['stage_started_at'] is not None:
+            job['timings'][job['status']] = round(now - job['stage_started_at'], 3)
+        job['status'] = stage
+        job['stage_started_at'] = now
+
+
+def _run_job(job_id, pipeline):
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job['started_at'] = time.time()
+        path, staged_path = job['path'], job['staged_path']
+    try:
+        # The upload only enters the scanned part of the queue now, to be processed straight away
+        if os.path.exists(path):
+            raise FileExistsError(f"{os.path.basename(path)} was added to the queue while the upload waited for its job")
+        os.replace(staged_path, path)
+        with _jobs_lock:
+            _reserved_paths.discard(path)
+        result = pipeline.process(path, lambda stage: _set_stage(job_id, stage))
+        _set_stage(job_id, "done")
+        with _jobs_lock:
+            job['result'] = result._asdict()
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {str(e)}")
+        _set_stage(job_id, "failed")
+        with _jobs_lock:
+            job['error'] = str(e)
+        # A processed upload is released by the pipeline once it has been moved out of the queue
+        release(path)
+    finally:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        with _jobs_lock:
+            _reserved_paths.discard(path)
+            job['finished_at'] = time.time()
+            job['stage_started_at'] = None
+
+
+def _reserve_upload_path(summary_folder, filename, config):
+    with _jobs_lock:
+        path = os.path.join(summary_folder, add_timestamp_to_filename(filename, config))
+        name, extension = os.path.splitext(path)
+        counter = 1
+        path = get_unique_filename(path)
+        while path in _reserved_paths:
+            path = get_unique_filename(f"{name}_{counter}{extension}")
+            counter += 1
+        _reserved_paths.add(path)
+        return path
+
+
+def submit_job(queue_folder, folder, filename, stream, length, pipeline, executor):
+    """
+    Save an uploaded recording into a summary folder of the queue and queue it for processing.
+    The upload is streamed to a hidden staging name, which the queue scanner ignores, and is
+    only renamed into place when its job starts, so a folder run scanning the same queue doesn't
+    pick up queued uploads. While the job runs the upload is only claimed against folder runs
+    with leases.enabled: true. Returns the new job's status.
+    """
+    config = pipeline.config
+    path = _reserve_upload_path(os.path.join(queue_folder, folder), filename, config)
+    claim(path, config, must_exist=False)
+    staged_path = staging_path(path) + "." + uuid.uuid4().hex[:8]
+    try:
+        with open(staged_path, "wb") as f:
+            remaining = length
+            while remaining > 0:
+                chunk = stream.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    raise ConnectionError("Upload ended early")
+                f.write(chunk)
+                remaining -= len(chunk)
+    except BaseException:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        release(path)
+        with _jobs_lock:
+            _reserved_paths.discard(path)
+        raise
+
+    job_id = uuid.uuid4().hex[:12]
+    job = {
+        'id': job_id, 'filename': os.path.basename(path), 'folder': folder, 'path': path, 'staged_path': staged_path,
+        'status': "queued", 'submitted_at': time.time(), 'started_at': None, 'finished_at': None,
+        'stage_started_at': None, 'timings': {}, 'error': None, 'result': None, 'result_expired': False,
+    }
+    with _jobs_lock:
+        _evict_jobs(get_service_config(config))
+        _jobs[job_id] = job
+        _job_order.append(job_id)
+    executor.submit(_run_job, job_id, pipeline)
+    with _jobs_lock:
+        return _job_status(job)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs?folder=<summary folder>&filename=<name>  body: the recording. Returns 202 and the job.
+    GET  /jobs                                         every job's status
+    GET  /jobs/<id>                                    one job's status and per-stage timings
+    GET  /jobs/<id>/result                             transcript and summaries once done
+    GET  /health                                       liveness and job counts
+    """
+    server_version = "MeetingSummaryService/1.0"
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        with _jobs_lock:
+            _evict_jobs(get_service_config(self.server.pipeline.config))
+            status, body = self.get_response(parts)
+        self.send_json(status, body)
+
+    def get_response(self, parts):
+        if parts == ["health"]:
+            counts = {}
+            for job in _jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return 200, {'status': "ok", 'jobs': counts}
+        if parts == ["jobs"]:
+            return 200, [_job_status(_jobs[job_id]) for job_id in _job_order]
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[1] in _jobs:
+            job = _jobs[parts[1]]
+            if len(parts) == 2:
+                return 200, _job_status(job)
+            if parts[2] == "result":
+                if job['result_expired']:
+                    return 410, {'error': "Result expired", **_job_status(job)}
+                if job['status'] != "done":
+                    return 409, _job_status(job)
+                return 200, {'id': job['id'], **job['result']}
+        return 404, {'error': "Not found"}
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self.send_json(404, {'error': "Not found"})
+        query = parse_qs(url.query)
+        folder = query.get('folder', [""])[0]
+        filename = os.path.basename(query.get('filename', [""])[0])
+        queue_folder = self.server.queue_folder
+        config = self.server.pipeline.config
+
+        if not folder or os.path.basename(folder) != folder or folder.startswith(".") \
+                or not os.path.exists(os.path.join(queue_folder, folder, SUMMARY_RULES_FILENAME)):
+            return self.send_json(400, {'error': f"folder must name a summary folder of the queue with a {SUMMARY_RULES_FILENAME}"})
+        if not filename or filename.startswith(".") or os.path.splitext(filename)[1].lower() not in AUDIO_EXTENSIONS | VIDEO_EXTENSIONS:
+            return self.send_json(415, {'error': "filename must be an audio or video file"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            return self.send_json(400, {'error': "Empty upload"})
+        if length > get_service_config(config)['max_upload_mb'] * 1024 * 1024:
+            return self.send_json(413, {'error': "Upload too large"})
+
+        try:
+            job = submit_job(queue_folder, folder, filename, self.rfile, length, self.server.pipeline, self.server.executor)
+        except ConnectionError as e:
+            return self.send_json(400, {'error': str(e)})
+        self.send_json(202, job)
+
+
+def make_server(config, host=None, port=None):
+    """
+    Build the HTTP server with its job workers. Models and LLM clients are loaded once and
+    stay warm for every job, so small recordings cost inference time rather than start-up.
+    """
+    service_config = get_service_config(config)
+    server = ThreadingHTTPServer((host or service_config['host'], service_config['port'] if port is None else port), ServiceHandler)
+    server.daemon_threads = True
+    server.pipeline = Pipeline(config)
+    server.queue_folder = config['meeting_recordings_folder']
+    server.executor = ThreadPoolExecutor(max_workers=service_config['workers'], thread_name_prefix="service-job")
+    preload_transcription_model(config)
+    llm_config = config.get('llm') or {}
+    if llm_config.get('client_type'):
+        preload_llm_client(llm_config.get('client_type'), llm_config.get('base_url'))
+    return server
+
+
+def serve(config, host=None, port=None):
+    server = make_server(config, host, port)
+    host, port = server.server_address[:2]
+    if not get_lease_config(config)['enabled']:
+        logger.warning("leases.enabled is false, don't run main.py on the same queue while the service is up or it may process a running job's upload twice")
+    print(f"Serving on http://{host}:{port} (POST /jobs?folder=<summary folder>&filename=<name>)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down, finishing running jobs...")
+    finally:
+        server.server_close()
+        server.executor.shutdown(wait=True)
+        wait_for_output_moves()
+        wait_for_archive_jobs()
+        release_all()
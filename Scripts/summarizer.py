@@ -2,12 +2,14 @@ import os
 import sys
 import traceback
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from Scripts.config_handler import get_config
+from Scripts.config_handler import get_config, load_folder_config
 from Scripts.llm_utils import call_llm_api
+from Scripts.transcript_cleaner import clean_transcript
 from .utils import move_file
 
 # Set up logging
@@ -15,16 +17,131 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 def get_unique_filename(base_path):
+    """
+    Return base_path, or base_path with the first free _1, _2... suffix if it is taken,
+    checking names against one listing of the directory.
+    """
     directory, filename = os.path.split(base_path)
     name, ext = os.path.splitext(filename)
+    try:
+        existing = set(os.listdir(directory or "."))
+    except FileNotFoundError:
+        return base_path
     counter = 1
-    new_path = base_path
-    while os.path.exists(new_path):
-        new_path = os.path.join(directory, f"{name}_{counter}{ext}")
+    new_filename = filename
+    while new_filename in existing:
+        new_filename = f"{name}_{counter}{ext}"
         counter += 1
-    return new_path
+    return os.path.join(directory, new_filename)
+
+def read_summary_rules(transcript_dir):
+    """
+    Read the summary-rules.txt file for the folder a transcript sits in.
+    """
+    summary_rules_path = os.path.join(transcript_dir, "summary-rules.txt")
+    if os.path.exists(summary_rules_path):
+        with open(summary_rules_path, 'r') as f:
+            return f.read().strip()
+    print(f"Warning: No summary-rules.txt found in {transcript_dir}. Using default settings.")
+    return None
+
+def get_summary_rule_sets(transcript_dir):
+    """
+    Return every summary to produce for transcripts in a folder as a list of (name, rules).
+    The folder's own summary-rules.txt comes first with a name of None; extra rule files
+    listed under 'summaries' in the folder's summary-config.yaml follow, so one transcript
+    can be summarized several ways without being transcribed again.
+    """
+    rule_sets = [(None, read_summary_rules(transcript_dir))]
+    for entry in load_folder_config(transcript_dir).get('summaries', []) or []:
+        if isinstance(entry, dict):
+            rules_file = entry.get('rules')
+            name = entry.get('name') or os.path.splitext(os.path.basename(rules_file))[0]
+        else:
+            rules_file = entry
+            name = os.path.splitext(os.path.basename(rules_file))[0]
+        rules_path = os.path.normpath(os.path.join(transcript_dir, rules_file))
+        if not os.path.exists(rules_path):
+            print(f"Warning: Summary rules file {rules_path} listed in {transcript_dir} does not exist, skipping '{name}' summary.")
+            continue
+        with open(rules_path, 'r') as f:
+            rule_sets.append((name, f.read().strip()))
+    return rule_sets
+
+def prepare_summary_request(transcript_path, config):
+    """
+    Read and clean a transcript and load the summary rules for its folder.
+    Returns the transcript text and the list of (name, rules) summaries to produce from it.
+    """
+    # Read transcript
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        transcript = f.read()
+
+    # Strip filler words, hallucination loops and silence artifacts before paying for them as input tokens
+    transcript, cleanup_stats = clean_transcript(transcript, config)
+    if cleanup_stats['tokens_saved'] > 0:
+        percent_saved = 100 * cleanup_stats['tokens_saved'] / max(cleanup_stats['original_tokens'], 1)
+        print(f"Transcript cleanup saved ~{cleanup_stats['tokens_saved']} tokens ({percent_saved:.1f}%) for {os.path.basename(transcript_path)}")
+
+    rule_sets = get_summary_rule_sets(os.path.dirname(transcript_path))
+    return transcript, rule_sets
+
+def save_summary(transcript_path, summary, config, summary_name=None):
+    """
+    Write a summary next to its transcript and move it to the output folder.
+    Named summaries from summary-config.yaml are saved as <file>_<name>_summary.md.
+    """
+    file_name = os.path.splitext(os.path.basename(transcript_path))[0]
+    output_folder = os.path.dirname(transcript_path)
+
+    if not output_folder:
+        raise ValueError("'summaries_folder' not found in config")
+
+    if summary_name:
+        base_output_path = os.path.join(output_folder, f"{file_name}_{summary_name}_summary.md")
+    else:
+        base_output_path = os.path.join(output_folder, f"{file_name}_summary.md")
+    output_path = get_unique_filename(base_output_path)
 
-def summarize_transcript(transcript_path, config):
+    # Ensure output folder exists
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Save summary as markdown
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(summary)
+
+    move_file(output_path, config)
+    return output_path
+
+def summarize_text(transcript, rule_sets, llm_config):
+    """
+    Summarize transcript text once per (summary_name, summary_rules) pair and return
+    (summary_name, summary) pairs in the same order.
+    """
+    def summarize(summary_rules):
+        return call_llm_api(
+            model=llm_config.get('model'),
+            content=transcript,
+            systemPrompt=summary_rules,
+            max_tokens=llm_config.get('max_tokens'),
+            temperature=llm_config.get('temperature'),
+            client_type=llm_config.get('client_type'),
+            base_url=llm_config.get('base_url')
+        )
+
+    if len(rule_sets) == 1:
+        summaries = [summarize(rule_sets[0][1])]
+    else:
+        # Fan out: every summary type is requested concurrently from the one transcript read
+        with ThreadPoolExecutor(max_workers=len(rule_sets)) as executor:
+            summaries = list(executor.map(summarize, [summary_rules for _, summary_rules in rule_sets]))
+    return [(summary_name, summary) for (summary_name, _), summary in zip(rule_sets, summaries)]
+
+def generate_summaries(transcript_path, config):
+    """
+    Request every summary configured for a transcript's folder and return them as
+    (summary_name, summary) pairs without saving them.
+    """
     log_enabled = get_config().get('logging', {}).get('enabled', False)
     if log_enabled:
         logger.info(f"summarize_transcript: Starting summarization for: {transcript_path}")
@@ -34,68 +151,41 @@ def summarize_transcript(transcript_path, config):
         if log_enabled:
             logger.debug(f"summarize_transcript: Config: {config}")
 
-        file_name = os.path.splitext(os.path.basename(transcript_path))[0]
-        output_folder = os.path.dirname(transcript_path)
-        
-        if not output_folder:
+        if not os.path.dirname(transcript_path):
             raise ValueError("'summaries_folder' not found in config")
-        
-        base_output_path = os.path.join(output_folder, f"{file_name}_summary.md")
-        output_path = get_unique_filename(base_output_path)
 
-        # Ensure output folder exists
-        os.makedirs(output_folder, exist_ok=True)
-
-        # Read transcript
-        with open(transcript_path, "r", encoding="utf-8") as f:
-            transcript = f.read()
+        transcript, rule_sets = prepare_summary_request(transcript_path, config)
 
         # Get LLM configuration
         llm_config = config.get('llm')
         if not llm_config:
             raise ValueError("'llm' configuration not found in config")
 
-        # Get the directory of the transcript file
-        transcript_dir = os.path.dirname(transcript_path)
-        
-        # Construct the path to the summary-rules.txt file
-        summary_rules_path = os.path.join(transcript_dir, "summary-rules.txt")
-        
-        # Read the summary rules from the file
-        if os.path.exists(summary_rules_path):
-            with open(summary_rules_path, 'r') as f:
-                summary_rules = f.read().strip()
-        else:
-            summary_rules = None
-            print(f"Warning: No summary-rules.txt found in {transcript_dir}. Using default settings.")
-
-
         # Call LLM API
         if log_enabled:
             logger.debug(f"summarize_transcript: LLM Config: {llm_config}")
             logger.debug(f"summarize_transcript: Base URL from config: {llm_config.get('base_url')}")
 
-        summary = call_llm_api(
-            model=llm_config.get('model'),
-            content=transcript,
-            systemPrompt=summary_rules,
-            max_tokens=llm_config.get('max_tokens'),
-            temperature=llm_config.get('temperature'),
-            client_type=llm_config.get('client_type'),
-            base_url=llm_config.get('base_url')
-        )
+        summaries = summarize_text(transcript, rule_sets, llm_config)
         if log_enabled:
             logger.debug(f"summarize_transcript: Call to LLM API completed")
+        return summaries
 
-        # Save summary as markdown
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(summary)
+    except Exception as e:
+        logger.error(f"Error in summarize_transcript: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise
+
+def summarize_transcript(transcript_path, config):
+    log_enabled = get_config().get('logging', {}).get('enabled', False)
+    summaries = generate_summaries(transcript_path, config)
+    try:
+        output_paths = [save_summary(transcript_path, summary, config, summary_name) for summary_name, summary in summaries]
 
         if log_enabled:
-            logger.info(f"summarize_transcript: Summary saved: {output_path}")
-        
-        move_file(output_path, config)
-        return output_path
+            logger.info(f"summarize_transcript: Summary saved: {', '.join(output_paths)}")
+
+        return output_paths[0]
 
     except Exception as e:
         logger.error(f"Error in summarize_transcript: {str(e)}")
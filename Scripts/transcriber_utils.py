@@ -1,29 +1,209 @@
+import io
 import os
+import time
+import wave
 import logging
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, Future
 from whisper.audio import SAMPLE_RATE, pad_or_trim
 import whisper
 import torch
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, decode_audio
+from .transcript_cleaner import get_cleanup_config, is_low_confidence_segment
+from .media_probe import probe_media, is_whisper_native_wav, format_duration
+from .vad import get_vad_config, apply_vad, to_original_time, frame_energies_db
+from .audio_extractor import decode_audio_at_tempo
+from .config_handler import load_folder_config
+from .profiler import profiled
+from .language_cache import pinned_language, record_language
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def transcribe_with_whisper(audio_file_path, output_folder, config):
+# Loaded models, keyed by engine and settings, so a run loads each model once however many files
+# it transcribes. Values are futures so a model being preloaded in the background is waited for
+# rather than loaded a second time.
+_models = {}
+_models_lock = threading.Lock()
+_loader_executor = None
+# Set once any model has been loaded in this process, whose thread pools (OpenMP, CTranslate2)
+# then exist and aren't safe to fork
+_model_loaded = False
+# Transcripts are streamed to disk through a buffer this size
+TRANSCRIPT_BUFFER_BYTES = 64 * 1024
+# Context segmentation looks this far back from the 30 second limit for a quiet place to cut,
+# re-does a last segment ending this close to the cut, and drops the prompt after a window whose
+# text compresses this well (Whisper's own threshold for repetition loops)
+CUT_SEARCH_SECONDS = 5
+CUT_END_TOLERANCE_SECONDS = 0.5
+REPETITION_COMPRESSION_RATIO = 2.4
+
+def read_native_wav(audio_file_path):
     """
-    Transcribe audio using OpenAI's Whisper model.
+    Read a file that is already 16 kHz mono 16-bit PCM WAV straight into a float32 array,
+    skipping the ffmpeg conversion. Returns None for any other format.
     """
-    file_name = os.path.splitext(os.path.basename(audio_file_path))[0]
-    output_path = os.path.join(output_folder, f"{file_name}_transcript.md")
+    info = probe_media(audio_file_path)
+    if not is_whisper_native_wav(info):
+        return None
+    with open(audio_file_path, "rb") as f:
+        f.seek(info.data_offset)
+        data = f.read(int(round(info.duration * SAMPLE_RATE)) * 2)
+    logger.info(f"{os.path.basename(audio_file_path)} is already 16 kHz mono PCM, skipping conversion")
+    return np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+
+def read_native_wav_bytes(data):
+    """
+    read_native_wav for a recording held in memory. Returns None unless it is 16 kHz mono 16-bit PCM WAV.
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as wav_file:
+            if (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate(), wav_file.getcomptype()) != (1, 2, SAMPLE_RATE, "NONE"):
+                return None
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(frames[:len(frames) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+
+def load_audio(audio_file_path, tempo=1.0):
+    """
+    Load audio as the 16 kHz mono float32 array Whisper expects, sped up by tempo.
+    """
+    if tempo != 1.0:
+        return decode_audio_at_tempo(audio_file_path, tempo, SAMPLE_RATE)
+    audio = read_native_wav(audio_file_path)
+    if audio is None:
+        audio = whisper.load_audio(audio_file_path)
+    return audio
+
+def load_audio_faster_whisper(audio_file_path, tempo=1.0):
+    """
+    load_audio using Faster Whisper's own decoder, so the whisper package isn't needed.
+    """
+    if tempo != 1.0:
+        return decode_audio_at_tempo(audio_file_path, tempo, SAMPLE_RATE)
+    audio = read_native_wav(audio_file_path)
+    if audio is None:
+        audio = decode_audio(audio_file_path, sampling_rate=SAMPLE_RATE)
+    return audio
+
+def load_speech(audio_file_path, vad_config, decode=load_audio, tempo=1.0):
+    """
+    Load a recording and cut it down to its speech with the shared VAD, before any model is loaded.
+    Returns the audio to transcribe and the timestamp map back to the sped up recording
+    (None when VAD is disabled). A recording with no speech comes back empty.
+    """
+    audio = decode(audio_file_path, tempo)
+    return apply_vad(audio, vad_config)
+
+def format_segment(text, start, timestamp_map, timestamps, tempo=1.0):
+    """
+    Prefix a segment with its [H:MM:SS] time in the original recording when timestamps are enabled,
+    undoing both the VAD cuts and any playback speed-up.
+    """
+    if not timestamps:
+        return text
+    return f"[{format_duration(to_original_time(start, timestamp_map) * tempo)}] {text.strip()}"
+
+def get_playback_speed(folder_path):
+    """
+    Read the playback_speed a summary folder's summary-config.yaml asks for (default 1.0).
+    """
+    try:
+        tempo = float(load_folder_config(folder_path).get('playback_speed', 1.0))
+    except Exception as e:
+        logger.warning(f"Could not read playback_speed for {folder_path}: {str(e)}")
+        return 1.0
+    if not 0.5 <= tempo <= 4.0:
+        logger.warning(f"Ignoring playback_speed {tempo} for {folder_path}, it must be between 0.5 and 4.0")
+        return 1.0
+    return tempo
+
+def _get_loader_executor():
+    global _loader_executor
+    if _loader_executor is None:
+        _loader_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+    return _loader_executor
+
+def _timed_load(description, load):
+    global _model_loaded
+    _model_loaded = True
+    start = time.perf_counter()
+    model = load()
+    logger.info(f"Loaded {description} in {time.perf_counter() - start:.1f}s")
+    return model
+
+def _submit_model_load(key, description, load):
+    with _models_lock:
+        if key not in _models:
+            _models[key] = _get_loader_executor().submit(_timed_load, description, load)
+        return _models[key]
+
+def _load_model_on_this_thread(key, description, load):
+    # Loaded without the loader thread, so no thread but this one exists when the process forks
+    with _models_lock:
+        future = _models.get(key)
+    if future is None:
+        future = Future()
+        future.set_result(_timed_load(description, load))
+        with _models_lock:
+            _models[key] = future
+    return future.result()
+
+def _get_model(key, description, load):
+    future = _submit_model_load(key, description, load)
+    try:
+        return future.result()
+    except Exception:
+        # Don't cache a failed load, the next file gets to try again
+        with _models_lock:
+            if _models.get(key) is future:
+                del _models[key]
+        raise
+
+def clear_model_cache():
+    """
+    Forget loaded models so the next transcription loads them again, e.g. after changing the config.
+    """
+    with _models_lock:
+        _models.clear()
+
+def model_loaded_in_process():
+    """
+    True if this process has loaded a transcription model (and run its thread pools) at any
+    point, even if clear_model_cache has forgotten it since.
+    """
+    return _model_loaded
+
+def resolve_transcription_device(config):
+    """
+    The device the configured engine will run on, 'cuda' or 'cpu', resolving 'auto' the way
+    each engine does.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    if engine == 'whisper':
+        return resolve_whisper_device(config.get('whisper', {}) or {})
+    device = str((config.get(engine, {}) or {}).get('device', 'auto')).lower()
+    if device != "auto":
+        return device
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except ImportError:
+        return "cpu"
 
-    # Check CUDA availability
+def resolve_whisper_device(config):
+    """
+    The device Whisper should run on: 'auto' picks CUDA when PyTorch can use it.
+    """
     cuda_available = torch.cuda.is_available()
     cuda_enabled = torch.backends.cudnn.enabled and torch.backends.cuda.is_built()
 
     logger.info(f"CUDA available: {cuda_available}")
     logger.info(f"PyTorch built with CUDA: {cuda_enabled}")
 
-    # Determine the device to use
     device = config.get('device', 'auto')
     if device == "auto":
         device = "cuda" if cuda_available and cuda_enabled else "cpu"
@@ -32,41 +212,325 @@ def transcribe_with_whisper(audio_file_path, output_folder, config):
         device = "cpu"
 
     logger.info(f"Using device: {device}")
+    return device
 
-    # Load Whisper model
-    model = whisper.load_model(config.get('model', 'base')).to(device)
-    logger.info(f"Whisper model dimensions: {model.dims}")
+def resolve_fp16(config, device):
+    """
+    Whether Whisper decodes in half precision. use_fp16 'auto' means only on CUDA, on the CPU
+    Whisper can't use FP16 and falls back to FP32 with a warning.
+    """
+    use_fp16 = str(config.get('use_fp16', 'auto')).lower()
+    if use_fp16 == "auto":
+        return str(device).startswith("cuda")
+    return use_fp16 == "true"
 
-    try:
-        # Load audio
-        audio = whisper.load_audio(audio_file_path)
+def get_cpu_threads(config):
+    """
+    The cpu_threads setting of an engine section, 0 ('auto') for the engine's own default.
+    """
+    threads = config.get('cpu_threads', 'auto')
+    return 0 if str(threads).lower() == "auto" else int(threads)
+
+def get_batch_size(config):
+    """
+    The batch_size setting of an engine section, 1 (no batching) for 'auto'.
+    """
+    batch_size = config.get('batch_size', 'auto')
+    return 1 if str(batch_size).lower() == "auto" else max(1, int(batch_size))
+
+def get_language(config):
+    """
+    The language setting of an engine section, None ('auto') to detect it.
+    """
+    language = str(config.get('language', 'auto') or 'auto')
+    return None if language.lower() == "auto" else language
+
+def set_language(config, language):
+    """
+    Return a copy of the config with the configured engine's language set.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    return {**config, engine: {**(config.get(engine, {}) or {}), 'language': language}}
+
+def get_folder_language(config, folder):
+    """
+    With the engine's language 'auto', return the config with the language pinned for a summary
+    folder, or the config unchanged and a callback that records the language detected for one of
+    its recordings (pinning it once enough agree). Otherwise the callback is None.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    if get_language(config.get(engine, {}) or {}) is not None:
+        return config, None
+    language = pinned_language(folder, config)
+    if language:
+        logger.info(f"Using the language pinned for {os.path.basename(os.path.normpath(folder))}: {language}")
+        return set_language(config, language), None
+    return config, lambda detected: record_language(folder, detected, config)
+
+def log_segment(config, index, text):
+    """
+    Log a transcribed segment's text. With log_segments N in an engine section every Nth
+    segment is logged at INFO, otherwise (the default 0) segments are only logged at DEBUG,
+    so long recordings don't write their whole transcript to the log as well.
+    """
+    every = int(config.get('log_segments', 0) or 0)
+    if every > 0 and index % every == 0:
+        logger.info(f"Segment {index}: {text}")
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Segment {index}: {text}")
+
+def _whisper_model_args(config):
+    model_name = config.get('model', 'base')
+    device = resolve_whisper_device(config)
+    cpu_threads = get_cpu_threads(config)
+    key = ('whisper', model_name, device, cpu_threads)
+
+    def load():
+        if cpu_threads:
+            torch.set_num_threads(cpu_threads)
+        return whisper.load_model(model_name).to(device)
+    return key, f"Whisper model {model_name} on {device}", load
+
+def _faster_whisper_model_args(config):
+    model_size = config.get('model', 'base-v3')
+    # CTranslate2 resolves 'auto' to CUDA when available and to the fastest compute type the device supports
+    device = config.get('device', 'auto')
+    compute_type = config.get('compute_type', 'auto')
+    options = {'device': device, 'compute_type': compute_type}
+    cpu_threads = get_cpu_threads(config)
+    if cpu_threads:
+        options['cpu_threads'] = cpu_threads
+    key = ('faster_whisper', model_size, device, compute_type, cpu_threads)
+    return key, f"Faster Whisper model {model_size} on {device} ({compute_type})", lambda: WhisperModel(model_size, **options)
+
+def get_whisper_model(config):
+    """
+    Return the Whisper model for the whisper section of the config, loading it on first use.
+    """
+    return _get_model(*_whisper_model_args(config))
+
+def get_faster_whisper_model(config):
+    """
+    Return the Faster Whisper model for the faster_whisper section of the config, loading it on first use.
+    """
+    return _get_model(*_faster_whisper_model_args(config))
+
+def preload_transcription_model(config):
+    """
+    Start loading the configured transcription engine's model on a background thread and return
+    straight away, so the load overlaps with queue scanning and video extraction. The first
+    transcription then picks up the loaded model, or waits for the load still in progress.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    if engine == 'whisper':
+        _submit_model_load(*_whisper_model_args(config.get('whisper', {})))
+    elif engine == 'faster_whisper':
+        _submit_model_load(*_faster_whisper_model_args(config.get('faster_whisper', {})))
+    else:
+        logger.warning(f"Not preloading a model for unsupported transcription engine: {engine}")
+
+def load_transcription_model(config, on_this_thread=False):
+    """
+    Return the configured transcription engine's model, loading it now if it isn't already.
+    With on_this_thread the load runs on the calling thread instead of the model loader thread,
+    e.g. right before forking.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    get_model = _load_model_on_this_thread if on_this_thread else _get_model
+    if engine == 'whisper':
+        return get_model(*_whisper_model_args(config.get('whisper', {})))
+    elif engine == 'faster_whisper':
+        return get_model(*_faster_whisper_model_args(config.get('faster_whisper', {})))
+    else:
+        raise ValueError(f"Unsupported transcription engine: {engine}")
+
+def find_quiet_cut(audio, start, end, sample_rate=SAMPLE_RATE):
+    """
+    The quietest point in the last CUT_SEARCH_SECONDS before end, where a window can end without
+    cutting a word in half. Among equally quiet points the latest is used, to keep windows long.
+    """
+    search_start = max(start, end - CUT_SEARCH_SECONDS * sample_rate)
+    frame_length = sample_rate // 10
+    energies = frame_energies_db(audio[search_start:end], frame_length)
+    if len(energies) == 0:
+        return end
+    quietest = len(energies) - 1 - int(np.argmin(energies[::-1]))
+    return search_start + quietest * frame_length + frame_length // 2
+
+def get_whisper_segmentation(config):
+    """
+    The segmentation setting of the whisper section: 'fixed' cuts every 30 seconds and decodes
+    each window on its own, 'context' cuts at silences and carries the text between windows.
+    """
+    segmentation = str(config.get('segmentation', 'fixed')).lower()
+    if segmentation not in ("fixed", "context"):
+        logger.warning(f"Unknown whisper segmentation '{segmentation}', using fixed")
+        return "fixed"
+    return segmentation
+
+@profiled("transcribe")
+def whisper_transcript(model, audio, config, cleanup_config=None, timestamp_map=None, timestamps=False, tempo=1.0, on_language=None, out=None):
+    """
+    Transcribe 16 kHz mono samples with a loaded Whisper model in 30 second windows and return the text.
+    With segmentation 'context' each window ends at the quietest point of its last few seconds, the
+    previous window's text is passed as the prompt, and a last segment that runs into the cut is left
+    for the next window, which starts at its timestamp. A window whose text repeats itself isn't
+    carried over, so a repetition loop doesn't spread to the next one.
+    With language 'auto' the language is detected on the first window with speech and passed to
+    the rest, so later windows skip detection and can't switch language; on_language is called with it.
+    Given a text file as out, each window is written to it as it is transcribed and None is returned.
+    """
+    cleanup_config = cleanup_config or {}
+    # Define segment length (30 seconds)
+    segment_length = 30 * SAMPLE_RATE
+    context = get_whisper_segmentation(config) == "context"
+
+    # Log the language
+    language = get_language(config)
+    logger.info(f"Transcribe language: {language or 'auto'}")
+
+    full_transcript = []
+    write = out.write if out is not None else full_transcript.append
+    separator = "\n" if timestamps else " "
+    fp16 = resolve_fp16(config, getattr(model, "device", "cpu"))
+    position, prompt, i = 0, None, 0
+    while position < len(audio):
+        end = min(position + segment_length, len(audio))
+        last_window = end == len(audio)
+        if context and not last_window:
+            end = find_quiet_cut(audio, position, end)
+        logger.info(f"Processing segment {i+1} ({format_duration(position / SAMPLE_RATE)} of {format_duration(len(audio) / SAMPLE_RATE)})")
+
+        # Pad or trim the segment
+        segment = pad_or_trim(audio[position:end])
+
+        # Transcribe the segment
+        options = {'initial_prompt': prompt} if prompt else {}
+        result = model.transcribe(segment, language=language, fp16=fp16, **options)
+
+        window_start = position / SAMPLE_RATE
+        advance = end - position
+        if result.get("segments"):
+            kept = [s for s in result["segments"] if not is_low_confidence_segment(s, cleanup_config)]
+            window_seconds = advance / SAMPLE_RATE
+            if (context and not last_window and len(kept) > 1 and kept[-1]["start"] >= 1.0
+                    and kept[-1]["end"] >= window_seconds - CUT_END_TOLERANCE_SECONDS):
+                # The last segment runs into the cut, transcribe it again from its start with the next window
+                advance = int(kept[-1]["start"] * SAMPLE_RATE)
+                kept = kept[:-1]
+            segment_text = ("\n" if timestamps else "").join(
+                format_segment(s["text"], window_start + s.get("start", 0), timestamp_map, timestamps, tempo) for s in kept
+            )
+            if context:
+                repeating = any(s.get("compression_ratio", 0) > REPETITION_COMPRESSION_RATIO for s in kept)
+                prompt = None if repeating else "".join(s["text"] for s in kept).strip() or None
+        else:
+            segment_text = format_segment(result["text"], window_start, timestamp_map, timestamps, tempo)
+
+        if language is None and segment_text.strip() and result.get("language"):
+            language = result["language"]
+            logger.info(f"Detected language: {language}")
+            if on_language:
+                on_language(language)
+
+        write(segment_text if i == 0 or out is None else separator + segment_text)
+        log_segment(config, i + 1, segment_text)
+        position += advance
+        i += 1
+
+    return separator.join(full_transcript) if out is None else None
+
+@profiled("transcribe")
+def faster_whisper_transcript(model, audio_input, config, cleanup_config=None, timestamp_map=None, timestamps=False, tempo=1.0, on_language=None, out=None):
+    """
+    Transcribe samples (or a file path) with a loaded Faster Whisper model and return the text.
+    With language 'auto' Faster Whisper detects it once for the file, and on_language is called with it.
+    Given a text file as out, each segment is written to it as it is produced and None is returned.
+    """
+    cleanup_config = cleanup_config or {}
+    beam_size = config.get('beam_size', 5)
 
-        # Define segment length (30 seconds)
-        segment_length = 30 * SAMPLE_RATE
+    # New configuration option for VAD
+    trim_silence = config.get('trim_silence', False)
+    # Convert string "true" to boolean True, everything else to False
+    vad_filter = str(trim_silence).lower() == "true"
 
-        # Process audio in segments
-        segments = [audio[i:i+segment_length] for i in range(0, len(audio), segment_length)]
+    language = get_language(config)
+    batch_size = get_batch_size(config)
+    if batch_size > 1:
+        # The batched pipeline splits the audio on speech with its own VAD and decodes the chunks together
+        from faster_whisper import BatchedInferencePipeline
+        segments, info = BatchedInferencePipeline(model=model).transcribe(audio_input, beam_size=beam_size, batch_size=batch_size, language=language)
+    else:
+        # Use the vad_filter parameter in the transcribe method
+        segments, info = model.transcribe(audio_input, beam_size=beam_size, vad_filter=vad_filter, language=language)
+    if language is None and getattr(info, "language", None):
+        logger.info(f"Detected language: {info.language} ({info.language_probability:.2f})")
+        if on_language:
+            on_language(info.language)
 
-        full_transcript = []
-        for i, segment in enumerate(segments):
-            logger.info(f"Processing segment {i+1}/{len(segments)}")
+    transcript_parts = []
+    write = out.write if out is not None else transcript_parts.append
+    dropped = 0
+    for segment in segments:
+        if is_low_confidence_segment(segment, cleanup_config):
+            dropped += 1
+            continue
+        log_segment(config, segment.id, segment.text)
+        if timestamps:
+            write(format_segment(segment.text, segment.start, timestamp_map, timestamps, tempo) + "\n")
+        else:
+            write(segment.text + " ")
+    if dropped:
+        logger.info(f"{dropped} segment(s) dropped as low-confidence/no-speech")
+    return "".join(transcript_parts) if out is None else None
 
-            # Pad or trim the segment
-            segment = pad_or_trim(segment)
+def stream_transcript(output_path, transcribe):
+    """
+    Call transcribe with a buffered text file to write the transcript to as it is produced, so
+    a long recording's transcript is never held in memory. The file is a hidden partial next to
+    output_path until transcribe returns, so a failure never leaves half a transcript behind.
+    """
+    partial_path = os.path.join(os.path.dirname(output_path), f".{os.path.basename(output_path)}.partial")
+    try:
+        with open(partial_path, "w", encoding="utf-8", buffering=TRANSCRIPT_BUFFER_BYTES) as f:
+            transcribe(f)
+        os.replace(partial_path, output_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
 
-            # Log the language
-            language = config.get('language', "auto")
-            logger.info(f"Transcribe language: {language}")
+def transcribe_with_whisper(audio_file_path, output_folder, config, cleanup_config=None, vad_config=None, timestamps=False, tempo=1.0, on_language=None):
+    """
+    Transcribe audio using OpenAI's Whisper model.
+    Segments flagged as no-speech by cleanup_config are left out of the transcript, and with
+    vad_config enabled silence is cut out before inference. A tempo above 1.0 transcribes the
+    recording played back faster. on_language is called with the detected language when it is
+    'auto'. Returns None without loading the model if it has no speech.
+    """
+    cleanup_config = cleanup_config or {}
+    vad_config = vad_config or {}
+    file_name = os.path.splitext(os.path.basename(audio_file_path))[0]
+    output_path = os.path.join(output_folder, f"{file_name}_transcript.md")
 
-            # Transcribe the segment
-            result = model.transcribe(segment, language=language)
+    try:
+        audio, timestamp_map = load_speech(audio_file_path, vad_config, load_audio, tempo)
+    except Exception as e:
+        logger.error(f"Error processing {file_name} with Whisper: {str(e)}")
+        return None
+    if len(audio) == 0:
+        logger.info(f"No speech detected in {file_name}, skipping transcription")
+        return None
 
-            full_transcript.append(result["text"])
-            logger.info(f"Segment {i+1} transcription: {result['text']}")  # Changed to info
+    # Load Whisper model, or reuse the one already loaded (or preloading) for this run
+    model = get_whisper_model(config)
+    logger.info(f"Whisper model dimensions: {model.dims}")
 
-        # Save transcript as markdown
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(" ".join(full_transcript))
+    try:
+        # Save transcript as markdown, window by window
+        stream_transcript(output_path, lambda out: whisper_transcript(
+            model, audio, config, cleanup_config, timestamp_map, timestamps, tempo, on_language, out=out))
 
         logger.info(f"Transcript saved: {output_path}")
         return output_path
@@ -74,37 +538,35 @@ def transcribe_with_whisper(audio_file_path, output_folder, config):
         logger.error(f"Error processing {file_name} with Whisper: {str(e)}")
         return None
 
-def transcribe_with_faster_whisper(audio_file_path, output_folder, config):
+def transcribe_with_faster_whisper(audio_file_path, output_folder, config, cleanup_config=None, vad_config=None, timestamps=False, tempo=1.0, on_language=None):
     """
     Transcribe audio using Faster Whisper model.
+    Segments flagged as no-speech by cleanup_config are left out of the transcript, and with
+    vad_config enabled silence is cut out before inference. A tempo above 1.0 transcribes the
+    recording played back faster. on_language is called with the detected language when it is
+    'auto'. Returns None without loading the model if it has no speech.
     """
+    cleanup_config = cleanup_config or {}
+    vad_config = vad_config or {}
     file_name = os.path.splitext(os.path.basename(audio_file_path))[0]
     output_path = os.path.join(output_folder, f"{file_name}_transcript.md")
 
     try:
-        model_size = config.get('model', 'base-v3')
-        device = config.get('device', 'cuda')
-        compute_type = config.get('compute_type', 'float16')
-        beam_size = config.get('beam_size', 5)
-        
-        # New configuration option for VAD
-        trim_silence = config.get('trim_silence', False)
-        # Convert string "true" to boolean True, everything else to False
-        vad_filter = str(trim_silence).lower() == "true"
-
-        model = WhisperModel(model_size, device=device, compute_type=compute_type)
-
-        # Use the vad_filter parameter in the transcribe method
-        segments, info = model.transcribe(audio_file_path, beam_size=beam_size, vad_filter=vad_filter)
-
-        transcript_text = ""
-        for segment in segments:
-            logger.info(f"Segment {segment.id}: {segment.text}")
-            transcript_text += segment.text + " "
+        timestamp_map = None
+        if vad_config.get('enabled') or tempo != 1.0:
+            audio_input, timestamp_map = load_speech(audio_file_path, vad_config, load_audio_faster_whisper, tempo)
+            if len(audio_input) == 0:
+                logger.info(f"No speech detected in {file_name}, skipping transcription")
+                return None
+        else:
+            # Files already in Whisper's native format are passed as samples so they aren't decoded again
+            audio = read_native_wav(audio_file_path)
+            audio_input = audio if audio is not None else audio_file_path
 
-        # Save transcript as markdown
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(transcript_text)
+        model = get_faster_whisper_model(config)
+        # Save transcript as markdown, segment by segment
+        stream_transcript(output_path, lambda out: faster_whisper_transcript(
+            model, audio_input, config, cleanup_config, timestamp_map, timestamps, tempo, on_language, out=out))
 
         logger.info(f"Transcript saved: {output_path}")
         return output_path
@@ -112,15 +574,81 @@ def transcribe_with_faster_whisper(audio_file_path, output_folder, config):
         logger.error(f"Error processing {file_name} with Faster Whisper: {str(e)}")
         return None
 
+def get_transcript_settings(config):
+    """
+    The segment cleanup, VAD and timestamp settings shared by both engines.
+    """
+    timestamps = str(config.get('transcript_timestamps', False)).lower() == "true"
+    return get_cleanup_config(config), get_vad_config(config), timestamps
+
+def transcribe_samples(audio, config, tempo=1.0):
+    """
+    Transcribe 16 kHz mono float32 samples already in memory with the configured engine and
+    return the transcript text ("" when there is no speech). tempo is the speed the samples
+    were decoded at, so timestamps refer to the original recording.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    cleanup_config, vad_config, timestamps = get_transcript_settings(config)
+    audio, timestamp_map = apply_vad(np.asarray(audio, dtype=np.float32), vad_config)
+    if len(audio) == 0:
+        logger.info("No speech detected, skipping transcription")
+        return ""
+    if engine == 'whisper':
+        engine_config = config.get('whisper', {})
+        return whisper_transcript(get_whisper_model(engine_config), audio, engine_config, cleanup_config, timestamp_map, timestamps, tempo)
+    elif engine == 'faster_whisper':
+        engine_config = config.get('faster_whisper', {})
+        return faster_whisper_transcript(get_faster_whisper_model(engine_config), audio, engine_config, cleanup_config, timestamp_map, timestamps, tempo)
+    else:
+        raise ValueError(f"Unsupported transcription engine: {engine}")
+
+@profiled("transcribe")
+def transcribe_segments(audio, config, on_language=None):
+    """
+    Transcribe 16 kHz mono float32 samples with the configured engine and return the kept
+    segments as (start, end, text), in seconds from the start of the samples. Live
+    transcription uses the segment boundaries to decide where the next window starts.
+    on_language is called with the detected language when it is 'auto' and there was speech.
+    """
+    engine = config.get('transcription_engine', 'whisper')
+    cleanup_config = get_cleanup_config(config)
+    audio = np.asarray(audio, dtype=np.float32)
+    if engine == 'whisper':
+        engine_config = config.get('whisper', {})
+        model = get_whisper_model(engine_config)
+        language = get_language(engine_config)
+        result = model.transcribe(audio, language=language, fp16=resolve_fp16(engine_config, getattr(model, "device", "cpu")))
+        segments = [(s["start"], s["end"], s["text"]) for s in result.get("segments") or [] if not is_low_confidence_segment(s, cleanup_config)]
+        if language is None and segments and on_language and result.get("language"):
+            on_language(result["language"])
+        return segments
+    elif engine == 'faster_whisper':
+        engine_config = config.get('faster_whisper', {})
+        vad_filter = str(engine_config.get('trim_silence', False)).lower() == "true"
+        language = get_language(engine_config)
+        segments, info = get_faster_whisper_model(engine_config).transcribe(audio, beam_size=engine_config.get('beam_size', 5), vad_filter=vad_filter, language=language)
+        segments = [(s.start, s.end, s.text) for s in segments if not is_low_confidence_segment(s, cleanup_config)]
+        if language is None and segments and on_language and getattr(info, "language", None):
+            on_language(info.language)
+        return segments
+    else:
+        raise ValueError(f"Unsupported transcription engine: {engine}")
+
 def transcribe_audio(audio_file_path, output_folder, config):
     """
     Select and execute the appropriate transcription engine based on configuration.
     """
     engine = config.get('transcription_engine', 'whisper')
     output_folder = os.path.dirname(audio_file_path)
+    cleanup_config, vad_config, timestamps = get_transcript_settings(config)
+    # Summary folders can trade a little accuracy for speed with playback_speed in their summary-config.yaml
+    tempo = get_playback_speed(output_folder)
+    if tempo != 1.0:
+        logger.info(f"Transcribing at {tempo:g}x playback speed")
+    config, on_language = get_folder_language(config, output_folder)
     if engine == 'whisper':
-        return transcribe_with_whisper(audio_file_path, output_folder, config.get('whisper', {}))
+        return transcribe_with_whisper(audio_file_path, output_folder, config.get('whisper', {}), cleanup_config, vad_config, timestamps, tempo, on_language=on_language)
     elif engine == 'faster_whisper':
-        return transcribe_with_faster_whisper(audio_file_path, output_folder, config.get('faster_whisper', {}))
+        return transcribe_with_faster_whisper(audio_file_path, output_folder, config.get('faster_whisper', {}), cleanup_config, vad_config, timestamps, tempo, on_language=on_language)
     else:
         raise ValueError(f"Unsupported transcription engine: {engine}")
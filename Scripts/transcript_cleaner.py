@@ -0,0 +1,149 @@
+import re
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILLERS = ["um", "umm", "uh", "uhh", "erm", "er", "ah", "hmm", "mm", "mmm"]
+
+# Tags Whisper emits for silence, music and other non-speech audio
+NON_SPEECH_PATTERN = re.compile(
+    r"[\[\(]\s*(?:blank[_ ]audio|silence|music|inaudible|no speech|background noise|applause|laughter)\s*[\]\)]",
+    re.IGNORECASE
+)
+ELLIPSIS_RUN_PATTERN = re.compile(r"(?:\.\s*){4,}")
+WORD_NORMALIZE_PATTERN = re.compile(r"[^\w']+")
+# A line left holding only its [H:MM:SS] timestamp once its text has been cleaned away
+TIMESTAMP_ONLY_PATTERN = re.compile(r"\s*\[\d+:\d{2}:\d{2}\]\s*$")
+
+
+def get_cleanup_config(config):
+    """
+    Return the transcript_cleanup section of the config with defaults filled in.
+    """
+    cleanup_config = config.get('transcript_cleanup', {}) or {}
+    return {
+        'enabled': str(cleanup_config.get('enabled', False)).lower() == "true",
+        'remove_fillers': str(cleanup_config.get('remove_fillers', True)).lower() == "true",
+        'fillers': cleanup_config.get('fillers', DEFAULT_FILLERS),
+        'max_phrase_repeats': int(cleanup_config.get('max_phrase_repeats', 3)),
+        'max_phrase_words': int(cleanup_config.get('max_phrase_words', 12)),
+        'no_speech_threshold': float(cleanup_config.get('no_speech_threshold', 0.6)),
+        'log_prob_threshold': float(cleanup_config.get('log_prob_threshold', -1.0)),
+    }
+
+
+def estimate_tokens(text):
+    """
+    Rough token estimate (about four characters per token for English text).
+    """
+    return (len(text) + 3) // 4
+
+
+def _segment_value(segment, key):
+    if isinstance(segment, dict):
+        value = segment.get(key)
+    else:
+        value = getattr(segment, key, None)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def is_low_confidence_segment(segment, cleanup_config):
+    """
+    Whisper's own no-speech heuristic: drop a segment when the model thinks it is
+    probably silence and it also had low confidence in the decoded text.
+    Works with Whisper result dicts and Faster Whisper segment objects.
+    """
+    if not cleanup_config.get('enabled'):
+        return False
+    no_speech_prob = _segment_value(segment, 'no_speech_prob')
+    avg_logprob = _segment_value(segment, 'avg_logprob')
+    if no_speech_prob is None or avg_logprob is None:
+        return False
+    return (no_speech_prob > cleanup_config['no_speech_threshold']
+            and avg_logprob < cleanup_config['log_prob_threshold'])
+
+
+def collapse_repeated_phrases(text, max_repeats=3, max_phrase_words=12):
+    """
+    Collapse runs of the same phrase repeated back to back (e.g. Whisper's
+    "Thank you. Thank you. Thank you." hallucination loops) down to max_repeats copies.
+    """
+    words = text.split()
+    normalized = [WORD_NORMALIZE_PATTERN.sub("", word).lower() for word in words]
+    output = []
+    i = 0
+    total = len(words)
+    while i < total:
+        collapsed = False
+        for n in range(1, max_phrase_words + 1):
+            if i + n * (max_repeats + 1) > total:
+                break
+            phrase = normalized[i:i + n]
+            if not any(phrase):
+                continue
+            count = 1
+            j = i + n
+            while j + n <= total and normalized[j:j + n] == phrase:
+                count += 1
+                j += n
+            if count > max_repeats:
+                output.extend(words[i:i + n * max_repeats])
+                i = j
+                collapsed = True
+                break
+        if not collapsed:
+            output.append(words[i])
+            i += 1
+    return " ".join(output)
+
+
+def remove_fillers(text, fillers):
+    if not fillers:
+        return text
+    alternatives = "|".join(re.escape(filler) for filler in sorted(fillers, key=len, reverse=True))
+    filler_pattern = re.compile(rf"(?<![\w'-])(?:{alternatives})(?![\w'-]),?", re.IGNORECASE)
+    return filler_pattern.sub("", text)
+
+
+def collapse_whitespace(text):
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    text = "\n".join(lines)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    # Tidy up punctuation left dangling by removed words
+    text = re.sub(r" +([,.!?])", r"\1", text)
+    text = re.sub(r",\s*([,.!?])", r"\1", text)
+    return text.strip()
+
+
+def clean_transcript(text, config):
+    """
+    Normalize a transcript before it is sent to the LLM.
+    Returns the cleaned text and a dict of token statistics.
+    """
+    cleanup_config = get_cleanup_config(config)
+    original_tokens = estimate_tokens(text)
+    if not cleanup_config['enabled']:
+        return text, {'original_tokens': original_tokens, 'cleaned_tokens': original_tokens, 'tokens_saved': 0}
+
+    cleaned = NON_SPEECH_PATTERN.sub(" ", text)
+    cleaned = ELLIPSIS_RUN_PATTERN.sub("... ", cleaned)
+    if cleanup_config['remove_fillers']:
+        cleaned = remove_fillers(cleaned, cleanup_config['fillers'])
+    lines = [
+        collapse_repeated_phrases(line, cleanup_config['max_phrase_repeats'], cleanup_config['max_phrase_words'])
+        for line in cleaned.splitlines()
+    ]
+    cleaned = "\n".join(line for line in lines if not TIMESTAMP_ONLY_PATTERN.match(line))
+    cleaned = collapse_whitespace(cleaned)
+
+    cleaned_tokens = estimate_tokens(cleaned)
+    stats = {
+        'original_tokens': original_tokens,
+        'cleaned_tokens': cleaned_tokens,
+        'tokens_saved': original_tokens - cleaned_tokens,
+    }
+    return cleaned, stats
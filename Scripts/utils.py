@@ -1,9 +1,16 @@
 import os
-import shutil
+import re
 from datetime import datetime
 from .config_handler import get_config
+from .archiver import archive_file
+from .search_index import get_search_index_config, index_document
 
-def move_file(source_path, config):
+def move_file(source_path, config, on_complete=None):
+    """
+    Move a processed file from the queue into the output folder laid out by output_structure.
+    on_complete is called with the archived path (None if the file was dropped) once the file
+    has left the queue, which may be after this returns when the copy runs in the background.
+    """
     filename = os.path.basename(source_path)
     
     # Load output structure config
@@ -13,6 +20,8 @@ def move_file(source_path, config):
     
     # Extract base filename without extension or suffixes
     base_filename = filename
+    # Named summaries fanned out from one transcript: <file>_transcript_<name>_summary.md
+    base_filename = re.sub(r"_transcript_[\w-]+_summary\.md$", "", base_filename)
     suffixes = ["_transcript_summary", "_transcript", "_summary"]
     for suffix in suffixes:
         if base_filename.endswith(suffix + ".md"):
@@ -40,5 +49,18 @@ def move_file(source_path, config):
     
     destination_path = os.path.join(output_dir, filename)
 
-    shutil.move(source_path, destination_path)
-    print(f"Moved file to: {destination_path}")
+    # Transcripts and summaries are read before the move, and indexed once it has finished,
+    # which may be in the background, so the index records the archived file's mtime
+    text = None
+    if filename.endswith(".md") and get_search_index_config(config)['enabled']:
+        with open(source_path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+
+    def moved(archived_path):
+        if text is not None and archived_path:
+            index_document(archived_path, text, config)
+        if on_complete:
+            on_complete(archived_path)
+
+    # Moves the file, applying the output_structure.archive policy (transcoding, checksums)
+    return archive_file(source_path, destination_path, config, moved)
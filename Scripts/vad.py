@@ -0,0 +1,132 @@
+import bisect
+import logging
+from typing import NamedTuple
+import numpy as np
+from .media_probe import WHISPER_SAMPLE_RATE
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class SpeechSpan(NamedTuple):
+    speech_start: float    # seconds into the speech-only audio
+    original_start: float  # seconds into the original recording
+    duration: float
+
+
+def get_vad_config(config):
+    """
+    Return the vad section of the config with defaults filled in.
+    """
+    vad_config = config.get('vad', {}) or {}
+    return {
+        'enabled': str(vad_config.get('enabled', False)).lower() == "true",
+        'energy_threshold_db': float(vad_config.get('energy_threshold_db', -45)),
+        'margin_db': float(vad_config.get('margin_db', 10)),
+        'frame_ms': int(vad_config.get('frame_ms', 30)),
+        'min_speech_ms': int(vad_config.get('min_speech_ms', 250)),
+        'min_silence_ms': int(vad_config.get('min_silence_ms', 600)),
+        'padding_ms': int(vad_config.get('padding_ms', 300)),
+    }
+
+
+def frame_energies_db(audio, frame_length):
+    """
+    RMS level of each frame in dBFS (float audio in -1..1).
+    """
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return np.empty(0)
+    frames = np.asarray(audio[:frame_count * frame_length], dtype=np.float64).reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_speech(audio, vad_config, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Find the speech regions of a recording with a frame energy detector.
+
+    A frame is speech when it is louder than both energy_threshold_db and the recording's
+    noise floor (its quietest 10% of frames) plus margin_db, capped so that steady speech
+    with few pauses isn't measured against itself. Gaps shorter than min_silence_ms are
+    bridged, regions shorter than min_speech_ms are dropped and the rest are padded by
+    padding_ms on each side. Returns a list of (start_sample, end_sample) pairs.
+    """
+    frame_length = max(int(sample_rate * vad_config['frame_ms'] / 1000), 1)
+    energies = frame_energies_db(audio, frame_length)
+    if len(energies) == 0:
+        return []
+
+    noise_floor = np.percentile(energies, 10)
+    loud_level = np.percentile(energies, 90)
+    threshold = max(vad_config['energy_threshold_db'],
+                    min(noise_floor + vad_config['margin_db'], loud_level - vad_config['margin_db']))
+    is_speech = energies > threshold
+
+    # Turn speech frames into [start, end) frame runs
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    runs = list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+    min_silence_frames = vad_config['min_silence_ms'] / vad_config['frame_ms']
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_silence_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech_frames = vad_config['min_speech_ms'] / vad_config['frame_ms']
+    padding = int(sample_rate * vad_config['padding_ms'] / 1000)
+    regions = []
+    for start, end in merged:
+        if end - start < min_speech_frames:
+            continue
+        start_sample = max(int(start) * frame_length - padding, 0)
+        # A region running to the last full frame also keeps the partial frame after it
+        end_sample = len(audio) if end == len(energies) else min(int(end) * frame_length + padding, len(audio))
+        if regions and start_sample <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end_sample)
+        else:
+            regions.append((start_sample, end_sample))
+    return regions
+
+
+def compact_speech(audio, regions, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Join the speech regions into one array and build the timestamp map back to the original.
+    """
+    if not regions:
+        return np.zeros(0, dtype=np.float32), []
+    timestamp_map = []
+    speech_start = 0
+    for start, end in regions:
+        timestamp_map.append(SpeechSpan(speech_start / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        speech_start += end - start
+    speech = np.concatenate([np.asarray(audio[start:end], dtype=np.float32) for start, end in regions])
+    return speech, timestamp_map
+
+
+def to_original_time(seconds, timestamp_map):
+    """
+    Convert a time in the speech-only audio to the time in the original recording.
+    """
+    if not timestamp_map:
+        return seconds
+    index = bisect.bisect_right([span.speech_start for span in timestamp_map], seconds) - 1
+    span = timestamp_map[max(index, 0)]
+    return span.original_start + min(max(seconds - span.speech_start, 0), span.duration)
+
+
+def apply_vad(audio, vad_config, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Drop the non-speech parts of a recording before it reaches the model.
+    Returns the audio to transcribe and its timestamp map (None when VAD is disabled).
+    A recording with no speech comes back as an empty array.
+    """
+    if not vad_config.get('enabled'):
+        return audio, None
+    regions = detect_speech(audio, vad_config, sample_rate)
+    speech, timestamp_map = compact_speech(audio, regions, sample_rate)
+    logger.info(f"VAD kept {len(speech) / sample_rate:.1f}s of speech from {len(audio) / sample_rate:.1f}s of audio")
+    return speech, timestamp_map
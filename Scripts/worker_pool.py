@@ -0,0 +1,160 @@
+import os
+import logging
+import multiprocessing
+from .transcriber import transcribe_audio_flow
+from .transcriber_utils import load_transcription_model, resolve_transcription_device, model_loaded_in_process
+from .profiler import reset_for_worker, take_worker_profile, merge_worker_profile
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Peak private memory seen for each worker, by pid
+_worker_peaks = {}
+
+
+def get_worker_pool_config(config):
+    """
+    Return the worker_pool section of the config with defaults filled in.
+    """
+    pool_config = config.get('worker_pool', {}) or {}
+    return {
+        'enabled': str(pool_config.get('enabled', False)).lower() == "true",
+        'workers': max(1, int(pool_config.get('workers', 2))),
+    }
+
+
+def memory_usage():
+    """
+    Resident (RSS), proportional (PSS) and private (USS) memory of this process in bytes, from
+    /proc/self/smaps_rollup. USS is what the process alone holds, so for a forked worker it is
+    its cost on top of the model pages it still shares with the parent. None where unavailable.
+    """
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line and not line.startswith(" "))
+    except OSError:
+        return None
+    kilobytes = {name: int(value.split()[0]) for name, value in fields.items() if value.strip().endswith("kB")}
+    return {
+        'rss': kilobytes.get('Rss', 0) * 1024,
+        'pss': kilobytes.get('Pss', 0) * 1024,
+        'uss': (kilobytes.get('Private_Clean', 0) + kilobytes.get('Private_Dirty', 0)) * 1024,
+    }
+
+
+# Cores each worker of this process's pool may use, set when a worker starts
+_worker_threads = None
+
+
+def split_threads(config, threads):
+    """
+    Return the config with a faster_whisper cpu_threads of 'auto' set to a worker's share of the
+    cores, so CTranslate2 workers don't each start a thread per core.
+    """
+    if config.get('transcription_engine', 'whisper') != 'faster_whisper':
+        return config
+    section = config.get('faster_whisper', {}) or {}
+    if str(section.get('cpu_threads', 'auto')).lower() != "auto":
+        return config
+    return {**config, 'faster_whisper': {**section, 'cpu_threads': threads}}
+
+
+def _init_worker(engine, threads, config=None):
+    global _worker_threads
+    # A forked worker starts with a copy of the parent's profile so far; report only its own
+    reset_for_worker()
+    # Split the cores between the workers instead of every worker using all of them
+    _worker_threads = threads
+    if engine == 'whisper':
+        import torch
+        torch.set_num_threads(threads)
+    # A spawned worker shares nothing with the parent and loads its own model up front
+    if config is not None:
+        load_transcription_model(split_threads(config, threads))
+
+
+def _transcribe_in_worker(audio_file_path, queue_folder, config):
+    transcript_path = transcribe_audio_flow(audio_file_path, queue_folder, split_threads(config, _worker_threads))
+    return transcript_path, os.getpid(), memory_usage(), take_worker_profile()
+
+
+def start_transcription_pool(config, jobs):
+    """
+    Start worker processes to transcribe several files at once. Call it before any other thread
+    is started (model preload, LLM client, lease heartbeats).
+
+    For the whisper engine on the CPU the model is loaded once, on this thread, and the workers
+    are forked and share its weights copy-on-write, so N concurrent transcriptions don't need N
+    copies of the model in RAM. Torch models are also moved to shared memory so nothing a worker
+    does to them copies pages. Forking isn't safe otherwise: a CUDA context can't be used in a
+    forked child, and CTranslate2 (faster_whisper) starts thread pools when it loads a model that
+    a forked child doesn't have. Then, and after this process has already loaded a model (e.g. in
+    an auto-tuning run), the workers are spawned and each loads its own model. Either way each
+    worker gets its share of the cores.
+    Returns None (transcribe in this process) when the pool is disabled, there are fewer than
+    two jobs, or the platform can't start workers the way the engine needs.
+    """
+    pool_config = get_worker_pool_config(config)
+    workers = min(pool_config['workers'], jobs)
+    if not pool_config['enabled'] or workers < 2:
+        return None
+
+    engine = config.get('transcription_engine', 'whisper')
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    device = resolve_transcription_device(config)
+    if engine != 'whisper' or device.startswith("cuda") or model_loaded_in_process():
+        if engine != 'whisper':
+            reason = "CTranslate2 can't be forked"
+        elif device.startswith("cuda"):
+            reason = "CUDA can't be forked"
+        else:
+            reason = "a model was already loaded in this process"
+        print(f"Starting {workers} transcription workers that each load the model ({reason})")
+        return multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(engine, threads, config))
+    if "fork" not in multiprocessing.get_all_start_methods():
+        print("Warning: worker_pool needs fork (Linux/macOS) for the whisper engine on the CPU, transcribing one file at a time")
+        return None
+
+    try:
+        model = load_transcription_model(config, on_this_thread=True)
+    except Exception as e:
+        logger.error(f"Could not load the transcription model for the worker pool: {str(e)}")
+        return None
+    if hasattr(model, "share_memory"):
+        model.share_memory()
+
+    parent_usage = memory_usage()
+    if parent_usage:
+        print(f"Model loaded once, {parent_usage['rss'] / MB:.0f} MB resident; forking {workers} transcription workers")
+    return multiprocessing.get_context("fork").Pool(workers, initializer=_init_worker, initargs=(engine, threads))
+
+
+def submit_transcription(pool, audio_file_path, queue_folder, config):
+    return pool.apply_async(_transcribe_in_worker, (audio_file_path, queue_folder, config))
+
+
+def collect_transcription(result):
+    """
+    Wait for a submitted transcription and report the worker's memory. Returns the transcript
+    path, or raises the worker's exception.
+    """
+    transcript_path, pid, usage, profile = result.get()
+    merge_worker_profile(profile)
+    if usage:
+        _worker_peaks[pid] = max(_worker_peaks.get(pid, 0), usage['uss'])
+        print(f"Worker {pid}: {usage['uss'] / MB:.0f} MB private, {usage['rss'] / MB:.0f} MB resident "
+              f"({(usage['rss'] - usage['uss']) / MB:.0f} MB shared)")
+    return transcript_path
+
+
+def stop_transcription_pool(pool):
+    pool.close()
+    pool.join()
+    if _worker_peaks:
+        total = sum(_worker_peaks.values())
+        print(f"Transcription workers used {total / MB:.0f} MB on top of the shared model "
+              f"(peak {max(_worker_peaks.values()) / MB:.0f} MB per worker)")
+        _worker_peaks.clear()
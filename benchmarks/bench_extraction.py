@@ -0,0 +1,78 @@
+"""
+Benchmark audio extraction from a long video: one ffmpeg pass vs parallel ranges vs stream copy.
+
+    python benchmarks/bench_extraction.py [--minutes 60] [--size 1920x1080] [--workers 2 4] [--video existing.mp4]
+
+Without --video a synthetic H.264/AAC video is generated first (this takes a while for long
+durations). Reports wall time, how many times faster than realtime and MB/s of video read
+for each extraction mode. Needs ffmpeg.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scripts.audio_extractor import extract_audio, get_extraction_config
+from Scripts.media_probe import probe_media
+
+
+def make_video(path, minutes, size):
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y",
+        "-f", "lavfi", "-i", f"testsrc=duration={minutes * 60}:size={size}:rate=30",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={minutes * 60}",
+        "-vcodec", "libx264", "-preset", "ultrafast", "-acodec", "aac", "-pix_fmt", "yuv420p",
+        path
+    ], check=True, capture_output=True)
+
+
+def time_extraction(video_path, output_folder, extraction_config):
+    start = time.perf_counter()
+    output_path = extract_audio(video_path, output_folder, extraction_config=extraction_config)
+    elapsed = time.perf_counter() - start
+    os.remove(output_path)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio extraction modes")
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--segment-minutes", type=float, default=10)
+    parser.add_argument("--video", help="Use an existing video instead of generating one")
+    args = parser.parse_args()
+
+    work_folder = tempfile.mkdtemp(prefix="bench_extract_")
+    try:
+        video_path = args.video
+        if not video_path:
+            video_path = os.path.join(work_folder, "long_video.mp4")
+            print(f"Generating a {args.minutes:g} minute {args.size} test video...")
+            make_video(video_path, args.minutes, args.size)
+        duration = probe_media(video_path).duration
+        size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        print(f"{os.path.basename(video_path)}: {duration / 60:.1f} min, {size_mb:.0f} MB")
+
+        modes = [("single ffmpeg pass", get_extraction_config({}))]
+        for workers in args.workers:
+            modes.append((f"parallel, {workers} workers", get_extraction_config({'extraction': {
+                'parallel': True, 'max_workers': workers, 'segment_minutes': args.segment_minutes, 'min_parallel_minutes': 0,
+            }})))
+        modes.append(("stream copy", get_extraction_config({'extraction': {'stream_copy': True}})))
+
+        print(f"{'mode':<24} {'seconds':>8} {'realtime':>9} {'MB/s':>8}")
+        for name, extraction_config in modes:
+            elapsed = time_extraction(video_path, work_folder, extraction_config)
+            print(f"{name:<24} {elapsed:8.2f} {duration / elapsed:8.0f}x {size_mb / elapsed:8.1f}")
+    finally:
+        shutil.rmtree(work_folder)
+
+
+if __name__ == "__main__":
+    main()
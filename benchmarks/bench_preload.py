@@ -0,0 +1,100 @@
+"""
+Benchmark time-to-first-transcript with and without preloading the transcription model.
+
+    python benchmarks/bench_preload.py [--minutes 5] [--video existing.mp4] [--runs 2]
+
+Replays the start of a run on a queue holding one video: scan the queue, extract the video's
+audio and transcribe it, using the transcription settings in config.yaml. Each mode runs in a
+fresh Python process so every run starts with a cold model. With preloading the model loads
+while ffmpeg extracts the audio, so the saving is up to the shorter of the two. Needs ffmpeg
+and the configured engine.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_video(path, minutes):
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y",
+        "-f", "lavfi", "-i", f"testsrc=duration={minutes * 60}:size=1280x720:rate=30",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={minutes * 60}",
+        "-vcodec", "libx264", "-preset", "ultrafast", "-acodec", "aac", "-pix_fmt", "yuv420p",
+        path
+    ], check=True, capture_output=True)
+
+
+def time_first_transcript(queue_folder, preload):
+    """
+    Runs in the child process: seconds from the start of the run until the first transcript is written.
+    """
+    start = time.perf_counter()
+    from Scripts.config_handler import get_config
+    from Scripts.queue_scanner import scan_queue
+    from Scripts.file_processor import preload_models
+    from Scripts.audio_extractor import extract_audio, get_extraction_config
+    from Scripts.transcriber_utils import transcribe_audio
+
+    config = get_config()
+    config['preload_models'] = preload
+    plan = scan_queue(queue_folder)
+    preload_models(config, plan)
+    video = plan.videos[0]
+    audio_path = extract_audio(video.path, queue_folder, extraction_config=get_extraction_config(config))
+    transcript_path = transcribe_audio(audio_path, queue_folder, config)
+    elapsed = time.perf_counter() - start
+    os.remove(audio_path)
+    if transcript_path:
+        os.remove(transcript_path)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-to-first-transcript with model preloading")
+    parser.add_argument("--minutes", type=float, default=5)
+    parser.add_argument("--video", help="Use an existing video instead of generating one")
+    parser.add_argument("--runs", type=int, default=2, help="Runs per mode, the fastest is reported")
+    parser.add_argument("--child", choices=["on", "off"], help=argparse.SUPPRESS)
+    parser.add_argument("--queue", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(time_first_transcript(args.queue, args.child == "on"))
+        return
+
+    queue_folder = tempfile.mkdtemp(prefix="bench_preload_")
+    try:
+        video_path = os.path.join(queue_folder, "meeting.mp4")
+        if args.video:
+            shutil.copyfile(args.video, video_path)
+        else:
+            print(f"Generating a {args.minutes:g} minute test video...")
+            make_video(video_path, args.minutes)
+
+        results = {}
+        for mode in ("off", "on"):
+            times = []
+            for _ in range(args.runs):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", mode, "--queue", queue_folder],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                times.append(float(output.strip().splitlines()[-1]))
+            results[mode] = min(times)
+
+        print(f"{'preload':<8} {'first transcript (s)':>21}")
+        for mode, elapsed in results.items():
+            print(f"{mode:<8} {elapsed:21.2f}")
+        print(f"Saved {results['off'] - results['on']:.2f}s ({(1 - results['on'] / results['off']) * 100:.0f}%)")
+    finally:
+        shutil.rmtree(queue_folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark the queue scan against the previous per-stage os.listdir approach.
+
+    python benchmarks/bench_queue_scan.py [--files 50000] [--folders 50] [--repeat 3]
+
+Builds a synthetic queue of mostly archived, non-recording files plus a sprinkling of
+audio files and transcripts, then times one scan_queue call against the old behaviour,
+where each of the three stages listed the queue and every subfolder and stat'ed entries itself.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scripts.queue_scanner import scan_queue
+
+
+def build_tree(root, total_files, folders):
+    per_folder = total_files // folders
+    for folder_index in range(folders):
+        folder = os.path.join(root, f"type_{folder_index:03d}")
+        os.makedirs(folder)
+        if folder_index % 10 != 9:
+            open(os.path.join(folder, "summary-rules.txt"), "w").close()
+        for file_index in range(per_folder):
+            if file_index % 100 == 0:
+                name = f"recording_{file_index}.wav"
+            elif file_index % 100 == 1:
+                name = f"recording_{file_index}_transcript.md"
+            else:
+                name = f"archived_{file_index}.json"
+            open(os.path.join(folder, name), "w").close()
+    for video_index in range(folders):
+        open(os.path.join(root, f"video_{video_index}.mp4"), "w").close()
+
+
+def legacy_scan(queue_folder):
+    """
+    The scanning work the three stages used to do independently.
+    """
+    video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
+    audio_extensions = ['.mp3', '.wav', '.m4a', '.flac']
+    found = 0
+    for filename in os.listdir(queue_folder):
+        if any(filename.lower().endswith(ext) for ext in video_extensions):
+            found += 1
+    for matcher in (
+        lambda filename: any(filename.lower().endswith(ext) for ext in audio_extensions),
+        lambda filename: filename.endswith('_transcript.md'),
+    ):
+        for item in os.listdir(queue_folder):
+            item_path = os.path.join(queue_folder, item)
+            if os.path.isdir(item_path):
+                if os.path.exists(os.path.join(item_path, "summary-rules.txt")):
+                    for filename in os.listdir(item_path):
+                        if matcher(filename):
+                            found += 1
+    return found
+
+
+def time_call(function, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queue scanning")
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--folders", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_queue_")
+    try:
+        build_tree(root, args.files, args.folders)
+        legacy_time, legacy_found = time_call(lambda: legacy_scan(root), args.repeat)
+        scan_time, plan = time_call(lambda: scan_queue(root), args.repeat)
+        planned = len(plan.videos) + len(plan.audio) + len(plan.transcripts)
+        print(f"Synthetic queue: {args.files} files in {args.folders} folders")
+        print(f"legacy per-stage listdir: {legacy_time * 1000:8.1f} ms ({legacy_found} items)")
+        print(f"scan_queue (one pass):    {scan_time * 1000:8.1f} ms ({planned} items, with size and mtime)")
+        print(f"speedup: {legacy_time / scan_time:.2f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark accelerated-playback transcription: real-time factor and word error rate per speed.
+
+    python benchmarks/bench_tempo.py sample.wav [--reference sample.txt] [--speeds 1.0 1.25 1.5 2.0]
+                                     [--engine faster_whisper] [--model small.en] [--device cpu]
+
+Each speed decodes the sample through ffmpeg's atempo filter (the same path playback_speed
+uses) and transcribes it with one already-loaded model. RTF is transcription time divided by
+the original recording's duration (lower is faster). WER is measured against --reference,
+or against the 1.0x transcript when no reference is given. Needs ffmpeg and the chosen engine.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scripts.audio_extractor import decode_audio_at_tempo
+from Scripts.media_probe import probe_media
+
+
+def normalize_words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    (substitutions + deletions + insertions) / reference words, by word-level edit distance.
+    """
+    reference_words = normalize_words(reference)
+    hypothesis_words = normalize_words(hypothesis)
+    if not reference_words:
+        return 0.0 if not hypothesis_words else 1.0
+    previous = list(range(len(hypothesis_words) + 1))
+    for i, reference_word in enumerate(reference_words, 1):
+        current = [i]
+        for j, hypothesis_word in enumerate(hypothesis_words, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (reference_word != hypothesis_word),
+            ))
+        previous = current
+    return previous[-1] / len(reference_words)
+
+
+def make_transcriber(engine, model_name, device):
+    if engine == "faster_whisper":
+        from faster_whisper import WhisperModel
+        model = WhisperModel(model_name, device=device, compute_type="int8" if device == "cpu" else "float16")
+        return lambda audio: " ".join(segment.text for segment in model.transcribe(audio, beam_size=5)[0])
+    import whisper
+    model = whisper.load_model(model_name, device=device)
+    return lambda audio: model.transcribe(audio, fp16=device != "cpu")["text"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription speed and accuracy by playback speed")
+    parser.add_argument("audio")
+    parser.add_argument("--reference", help="Text file with the correct transcript")
+    parser.add_argument("--speeds", type=float, nargs="+", default=[1.0, 1.25, 1.5, 1.75, 2.0])
+    parser.add_argument("--engine", choices=["whisper", "faster_whisper"], default="faster_whisper")
+    parser.add_argument("--model", default="small.en")
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    info = probe_media(args.audio)
+    if info is None or not info.duration:
+        sys.exit(f"Could not read the duration of {args.audio}")
+    reference = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = f.read()
+
+    transcribe = make_transcriber(args.engine, args.model, args.device)
+    # Without a reference the 1.0x transcript is the baseline, so it runs first
+    speeds = sorted(set(args.speeds) | ({1.0} if reference is None else set()), key=lambda speed: (speed != 1.0, speed))
+    print(f"{os.path.basename(args.audio)}: {info.duration:.1f}s, {args.engine} {args.model} on {args.device}")
+    print(f"{'speed':>6} {'RTF':>7} {'WER':>7}")
+    for speed in speeds:
+        audio = decode_audio_at_tempo(args.audio, speed)
+        start = time.perf_counter()
+        text = transcribe(audio)
+        elapsed = time.perf_counter() - start
+        if reference is None and speed == 1.0:
+            reference = text
+        print(f"{speed:>5g}x {elapsed / info.duration:7.3f} {word_error_rate(reference, text):7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,79 @@
 
 import os
-from Scripts.file_processor import process_videos, process_audio_files, process_transcripts
+import time
+import argparse
+from Scripts.file_processor import preload_models, process_videos, process_audio_files, process_transcripts
+from Scripts.worker_pool import start_transcription_pool, stop_transcription_pool
 from Scripts.config_handler import get_config
+from Scripts.pipeline import Pipeline
+from Scripts.queue_scanner import scan_queue
+from Scripts.archiver import wait_for_archive_jobs
+from Scripts.output_writer import wait_for_output_moves
+from Scripts.leases import release_all
+from Scripts.profiler import enable_profiling, write_profile
+from Scripts.autotune import apply_autotune
 
-def main():
-    config = get_config()
+def main(config=None):
+    config = config or apply_autotune(get_config())
+    pipeline = Pipeline(config)
     queue_folder = config['meeting_recordings_folder']
 
     print("Starting processing pipeline...")
 
+    # Scan the queue once, every stage works from the same plan
+    plan = scan_queue(queue_folder)
+
+    # Start transcription workers before any background thread, so they can be forked safely
+    pool = start_transcription_pool(config, len(plan.videos) + len(plan.audio))
+
+    # Load the transcription model and LLM client while videos are being extracted
+    preload_models(config, plan, pool)
+
     # Process videos
     print("\nProcessing videos...")
-    process_videos(queue_folder, config)
+    process_videos(queue_folder, config, plan, pipeline)
 
     # Process audio files
     print("\nProcessing audio files...")
-    process_audio_files(queue_folder, config)
+    process_audio_files(queue_folder, config, plan, pipeline, pool)
+    if pool:
+        stop_transcription_pool(pool)
 
     # Process transcripts
     print("\nProcessing transcripts...")
-    process_transcripts(queue_folder, config)
+    process_transcripts(queue_folder, config, plan, pipeline)
+
+    # Let background copies and archive transcodes finish before exiting
+    wait_for_output_moves()
+    wait_for_archive_jobs()
+
+    # Hand anything still claimed (e.g. transcripts awaiting batch results) back to the shared queue
+    release_all()
 
     print("\nProcessing complete. Check the respective folders for results.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Transcribe and summarize meeting recordings")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP service instead of processing the queue folder once")
+    parser.add_argument("--host", help="Service host (default: service.host in config.yaml)")
+    parser.add_argument("--port", type=int, help="Service port (default: service.port in config.yaml)")
+    parser.add_argument("--live", action="store_true", help="Watch the queue and transcribe WAV recordings while they are still being written")
+    parser.add_argument("--profile", nargs="?", const=os.path.join("profiles", time.strftime("%Y%m%d-%H%M%S")), metavar="FOLDER",
+                        help="Profile audio extraction, transcription and LLM calls, writing per-stage pstats and a trace.json timeline to FOLDER (default: profiles/<timestamp>)")
+    parser.add_argument("--profile-memory", action="store_true", help="With --profile, also sample memory with tracemalloc (slows the run down)")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(args.profile, memory=args.profile_memory)
+    try:
+        # Transcription settings tuned for this host on its first run
+        config = apply_autotune(get_config())
+        if args.serve:
+            from Scripts.service import serve
+            serve(config, args.host, args.port)
+        elif args.live:
+            from Scripts.live_transcriber import watch_queue
+            watch_queue(config)
+        else:
+            main(config)
+    finally:
+        write_profile()
@@ -0,0 +1,145 @@
+import unittest
+import os
+import wave
+import struct
+import shutil
+import hashlib
+import subprocess
+from unittest.mock import patch
+from Scripts.archiver import archive_file, wait_for_archive_jobs, low_priority_command, MANIFEST_FILENAME
+from Scripts.audio_extractor import wav_info_chunk, EXTRACTED_FROM_PREFIX
+
+def fake_ffmpeg(args, **kwargs):
+    # Write a small stand-in for the transcoded file at ffmpeg's output path
+    with open(args[-1], "wb") as f:
+        f.write(b"fLaC" + b"\x00" * 16)
+    return subprocess.CompletedProcess(args, 0, "", "")
+
+class TestArchiver(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue folder with a recording and an output folder
+        self.test_queue_folder = "test_archive_queue"
+        self.test_output_folder = "test_archive_output"
+        os.makedirs(self.test_queue_folder, exist_ok=True)
+        os.makedirs(self.test_output_folder, exist_ok=True)
+        self.test_wav_file = os.path.join(self.test_queue_folder, "meeting.wav")
+        with wave.open(self.test_wav_file, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00\x00" * 16000)
+        self.destination = os.path.join(self.test_output_folder, "meeting.wav")
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_queue_folder)
+        shutil.rmtree(self.test_output_folder)
+
+    def make_config(self, **archive):
+        return {'output_structure': {'base_folder': self.test_output_folder, 'structure': [], 'archive': archive}}
+
+    def read_manifest(self):
+        with open(os.path.join(self.test_output_folder, MANIFEST_FILENAME), "r") as f:
+            return [line.split("  ") for line in f.read().splitlines()]
+
+    def test_default_policy_moves_file(self):
+        # BDD:
+        #   Scenario: No archive policy
+        #     Given a WAV file and a config without an archive section
+        #     When the archive_file function is called
+        #     Then the file should be moved unchanged and no manifest written
+        # Pass Criteria:
+        #   The WAV file is in the output folder and there is no manifest.
+        archive_file(self.test_wav_file, self.destination, self.make_config())
+        self.assertTrue(os.path.exists(self.destination))
+        self.assertFalse(os.path.exists(self.test_wav_file))
+        self.assertFalse(os.path.exists(os.path.join(self.test_output_folder, MANIFEST_FILENAME)))
+
+    def test_manifest(self):
+        # BDD:
+        #   Scenario: Checksum manifest
+        #     Given the manifest option is enabled
+        #     When a file is archived
+        #     Then its SHA-256 and path relative to the base folder should be added to the manifest
+        # Pass Criteria:
+        #   The manifest line matches the archived file's checksum.
+        archive_file(self.test_wav_file, self.destination, self.make_config(manifest=True))
+        with open(self.destination, "rb") as f:
+            expected = hashlib.sha256(f.read()).hexdigest()
+        self.assertEqual(self.read_manifest(), [[expected, "meeting.wav"]])
+
+    def test_drop_extracted_audio(self):
+        # BDD:
+        #   Scenario: Drop audio extracted from a video
+        #     Given a WAV file tagged as extracted from a video and drop_extracted_audio enabled
+        #     And an ordinary WAV recording
+        #     When both are archived
+        #     Then the extracted WAV should be deleted
+        #     And the ordinary recording should be archived
+        # Pass Criteria:
+        #   archive_file returns None for the extracted WAV and it is nowhere on disk.
+        extracted_path = os.path.join(self.test_queue_folder, "screen_recording.wav")
+        info_chunk = wav_info_chunk(EXTRACTED_FROM_PREFIX + "screen_recording.mp4")
+        with open(extracted_path, "wb") as f:
+            f.write(b"RIFF" + struct.pack("<I", 36 + len(info_chunk) + 32000) + b"WAVE")
+            f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+            f.write(info_chunk)
+            f.write(b"data" + struct.pack("<I", 32000) + b"\x00" * 32000)
+        config = self.make_config(drop_extracted_audio=True)
+        self.assertIsNone(archive_file(extracted_path, os.path.join(self.test_output_folder, "screen_recording.wav"), config))
+        self.assertFalse(os.path.exists(extracted_path))
+        self.assertFalse(os.path.exists(os.path.join(self.test_output_folder, "screen_recording.wav")))
+        archive_file(self.test_wav_file, self.destination, config)
+        self.assertTrue(os.path.exists(self.destination))
+
+    @patch('Scripts.archiver.subprocess.run', side_effect=fake_ffmpeg)
+    def test_transcode_to_flac(self, mock_run):
+        # BDD:
+        #   Scenario: Transcode archived WAV files
+        #     Given audio_format is flac
+        #     When a WAV file is archived
+        #     Then the archive should hold a FLAC file instead of the WAV file
+        #     And the manifest should list the FLAC file
+        # Pass Criteria:
+        #   Only meeting.flac is archived and it is in the manifest.
+        archived_path = archive_file(self.test_wav_file, self.destination, self.make_config(audio_format="flac", manifest=True))
+        self.assertEqual(archived_path, os.path.join(self.test_output_folder, "meeting.flac"))
+        self.assertFalse(os.path.exists(self.test_wav_file))
+        self.assertFalse(os.path.exists(self.destination))
+        self.assertEqual([path for checksum, path in self.read_manifest()], ["meeting.flac"])
+        self.assertIn("flac", mock_run.call_args[0][0])
+
+    @patch('Scripts.archiver.subprocess.run', side_effect=fake_ffmpeg)
+    def test_background_transcode(self, mock_run):
+        # BDD:
+        #   Scenario: Transcode in the background
+        #     Given audio_format is opus and background is enabled
+        #     When a WAV file is archived
+        #     Then it should leave the queue straight away
+        #     And be replaced by an Opus file once the background jobs finish
+        # Pass Criteria:
+        #   After wait_for_archive_jobs only meeting.opus is in the output folder besides the manifest.
+        archive_file(self.test_wav_file, self.destination, self.make_config(audio_format="opus", background=True, manifest=True))
+        self.assertFalse(os.path.exists(self.test_wav_file))
+        wait_for_archive_jobs()
+        self.assertEqual(sorted(os.listdir(self.test_output_folder)), [MANIFEST_FILENAME, "meeting.opus"])
+        # The background ffmpeg is lowered in priority by the command itself, not a preexec_fn
+        command = mock_run.call_args.args[0]
+        self.assertNotIn('preexec_fn', mock_run.call_args.kwargs)
+        self.assertEqual(command[:command.index("ffmpeg")], low_priority_command([]))
+
+    @patch('Scripts.archiver.subprocess.run', side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
+    def test_transcode_failure_keeps_original(self, mock_run):
+        # BDD:
+        #   Scenario: Transcoding fails
+        #     Given audio_format is flac and ffmpeg fails
+        #     When a WAV file is archived
+        #     Then the WAV file should be archived unchanged
+        # Pass Criteria:
+        #   The WAV file is in the output folder.
+        archived_path = archive_file(self.test_wav_file, self.destination, self.make_config(audio_format="flac"))
+        self.assertEqual(archived_path, self.destination)
+        self.assertTrue(os.path.exists(self.destination))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
-from Scripts.audio_extractor import extract_audio
+from Scripts.audio_extractor import extract_audio, atempo_filter, get_extraction_config
 import os
+import wave
 import subprocess
 
 class TestAudioExtractor(unittest.TestCase):
@@ -53,5 +54,65 @@ class TestAudioExtractor(unittest.TestCase):
         with self.assertRaises(Exception):
             extract_audio("non_existent_file.mp4", self.output_folder)
 
+    def test_atempo_filter(self):
+        # BDD:
+        #   Scenario: Build the playback speed filter
+        #     Given a playback speed
+        #     When the atempo_filter function is called
+        #     Then speeds up to 2x should use one atempo filter and faster speeds should chain them
+        #     And unsupported speeds should be rejected
+        # Pass Criteria:
+        #   The filter strings match ffmpeg's atempo limits and a ValueError is raised for 10x.
+        self.assertEqual(atempo_filter(1.5), "atempo=1.5")
+        self.assertEqual(atempo_filter(3.0), "atempo=2.0,atempo=1.5")
+        with self.assertRaises(ValueError):
+            atempo_filter(10)
+
+    def test_extract_audio_at_tempo(self):
+        # BDD:
+        #   Scenario: Extract audio sped up
+        #     Given a valid one second video file
+        #     When the extract_audio function is called with a tempo of 2.0
+        #     Then the extracted audio should be half as long
+        # Pass Criteria:
+        #   The extracted audio lasts about half a second.
+        audio_path = extract_audio(self.test_video_file, self.output_folder, tempo=2.0)
+        with wave.open(audio_path, 'rb') as wav_file:
+            self.assertAlmostEqual(wav_file.getnframes() / wav_file.getframerate(), 0.5, delta=0.05)
+
+    def test_extract_audio_parallel_segments(self):
+        # BDD:
+        #   Scenario: Extract audio in parallel time ranges
+        #     Given a valid one second video file and parallel extraction with quarter second ranges
+        #     When the extract_audio function is called
+        #     Then the ranges should be joined into one WAV file as long as the video
+        #     And no partial files should be left behind
+        # Pass Criteria:
+        #   The WAV file lasts about a second and only it is in the output folder.
+        extraction_config = get_extraction_config({'extraction': {
+            'parallel': True, 'max_workers': 2, 'segment_minutes': 0.25 / 60, 'min_parallel_minutes': 0
+        }})
+        audio_path = extract_audio(self.test_video_file, self.output_folder, extraction_config=extraction_config)
+        with wave.open(audio_path, 'rb') as wav_file:
+            self.assertEqual((wav_file.getnchannels(), wav_file.getframerate()), (1, 16000))
+            self.assertAlmostEqual(wav_file.getnframes() / wav_file.getframerate(), 1.0, delta=0.05)
+        self.assertEqual(os.listdir(self.output_folder), ["test_video.wav"])
+
+    def test_extract_audio_stream_copy(self):
+        # BDD:
+        #   Scenario: Copy the audio stream out of a video
+        #     Given a valid video file with AAC audio and stream_copy enabled
+        #     When the extract_audio function is called
+        #     Then the AAC audio should be copied into an M4A file without converting it
+        # Pass Criteria:
+        #   The function returns an .m4a file that exists.
+        extraction_config = get_extraction_config({'extraction': {'stream_copy': True}})
+        audio_path = extract_audio(self.test_video_file, self.output_folder, extraction_config=extraction_config)
+        try:
+            self.assertTrue(audio_path.endswith(".m4a"))
+            self.assertTrue(os.path.exists(audio_path))
+        finally:
+            os.remove(audio_path)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+from unittest.mock import patch
+from Scripts.autotune import apply_autotune, apply_settings, detect_hardware, search_dimensions, estimate_model_bytes
+
+GB = 1024 ** 3
+CPU_HOST = {
+    'host': "node-1", 'cpu': "Test CPU", 'logical_cores': 8, 'physical_cores': 4, 'avx2': True, 'avx512': True,
+    'vnni': True, 'bf16': False, 'memory_total': 16 * GB, 'memory_available': 8 * GB, 'cuda_devices': 0,
+}
+
+class TestAutotune(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue folder and a config with everything left to the tuner
+        self.test_folder = tempfile.mkdtemp(prefix="test_autotune_")
+        self.config = {
+            'meeting_recordings_folder': self.test_folder,
+            'transcription_engine': "faster_whisper",
+            'faster_whisper': {'model': "small.en", 'device': "auto", 'compute_type': "auto", 'beam_size': 5},
+            'whisper': {'model': "turbo", 'device': "auto", 'use_fp16': "auto"},
+            'autotune': {'enabled': True},
+        }
+        patchers = [
+            patch('Scripts.autotune.detect_hardware', return_value=dict(CPU_HOST)),
+            patch('Scripts.autotune.find_sample', return_value=np.zeros(30 * 16000, dtype=np.float32)),
+            patch('Scripts.autotune._supported_compute_types', return_value={"int8", "int8_float32", "int16", "float32"}),
+            patch('Scripts.autotune.benchmark', side_effect=self.fake_benchmark),
+        ]
+        self.mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        # Clean up the dummy queue folder
+        shutil.rmtree(self.test_folder)
+
+    def fake_benchmark(self, config, settings, sample):
+        # int8 with all logical cores and batching is fastest here, and faster_whisper beats whisper
+        if settings['engine'] == "whisper":
+            return 2.0
+        speed = {"int8": 10.0, "int8_float32": 8.0, "float32": 4.0}[settings['compute_type']]
+        return speed + (1 if settings['cpu_threads'] == 8 else 0) + (2 if settings['batch_size'] == 8 else 0)
+
+    def test_tunes_once_per_host(self):
+        # BDD:
+        #   Scenario: First and later runs on a CPU host
+        #     Given autotune is enabled and no results are saved for this host
+        #     When apply_autotune is called twice
+        #     Then the first call should benchmark and save the fastest settings
+        #     And the second should reuse them without benchmarking
+        # Pass Criteria:
+        #   int8, 8 threads and batch size 8 are chosen, saved under the host, and benchmarked only once.
+        tuned = apply_autotune(self.config)
+        self.assertEqual(tuned['faster_whisper']['compute_type'], "int8")
+        self.assertEqual(tuned['faster_whisper']['cpu_threads'], 8)
+        self.assertEqual(tuned['faster_whisper']['batch_size'], 8)
+        self.assertEqual(tuned['faster_whisper']['device'], "cpu")
+        benchmarks = self.mocks[3].call_count
+        # A coordinate search: one run per option, not one per combination
+        self.assertLessEqual(benchmarks, 6)
+        with open(os.path.join(self.test_folder, ".autotune.json"), "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved['node-1']['settings']['compute_type'], "int8")
+
+        self.assertEqual(apply_autotune(self.config), tuned)
+        self.assertEqual(self.mocks[3].call_count, benchmarks)
+
+    def test_explicit_settings_and_engine_choice(self):
+        # BDD:
+        #   Scenario: Some settings are spelled out and the engine is left to the tuner
+        #     Given transcription_engine "auto" and compute_type set to float32
+        #     When apply_autotune is called
+        #     Then the faster engine should be picked
+        #     And the spelled-out compute type should be kept
+        # Pass Criteria:
+        #   faster_whisper is chosen, compute_type stays float32 and the rest are tuned.
+        self.config['transcription_engine'] = "auto"
+        self.config['faster_whisper']['compute_type'] = "float32"
+        tuned = apply_autotune(self.config)
+        self.assertEqual(tuned['transcription_engine'], "faster_whisper")
+        self.assertEqual(tuned['faster_whisper']['compute_type'], "float32")
+        self.assertEqual(tuned['faster_whisper']['cpu_threads'], 8)
+        self.assertTrue(any(call[0][1]['engine'] == "whisper" for call in self.mocks[3].call_args_list))
+
+    def test_disabled_and_no_sample(self):
+        # BDD:
+        #   Scenario: Autotune is disabled, or there is nothing to benchmark with yet
+        #     Given a config with autotune disabled, and one with no recording to sample
+        #     When apply_autotune is called
+        #     Then the config should be used as it is, with an "auto" engine falling back to faster_whisper
+        # Pass Criteria:
+        #   No benchmarks are run and nothing is saved.
+        self.config['autotune']['enabled'] = False
+        self.assertIs(apply_autotune(self.config), self.config)
+        self.config['autotune']['enabled'] = True
+        self.config['transcription_engine'] = "auto"
+        self.mocks[1].return_value = None
+        self.assertEqual(apply_autotune(self.config)['transcription_engine'], "faster_whisper")
+        self.mocks[3].assert_not_called()
+        self.assertFalse(os.path.exists(os.path.join(self.test_folder, ".autotune.json")))
+
+    def test_failed_benchmarks_not_saved(self):
+        # BDD:
+        #   Scenario: No setting can be benchmarked on this host
+        #     Given autotune is enabled and every benchmark fails
+        #     When apply_autotune is called
+        #     Then the configured settings should be used, with an "auto" engine falling back to faster_whisper
+        #     And nothing should be saved
+        # Pass Criteria:
+        #   The engine settings are unchanged and no .autotune.json is written.
+        self.mocks[3].side_effect = None
+        self.mocks[3].return_value = 0.0
+        self.config['transcription_engine'] = "auto"
+        tuned = apply_autotune(self.config)
+        self.assertEqual(tuned['transcription_engine'], "faster_whisper")
+        self.assertEqual(tuned['faster_whisper'], self.config['faster_whisper'])
+        self.assertGreater(self.mocks[3].call_count, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.test_folder, ".autotune.json")))
+
+    def test_candidates_fit_hardware(self):
+        # BDD:
+        #   Scenario: Work out what to try on a small CPU host
+        #     Given a host with 4 physical and 8 logical cores and little free memory
+        #     When the search dimensions are worked out for a large model
+        #     Then only compute types whose model fits in memory should be tried, int8 first
+        #     And both core counts should be tried
+        # Pass Criteria:
+        #   float32 is left out, int8 comes first and the thread options are 4 and 8.
+        host = dict(CPU_HOST, memory_available=6 * GB)
+        self.config['faster_whisper']['model'] = "large-v3"
+        dimensions = dict(search_dimensions("faster_whisper", host, self.config))
+        self.assertEqual(dimensions['compute_type'][0], "int8")
+        self.assertNotIn("float32", dimensions['compute_type'])
+        self.assertEqual(dimensions['cpu_threads'], [4, 8])
+        self.assertGreater(estimate_model_bytes("large-v3", "float32"), 6 * GB)
+        self.assertEqual(dict(search_dimensions("whisper", host, self.config))['use_fp16'], ["false"])
+
+    def test_apply_settings_only_fills_auto(self):
+        # BDD:
+        #   Scenario: Apply tuned settings
+        #     Given a config with device auto and beam_size 5
+        #     When apply_settings is called with tuned settings
+        #     Then auto values should be replaced and the rest kept, without changing the original config
+        # Pass Criteria:
+        #   device is cpu, beam_size is 5, and the original config still says auto.
+        tuned = apply_settings(self.config, {'engine': "faster_whisper", 'device': "cpu", 'beam_size': 1})
+        self.assertEqual(tuned['faster_whisper']['device'], "cpu")
+        self.assertEqual(tuned['faster_whisper']['beam_size'], 5)
+        self.assertEqual(self.config['faster_whisper']['device'], "auto")
+
+    def test_detect_hardware(self):
+        # BDD:
+        #   Scenario: Detect this machine's hardware
+        #     Given the machine the tests run on
+        #     When the real detect_hardware is called
+        #     Then it should report at least one core and the SIMD flags as booleans
+        # Pass Criteria:
+        #   Core counts are positive and physical cores don't exceed logical ones.
+        self.mocks[0].stop()
+        with patch('Scripts.autotune._cuda_devices', return_value=0):
+            hardware = detect_hardware()
+        self.assertGreaterEqual(hardware['logical_cores'], 1)
+        self.assertLessEqual(hardware['physical_cores'], hardware['logical_cores'])
+        self.assertIsInstance(hardware['avx2'], bool)
+
+if __name__ == '__main__':
+    unittest.main()
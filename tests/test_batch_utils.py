@@ -0,0 +1,188 @@
+import unittest
+import os
+import json
+import shutil
+from unittest.mock import patch
+from Scripts.batch_utils import _get_client, build_batch_request, get_batch_config, get_pending_transcripts, load_batch_state, make_custom_id, poll_batch_jobs, save_batch_state, submit_transcript_batch
+from Scripts.batch_standin import BatchStandIn
+from Scripts.llm_utils import get_llm_client, _clients
+
+class TestBatchUtils(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue folder with one transcript
+        self.test_queue_folder = "test_batch_queue"
+        self.test_summary_folder = os.path.join(self.test_queue_folder, "meeting")
+        os.makedirs(self.test_summary_folder, exist_ok=True)
+        self.test_transcript_file = os.path.join(self.test_summary_folder, "test_transcript.md")
+        with open(self.test_transcript_file, "w") as f:
+            f.write("This is a test transcript.")
+        self.test_config = {
+            'llm': {
+                'model': 'test_model',
+                'client_type': 'openai',
+                'max_tokens': 1000,
+                'temperature': 0.5,
+                'batch': {'enabled': True, 'base_url': 'http://localhost:8089/v1'}
+            },
+            'logging': {'enabled': False}
+        }
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_queue_folder)
+
+    def test_build_batch_request_openai(self):
+        # BDD:
+        #   Scenario: Build an OpenAI batch line
+        #     Given a transcript and summary rules
+        #     When the build_batch_request function is called for the openai client
+        #     Then the line should target the chat completions endpoint with the system and user messages
+        # Pass Criteria:
+        #   The request line matches the OpenAI batch JSONL format.
+        request = build_batch_request("id-1", "test_model", "content", "rules", 100, 0.2, "openai")
+        self.assertEqual(request["custom_id"], "id-1")
+        self.assertEqual(request["url"], "/v1/chat/completions")
+        self.assertEqual(request["body"]["messages"][0], {"role": "system", "content": "rules"})
+        self.assertEqual(request["body"]["messages"][1], {"role": "user", "content": "content"})
+
+    def test_build_batch_request_anthropic(self):
+        # BDD:
+        #   Scenario: Build an Anthropic batch request
+        #     Given a transcript and summary rules
+        #     When the build_batch_request function is called for the anthropic client
+        #     Then the request should carry the summary rules as the system prompt
+        # Pass Criteria:
+        #   The request matches the Anthropic message batch format.
+        request = build_batch_request("id-1", "test_model", "content", "rules", 100, 0.2, "anthropic")
+        self.assertEqual(request["params"]["system"], "rules")
+        self.assertEqual(request["params"]["messages"], [{"role": "user", "content": "content"}])
+
+    def test_build_batch_request_unsupported_client(self):
+        # BDD:
+        #   Scenario: Unsupported batch client
+        #     Given a client type without a batch API
+        #     When the build_batch_request function is called
+        #     Then the function should raise a ValueError
+        # Pass Criteria:
+        #   The function raises a ValueError.
+        with self.assertRaises(ValueError):
+            build_batch_request("id-1", "test_model", "content", "rules", client_type="gemini")
+
+    @patch('Scripts.batch_utils.submit_batch')
+    def test_submit_transcript_batch_persists_state(self, mock_submit_batch):
+        # BDD:
+        #   Scenario: Submit a batch job
+        #     Given a transcript in the queue folder
+        #     When the submit_transcript_batch function is called
+        #     Then the batch should be submitted
+        #     And the job should be recorded in the state file so it survives restarts
+        # Pass Criteria:
+        #   The state file lists the job and the transcript is reported as pending.
+        mock_submit_batch.return_value = "batch_123"
+        prepare_request = lambda path, config: ("transcript", [(None, "rules")])
+        batch_id = submit_transcript_batch([self.test_transcript_file], self.test_queue_folder, self.test_config, prepare_request)
+        self.assertEqual(batch_id, "batch_123")
+        state = load_batch_state(self.test_queue_folder)
+        self.assertEqual(state["jobs"][0]["id"], "batch_123")
+        self.assertIn(make_custom_id(self.test_transcript_file), state["jobs"][0]["items"])
+        self.assertEqual(get_pending_transcripts(self.test_queue_folder), {self.test_transcript_file})
+        requests = mock_submit_batch.call_args[0][0]
+        self.assertEqual(requests[0]["body"]["messages"][1]["content"], "transcript")
+
+    @patch('Scripts.batch_utils.fetch_batch_results')
+    @patch('Scripts.batch_utils.submit_batch')
+    def test_poll_batch_jobs(self, mock_submit_batch, mock_fetch_batch_results):
+        # BDD:
+        #   Scenario: Poll a batch job until it completes
+        #     Given a submitted batch job
+        #     When the poll_batch_jobs function is called while the job is running and again once it has finished
+        #     Then the job should stay pending on the first poll
+        #     And the summary should be handed back for the transcript on the second poll
+        # Pass Criteria:
+        #   Results for every summary are mapped back to the transcript and the job is removed from the state file.
+        mock_submit_batch.return_value = "batch_123"
+        submit_transcript_batch([self.test_transcript_file], self.test_queue_folder, self.test_config, lambda path, config: ("transcript", [(None, "rules"), ("action-items", "other rules")]))
+        completed = []
+
+        mock_fetch_batch_results.return_value = None
+        poll_batch_jobs(self.test_queue_folder, self.test_config, lambda path, summaries: completed.append((path, summaries)))
+        self.assertEqual(completed, [])
+        self.assertEqual(len(load_batch_state(self.test_queue_folder)["jobs"]), 1)
+
+        mock_fetch_batch_results.return_value = {
+            make_custom_id(self.test_transcript_file): "This is a test summary.",
+            make_custom_id(self.test_transcript_file, "action-items"): "These are test action items."
+        }
+        poll_batch_jobs(self.test_queue_folder, self.test_config, lambda path, summaries: completed.append((path, summaries)))
+        self.assertEqual(completed, [(self.test_transcript_file, {None: "This is a test summary.", "action-items": "These are test action items."})])
+        self.assertEqual(load_batch_state(self.test_queue_folder)["jobs"], [])
+
+    @patch('Scripts.batch_utils.fetch_batch_results')
+    @patch('Scripts.batch_utils.submit_batch')
+    def test_poll_skips_job_completed_elsewhere(self, mock_submit_batch, mock_fetch_batch_results):
+        # BDD:
+        #   Scenario: Two nodes poll the same batch job
+        #     Given a finished batch job recorded in the shared state file
+        #     When another node completes and removes it while this node is fetching its results
+        #     Then this node should not complete the transcript again
+        # Pass Criteria:
+        #   complete_item is never called and the state file stays empty.
+        mock_submit_batch.return_value = "batch_123"
+        submit_transcript_batch([self.test_transcript_file], self.test_queue_folder, self.test_config, lambda path, config: ("transcript", [(None, "rules")]))
+        def fetch_while_another_node_completes(batch_id, client_type, base_url):
+            save_batch_state(self.test_queue_folder, {"jobs": []})
+            return {make_custom_id(self.test_transcript_file): "This is a test summary."}
+        mock_fetch_batch_results.side_effect = fetch_while_another_node_completes
+        completed = []
+        poll_batch_jobs(self.test_queue_folder, self.test_config, lambda path, summaries: completed.append(path))
+        self.assertEqual(completed, [])
+        self.assertEqual(load_batch_state(self.test_queue_folder)["jobs"], [])
+
+    @patch('Scripts.llm_utils._make_client', side_effect=lambda client_type, base_url=None: object())
+    def test_batch_shares_llm_clients(self, mock_make_client):
+        # BDD:
+        #   Scenario: Batch and direct calls to the same provider
+        #     Given a client for a base_url built for direct summary calls
+        #     When batch mode asks for a client for the same provider and base_url
+        #     Then the same client should be returned
+        #     And providers without a batch API should be rejected
+        # Pass Criteria:
+        #   One client is built for both, and groq raises a ValueError.
+        _clients.clear()
+        self.addCleanup(_clients.clear)
+        self.assertIs(_get_client("openai", "http://localhost:8089/v1"), get_llm_client("openai", "http://localhost:8089/v1"))
+        self.assertEqual(mock_make_client.call_count, 1)
+        with self.assertRaises(ValueError):
+            _get_client("groq")
+
+    def test_get_batch_config_defaults(self):
+        # BDD:
+        #   Scenario: Batch mode disabled by default
+        #     Given a config without an llm.batch section
+        #     When the get_batch_config function is called
+        #     Then batch mode should be disabled
+        # Pass Criteria:
+        #   'enabled' is False and the base URL falls back to llm.base_url.
+        batch_config = get_batch_config({'llm': {'base_url': 'http://localhost:1234/v1'}})
+        self.assertFalse(batch_config['enabled'])
+        self.assertEqual(batch_config['base_url'], 'http://localhost:1234/v1')
+
+    def test_standin_completes_batch(self):
+        # BDD:
+        #   Scenario: Local stand-in batch endpoint
+        #     Given a batch input file uploaded to the stand-in
+        #     When a batch is created and retrieved
+        #     Then the batch should complete with one chat completion per request line
+        # Pass Criteria:
+        #   The output file contains a successful response for the request's custom_id.
+        standin = BatchStandIn(responder=lambda body: "Stand-in summary")
+        line = build_batch_request("id-1", "test_model", "content", "rules", client_type="openai")
+        input_file = standin.add_file("input.jsonl", (json.dumps(line) + "\n").encode("utf-8"), "batch")
+        batch = standin.create_batch(input_file["id"], "/v1/chat/completions", "24h")
+        self.assertEqual(batch["status"], "completed")
+        output = json.loads(standin.files[batch["output_file_id"]]["content"].decode("utf-8").splitlines()[0])
+        self.assertEqual(output["custom_id"], "id-1")
+        self.assertEqual(output["response"]["body"]["choices"][0]["message"]["content"], "Stand-in summary")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 import os
 import yaml
-from Scripts.config_handler import load_config, get_summary_prompt, update_config, get_add_timestamp_config
+import shutil
+from Scripts.config_handler import load_config, get_summary_prompt, update_config, get_add_timestamp_config, load_folder_config
 
 class TestConfigHandler(unittest.TestCase):
     def setUp(self):
@@ -98,5 +99,23 @@ class TestConfigHandler(unittest.TestCase):
         add_timestamp = get_add_timestamp_config()
         self.assertEqual(add_timestamp, config.get('add_timestamp', False))
 
+    def test_load_folder_config(self):
+        # BDD:
+        #   Scenario: Load a folder's summary-config.yaml
+        #     Given a summary folder with and without a summary-config.yaml file
+        #     When the load_folder_config function is called
+        #     Then the function should return the folder's settings, or an empty dict if there are none
+        # Pass Criteria:
+        #   The function returns the parsed YAML for the folder, and {} when the file is missing.
+        folder = "test_folder_config"
+        os.makedirs(folder, exist_ok=True)
+        try:
+            self.assertEqual(load_folder_config(folder), {})
+            with open(os.path.join(folder, "summary-config.yaml"), "w") as f:
+                yaml.dump({'summaries': ['action-items.txt']}, f)
+            self.assertEqual(load_folder_config(folder), {'summaries': ['action-items.txt']})
+        finally:
+            shutil.rmtree(folder)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import unittest
+import os
+import shutil
+from Scripts.queue_scanner import make_work_item
+from Scripts.dedupe import group_duplicates, get_dedupe_config, SAMPLE_BYTES
+
+class TestDedupe(unittest.TestCase):
+    def setUp(self):
+        # Create dummy summary folders for the same recording dropped in twice
+        self.test_queue_folder = "test_dedupe_queue"
+        self.meeting_folder = os.path.join(self.test_queue_folder, "meeting")
+        self.notes_folder = os.path.join(self.test_queue_folder, "notes")
+        os.makedirs(self.meeting_folder, exist_ok=True)
+        os.makedirs(self.notes_folder, exist_ok=True)
+        self.content = os.urandom(256 * 1024)
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_queue_folder)
+
+    def make_file(self, folder, name, content):
+        path = os.path.join(folder, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return make_work_item(path, "audio", folder)
+
+    def test_identical_files_grouped(self):
+        # BDD:
+        #   Scenario: The same recording in two summary folders
+        #     Given identical files in two folders and a different file
+        #     When the group_duplicates function is called
+        #     Then the identical files should form one group led by the first of them
+        # Pass Criteria:
+        #   Two groups, the first holding both copies in queue order.
+        first = self.make_file(self.meeting_folder, "call.wav", self.content)
+        other = self.make_file(self.meeting_folder, "other.wav", os.urandom(1000))
+        copy = self.make_file(self.notes_folder, "call.wav", self.content)
+        self.assertEqual(group_duplicates([first, other, copy]), [[first, copy], [other]])
+
+    def test_same_size_different_content(self):
+        # BDD:
+        #   Scenario: Different recordings of the same size
+        #     Given two files of the same size whose first bytes differ
+        #     When the group_duplicates function is called
+        #     Then they should stay separate
+        # Pass Criteria:
+        #   Each file is in a group of its own.
+        first = self.make_file(self.meeting_folder, "a.wav", self.content)
+        second = self.make_file(self.notes_folder, "b.wav", b"x" + self.content[1:])
+        self.assertEqual(group_duplicates([first, second]), [[first], [second]])
+
+    def test_difference_outside_samples(self):
+        # BDD:
+        #   Scenario: Files differ only where the partial fingerprint doesn't look
+        #     Given two files of the same size that differ in a byte between the sampled regions
+        #     When the group_duplicates function is called
+        #     Then the full hash should keep them apart
+        # Pass Criteria:
+        #   Each file is in a group of its own.
+        content = os.urandom(8 * SAMPLE_BYTES)
+        changed = bytearray(content)
+        changed[SAMPLE_BYTES + 10] ^= 0xFF
+        first = self.make_file(self.meeting_folder, "a.wav", content)
+        second = self.make_file(self.notes_folder, "b.wav", bytes(changed))
+        self.assertEqual(group_duplicates([first, second]), [[first], [second]])
+
+    def test_key_separates_groups(self):
+        # BDD:
+        #   Scenario: Folders that transcribe differently
+        #     Given identical files in two folders with different keys
+        #     When the group_duplicates function is called with that key
+        #     Then they should not be grouped
+        # Pass Criteria:
+        #   Each file is in a group of its own.
+        first = self.make_file(self.meeting_folder, "call.wav", self.content)
+        copy = self.make_file(self.notes_folder, "call.wav", self.content)
+        speeds = {self.meeting_folder: 1.0, self.notes_folder: 1.5}
+        groups = group_duplicates([first, copy], key=lambda item: speeds[item.summary_folder])
+        self.assertEqual(groups, [[first], [copy]])
+
+    def test_dedupe_config_defaults(self):
+        # BDD:
+        #   Scenario: Deduplication settings
+        #     Given a config with and without a deduplication section
+        #     When the get_dedupe_config function is called
+        #     Then deduplication should be on unless disabled
+        # Pass Criteria:
+        #   enabled is True by default and False when set to false.
+        self.assertTrue(get_dedupe_config({})['enabled'])
+        self.assertFalse(get_dedupe_config({'deduplication': {'enabled': False}})['enabled'])
+
+if __name__ == '__main__':
+    unittest.main()
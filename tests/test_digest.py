@@ -0,0 +1,100 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest.mock import patch
+from Scripts.digest import build_digests, child_keys, find_summaries, get_digest_config
+
+class TestDigest(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy output folder laid out as DATE/SUMMARY-TYPE/FILE-NAME
+        self.test_folder = tempfile.mkdtemp(prefix="test_digest_")
+        self.config = {
+            'output_structure': {'base_folder': self.test_folder, 'structure': ["DATE", "SUMMARY-TYPE", "FILE-NAME"]},
+            'llm': {'model': 'test-model', 'client_type': 'openai'},
+        }
+        # Monday 2024-05-06 has two meetings, Wednesday one, and the Monday after is in the next week
+        self.add_summary("2024-05-06", "Meetings", "standup", "Standup: shipped search.")
+        self.add_summary("2024-05-06", "Meetings", "planning", "Planning: roadmap agreed.")
+        self.add_summary("2024-05-08", "Meetings", "review", "Review: budget approved.")
+        self.add_summary("2024-05-13", "Meetings", "retro", "Retro: fewer meetings.")
+
+    def tearDown(self):
+        # Clean up the dummy output folder
+        shutil.rmtree(self.test_folder)
+
+    def add_summary(self, day, summary_type, name, text, filename=None):
+        folder = os.path.join(self.test_folder, day, summary_type, name)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, filename or f"{name}_transcript_summary.md"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def fake_llm(self, **kwargs):
+        return f"Digest of {kwargs['content'].count('## ')} inputs"
+
+    @patch('Scripts.summarizer.call_llm_api')
+    def test_weekly_digest_reuses_unchanged_days(self, mock_call_llm_api):
+        # BDD:
+        #   Scenario: Build this week's digest, then again after another meeting
+        #     Given summaries on two days of one week
+        #     When the weekly digest is built twice, and again after a new summary on one day
+        #     Then the first build should digest each day and the week
+        #     And the second build should make no LLM calls
+        #     And the third should only rebuild the changed day and the week
+        # Pass Criteria:
+        #   2, 0 and 2 LLM calls; the single-meeting day is its summary without a call.
+        mock_call_llm_api.side_effect = self.fake_llm
+        digests, llm_calls = build_digests(self.config, "weekly", date(2024, 5, 8))
+        self.assertEqual(llm_calls, 2)
+        weekly_path = os.path.join(self.test_folder, "digests", "Meetings", "weekly", "2024-W19.md")
+        self.assertEqual(digests, {'Meetings': weekly_path})
+        with open(weekly_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Digest of 2 inputs")
+        with open(os.path.join(self.test_folder, "digests", "Meetings", "daily", "2024-05-08.md"), "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Review: budget approved.")
+
+        self.assertEqual(build_digests(self.config, "weekly", date(2024, 5, 8))[1], 0)
+
+        self.add_summary("2024-05-08", "Meetings", "sync", "Sync: hiring plan.")
+        self.assertEqual(build_digests(self.config, "weekly", date(2024, 5, 8))[1], 2)
+        self.assertEqual(mock_call_llm_api.call_count, 4)
+
+    @patch('Scripts.summarizer.call_llm_api')
+    def test_monthly_digest_and_type_filter(self, mock_call_llm_api):
+        # BDD:
+        #   Scenario: Build a monthly digest for one summary type
+        #     Given summaries of two types across two weeks of May, and a named summary
+        #     When the monthly digest is built for the Meetings type
+        #     Then only Meetings summaries should be digested, named summaries left out
+        #     And the month should be built from its weekly digests
+        # Pass Criteria:
+        #   One digest for Meetings, made from two weeks, with the named summary not counted.
+        mock_call_llm_api.side_effect = self.fake_llm
+        self.add_summary("2024-05-06", "Interviews", "candidate", "Interview notes.")
+        self.add_summary("2024-05-06", "Meetings", "standup", "Action items.", "standup_transcript_actions_summary.md")
+        digests, llm_calls = build_digests(self.config, "monthly", date(2024, 5, 20), "Meetings")
+        self.assertEqual(list(digests), ["Meetings"])
+        with open(digests['Meetings'], "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Digest of 2 inputs")
+        # Monday (2 meetings), week 19 (2 days) and the month (2 weeks)
+        self.assertEqual(llm_calls, 3)
+        self.assertFalse(os.path.exists(os.path.join(self.test_folder, "digests", "Interviews")))
+
+    def test_periods_and_summaries(self):
+        # BDD:
+        #   Scenario: Work out the periods and find the summaries
+        #     Given the dummy output folder
+        #     When child_keys and find_summaries are called
+        #     Then a week should have its seven days and a month the weeks whose Thursday falls in it
+        #     And summaries should be keyed by type and the date folder
+        # Pass Criteria:
+        #   The keys and summary counts match.
+        self.assertEqual(child_keys("weekly", "2024-W19"), [f"2024-05-{day:02d}" for day in range(6, 13)])
+        self.assertEqual(child_keys("monthly", "2024-05"), ["2024-W18", "2024-W19", "2024-W20", "2024-W21", "2024-W22"])
+        summaries = find_summaries(get_digest_config(self.config))
+        self.assertEqual(len(summaries[("Meetings", "2024-05-06")]), 2)
+        self.assertEqual(len(summaries), 3)
+
+if __name__ == '__main__':
+    unittest.main()
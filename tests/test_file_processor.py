@@ -2,8 +2,10 @@ import unittest
 import os
 import shutil
 from datetime import datetime
-from Scripts.file_processor import process_videos, process_audio_files, process_transcripts, add_timestamp_to_filename
+from unittest.mock import MagicMock, patch
+from Scripts.file_processor import process_videos, process_audio_files, process_transcripts, add_timestamp_to_filename, complete_batch_transcript
 from Scripts.config_handler import get_config
+from Scripts.leases import lease_path, release_all
 
 class TestFileProcessor(unittest.TestCase):
     def setUp(self):
@@ -179,6 +181,71 @@ class TestFileProcessor(unittest.TestCase):
         process_transcripts(self.test_queue_folder, config)
         self.assertTrue(os.path.exists(os.path.join(self.test_output_folder, "test_transcript_dir", "test_transcript_transcript.md")))
         self.assertTrue(os.path.exists(os.path.join(self.test_output_folder, "test_transcript_dir", "test_transcript_summary.md")))
+    def test_lease_held_until_background_move_finishes(self):
+        # BDD:
+        #   Scenario: A processed transcript is still being moved in the background
+        #     Given leases are enabled and the move to the output folder hasn't finished
+        #     When the process_transcripts function returns
+        #     Then the transcript should still be claimed
+        #     And its lease should be released once the move completes
+        # Pass Criteria:
+        #   The lease file exists until the move's completion callback runs, and is gone after.
+        config = dict(self.test_config, leases={'enabled': True})
+        os.makedirs(os.path.join(self.test_queue_folder, "test_transcript_dir"), exist_ok=True)
+        transcript_path = os.path.join(self.test_queue_folder, "test_transcript_dir", "test_transcript_transcript.md")
+        shutil.move(self.test_transcript_file, transcript_path)
+        shutil.move(self.test_summary_rules_file, os.path.join(self.test_queue_folder, "test_transcript_dir", "summary-rules.txt"))
+        moves = []
+        self.addCleanup(release_all)
+        with patch('Scripts.file_processor.move_file', side_effect=lambda path, config, on_complete: moves.append(on_complete)):
+            process_transcripts(self.test_queue_folder, config, pipeline=MagicMock())
+        self.assertEqual(len(moves), 1)
+        self.assertTrue(os.path.exists(lease_path(transcript_path)))
+        moves[0](transcript_path)
+        self.assertFalse(os.path.exists(lease_path(transcript_path)))
+    def test_transcript_taken_over_is_not_moved(self):
+        # BDD:
+        #   Scenario: Another node reclaims a transcript while this node is summarizing it
+        #     Given leases are enabled and the transcript's lease is taken over during summarization
+        #     When the process_transcripts function finishes the summary
+        #     Then the transcript should not be moved by this node
+        # Pass Criteria:
+        #   move_file is never called and the other node's lease is left in place.
+        config = dict(self.test_config, leases={'enabled': True})
+        self.addCleanup(release_all)
+        os.makedirs(os.path.join(self.test_queue_folder, "test_transcript_dir"), exist_ok=True)
+        transcript_path = os.path.join(self.test_queue_folder, "test_transcript_dir", "test_transcript_transcript.md")
+        shutil.move(self.test_transcript_file, transcript_path)
+        shutil.move(self.test_summary_rules_file, os.path.join(self.test_queue_folder, "test_transcript_dir", "summary-rules.txt"))
+        def summarize_while_taken_over(path):
+            with open(lease_path(path), "w") as f:
+                f.write("othertoken node-2:1234\n")
+        pipeline = MagicMock()
+        pipeline.summarize_file.side_effect = summarize_while_taken_over
+        with patch('Scripts.file_processor.move_file') as mock_move_file:
+            process_transcripts(self.test_queue_folder, config, pipeline=pipeline)
+        mock_move_file.assert_not_called()
+        with open(lease_path(transcript_path)) as f:
+            self.assertTrue(f.read().startswith("othertoken"))
+
+    def test_batch_completion_skips_claimed_transcript(self):
+        # BDD:
+        #   Scenario: A batch result arrives for a transcript another node is summarizing
+        #     Given leases are enabled and another node holds the transcript's lease
+        #     When complete_batch_transcript is called with its summaries
+        #     Then the summaries should be discarded and the transcript left where it is
+        # Pass Criteria:
+        #   No summary is saved and the transcript is not moved.
+        config = dict(self.test_config, leases={'enabled': True})
+        self.addCleanup(release_all)
+        os.makedirs(os.path.dirname(lease_path(self.test_transcript_file)), exist_ok=True)
+        with open(lease_path(self.test_transcript_file), "w") as f:
+            f.write("othertoken node-2:1234\n")
+        with patch('Scripts.file_processor.save_summary') as mock_save_summary, patch('Scripts.file_processor.move_file') as mock_move_file:
+            complete_batch_transcript(self.test_transcript_file, {None: "Summary"}, config)
+        mock_save_summary.assert_not_called()
+        mock_move_file.assert_not_called()
+        self.assertTrue(os.path.exists(self.test_transcript_file))
 
 if __name__ == '__main__':
     unittest.main()
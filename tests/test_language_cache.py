@@ -0,0 +1,79 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import multiprocessing
+from Scripts.language_cache import pinned_language, record_language
+
+def record_many(folder, config, count):
+    # Runs in a worker process, like a worker_pool worker detecting languages
+    for _ in range(count):
+        record_language(folder, "en", config)
+
+class TestLanguageCache(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue folder with a summary folder in it
+        self.test_folder = tempfile.mkdtemp(prefix="test_language_cache_")
+        self.folder = os.path.join(self.test_folder, "Meetings")
+        os.makedirs(self.folder)
+        self.config = {'meeting_recordings_folder': self.test_folder, 'language_detection': {'pin_after': 3}}
+
+    def tearDown(self):
+        # Clean up the dummy queue folder
+        shutil.rmtree(self.test_folder)
+
+    def test_pins_after_consistent_detections(self):
+        # BDD:
+        #   Scenario: A folder's recordings keep being detected as the same language
+        #     Given pin_after is 3
+        #     When "de", "en", "en" and "en" are recorded for the folder
+        #     Then the language should only be pinned once the last 3 agree
+        # Pass Criteria:
+        #   Nothing is pinned until the fourth recording, then "en" is pinned and saved to .languages.json.
+        for language in ("de", "en", "en"):
+            self.assertIsNone(record_language(self.folder, language, self.config))
+            self.assertIsNone(pinned_language(self.folder, self.config))
+        self.assertEqual(record_language(self.folder, "en", self.config), "en")
+        self.assertEqual(pinned_language(self.folder + os.sep, self.config), "en")
+        with open(os.path.join(self.test_folder, ".languages.json"), "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)['Meetings']['pinned'], "en")
+        # Another folder is detected separately
+        self.assertIsNone(pinned_language(os.path.join(self.test_folder, "Interviews"), self.config))
+
+    def test_pinning_disabled(self):
+        # BDD:
+        #   Scenario: pin_after is left at its default
+        #     Given a config without a language_detection section
+        #     When languages are recorded for a folder
+        #     Then nothing should be pinned or saved
+        # Pass Criteria:
+        #   pinned_language returns None and no cache file is written.
+        config = {'meeting_recordings_folder': self.test_folder}
+        for _ in range(5):
+            self.assertIsNone(record_language(self.folder, "en", config))
+        self.assertIsNone(pinned_language(self.folder, config))
+        self.assertFalse(os.path.exists(os.path.join(self.test_folder, ".languages.json")))
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_concurrent_processes_keep_every_detection(self):
+        # BDD:
+        #   Scenario: Several worker processes record languages at once
+        #     Given four processes sharing one language cache
+        #     When each records 20 detections for its own summary folder
+        #     Then no detection should be lost to another process's write
+        # Pass Criteria:
+        #   Every folder has all 20 detections and the cache file is valid JSON.
+        config = dict(self.config, language_detection={'pin_after': 100})
+        folders = [os.path.join(self.test_folder, f"Folder{index}") for index in range(4)]
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=record_many, args=(folder, config, 20)) for folder in folders]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        with open(os.path.join(self.test_folder, ".languages.json"), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        self.assertEqual({key: len(entry['detected']) for key, entry in cache.items()}, {f"Folder{index}": 20 for index in range(4)})
+
+if __name__ == '__main__':
+    unittest.main()
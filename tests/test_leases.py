@@ -0,0 +1,149 @@
+import unittest
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from Scripts.leases import claim, release, release_all, renew_leases, lease_path, lost
+
+LEASE_CONFIG = {'leases': {'enabled': True, 'ttl_seconds': 60, 'heartbeat_seconds': 30}}
+
+def claim_all(paths, results_folder, start):
+    # Runs in a separate process standing in for another node: claim whatever it can
+    # and record what it got
+    start.wait()
+    claimed = [path for path in paths if claim(path, LEASE_CONFIG)]
+    with open(os.path.join(results_folder, f"{os.getpid()}.txt"), "w") as f:
+        f.write("\n".join(claimed))
+
+class TestLeases(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy summary folder with queued recordings
+        self.test_folder = tempfile.mkdtemp(prefix="test_leases_")
+        self.paths = []
+        for index in range(20):
+            path = os.path.join(self.test_folder, f"meeting{index}.wav")
+            with open(path, "wb") as f:
+                f.write(b"\x00" * 100)
+            self.paths.append(path)
+
+    def tearDown(self):
+        # Release anything still held and clean up the dummy files and folders
+        release_all()
+        shutil.rmtree(self.test_folder)
+
+    def test_leases_disabled(self):
+        # BDD:
+        #   Scenario: A single node
+        #     Given leases are not enabled
+        #     When the claim function is called
+        #     Then the file should be claimed without writing a lease
+        # Pass Criteria:
+        #   claim returns True and no .leases folder is created.
+        self.assertTrue(claim(self.paths[0], {}))
+        self.assertFalse(os.path.exists(os.path.dirname(lease_path(self.paths[0]))))
+
+    def test_claim_and_release(self):
+        # BDD:
+        #   Scenario: Claim a file and give it back
+        #     Given leases are enabled
+        #     When a file is claimed, claimed again and released
+        #     Then the second claim should succeed as the file is already ours
+        #     And the lease file should be gone after release
+        # Pass Criteria:
+        #   Both claims return True and the lease exists only until release.
+        self.assertTrue(claim(self.paths[0], LEASE_CONFIG))
+        self.assertTrue(claim(self.paths[0], LEASE_CONFIG))
+        self.assertTrue(os.path.exists(lease_path(self.paths[0])))
+        release(self.paths[0])
+        self.assertFalse(os.path.exists(lease_path(self.paths[0])))
+
+    def test_processes_never_share_a_file(self):
+        # BDD:
+        #   Scenario: Several nodes drain the same queue
+        #     Given four processes claiming the same twenty files at the same moment
+        #     When each records the files it claimed
+        #     Then every file should be claimed by exactly one process
+        # Pass Criteria:
+        #   The claimed lists are disjoint and together cover every file.
+        results_folder = os.path.join(self.test_folder, ".results")
+        os.makedirs(results_folder)
+        start = multiprocessing.Event()
+        workers = [multiprocessing.Process(target=claim_all, args=(self.paths, results_folder, start)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(30)
+        claimed = []
+        for name in os.listdir(results_folder):
+            with open(os.path.join(results_folder, name)) as f:
+                claimed.extend(line for line in f.read().splitlines() if line)
+        self.assertEqual(sorted(claimed), sorted(self.paths))
+
+    def test_expired_lease_is_reclaimed(self):
+        # BDD:
+        #   Scenario: A node crashed while holding a file
+        #     Given a lease on a file that hasn't been renewed for longer than the TTL
+        #     And a lease on another file that is still fresh
+        #     When another node claims both files
+        #     Then it should take over the expired lease and leave the fresh one alone
+        # Pass Criteria:
+        #   The claim on the abandoned file succeeds and the claim on the live one fails.
+        for path in self.paths[:2]:
+            os.makedirs(os.path.dirname(lease_path(path)), exist_ok=True)
+            with open(lease_path(path), "w") as f:
+                f.write("deadbeef crashed-node:1234\n")
+        expired = time.time() - 120
+        os.utime(lease_path(self.paths[0]), (expired, expired))
+        self.assertTrue(claim(self.paths[0], LEASE_CONFIG))
+        self.assertFalse(claim(self.paths[1], LEASE_CONFIG))
+        self.assertEqual([name for name in os.listdir(os.path.dirname(lease_path(self.paths[0]))) if name.endswith(".expired")], [])
+
+    def test_heartbeat_keeps_lease_alive(self):
+        # BDD:
+        #   Scenario: A long transcription
+        #     Given a claimed file whose lease is about to expire
+        #     When the leases are renewed
+        #     Then the lease should be fresh again and other nodes can't reclaim it
+        # Pass Criteria:
+        #   The lease mtime is recent after renew_leases.
+        self.assertTrue(claim(self.paths[0], LEASE_CONFIG))
+        old = time.time() - 50
+        os.utime(lease_path(self.paths[0]), (old, old))
+        renew_leases()
+        self.assertLess(time.time() - os.path.getmtime(lease_path(self.paths[0])), 5)
+
+    def test_lease_taken_over_is_marked_lost(self):
+        # BDD:
+        #   Scenario: This node stalled past the TTL and another node reclaimed its file
+        #     Given two claimed files, one of whose leases now belongs to another node
+        #     When the leases are renewed
+        #     Then that file should be marked lost, the other should not
+        #     And the lost lease should be left to the node that owns it now
+        # Pass Criteria:
+        #   lost() is True only for the reclaimed file, and releasing it doesn't remove the other node's lease.
+        for path in self.paths[:2]:
+            self.assertTrue(claim(path, LEASE_CONFIG))
+        with open(lease_path(self.paths[0]), "w") as f:
+            f.write("othertoken other-node:1234\n")
+        renew_leases()
+        self.assertTrue(lost(self.paths[0]))
+        self.assertFalse(lost(self.paths[1]))
+        release(self.paths[0])
+        self.assertTrue(os.path.exists(lease_path(self.paths[0])))
+
+    def test_claim_of_processed_file(self):
+        # BDD:
+        #   Scenario: Another node finished the file after we scanned the queue
+        #     Given a file that has left the queue
+        #     When the claim function is called
+        #     Then the claim should fail and leave no lease behind
+        # Pass Criteria:
+        #   claim returns False and the lease file doesn't exist.
+        os.remove(self.paths[0])
+        self.assertFalse(claim(self.paths[0], LEASE_CONFIG))
+        self.assertFalse(os.path.exists(lease_path(self.paths[0])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import os
+import time
+import struct
+import shutil
+import tempfile
+import threading
+import numpy as np
+from unittest.mock import patch, MagicMock
+from Scripts.live_transcriber import tail_recording, read_pcm_window
+from Scripts.media_probe import probe_media
+
+def wav_header(sample_rate=16000, channels=1):
+    # A header as recorders write it before they know the length
+    byte_rate = sample_rate * channels * 2
+    return (b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * 2, 16)
+            + b"data" + struct.pack("<I", 0xFFFFFFFF))
+
+def tenths(start, seconds):
+    # Samples whose value is the tenth of a second they are at, so a window knows where it starts
+    times = start + np.arange(int(seconds * 16000)) / 16000
+    return (np.floor(times * 10) * 10).astype(np.int16).tobytes()
+
+def fake_segments(samples, config, on_language=None):
+    # Two segments per window, labelled with their start time in the recording
+    start = round(samples[0] * 32768 / 10) / 10
+    half = len(samples) / 16000 / 2
+    return [(0.0, half, f"{start:.1f}"), (half, 2 * half, f"{start + half:.1f}")]
+
+class TestLiveTranscriber(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy summary folder and a pipeline whose last stage is mocked
+        self.test_folder = tempfile.mkdtemp(prefix="test_live_")
+        self.recording = os.path.join(self.test_folder, "meeting.wav")
+        self.pipeline = MagicMock()
+        self.pipeline.config = {'live': {'window_seconds': 5, 'idle_seconds': 0.5, 'poll_seconds': 0.05}}
+        self.transcripts = []
+        def finish_recording(audio_path, transcript_path):
+            with open(transcript_path, "r", encoding="utf-8") as f:
+                self.transcripts.append(f.read())
+            return "result"
+        self.pipeline.finish_recording.side_effect = finish_recording
+
+    def tearDown(self):
+        # Clean up the dummy folder
+        shutil.rmtree(self.test_folder)
+
+    @patch('Scripts.live_transcriber.transcribe_segments', side_effect=fake_segments)
+    def test_growing_recording(self, mock_transcribe_segments):
+        # BDD:
+        #   Scenario: Transcribe a recording while it is being written
+        #     Given a WAV recording that grows by 4 seconds at a time up to 12 seconds
+        #     When tail_recording follows it
+        #     Then windows should be transcribed as audio arrives, each starting at the last window's cut-off segment
+        #     And once it stops growing the transcript should be finished and summarized
+        # Pass Criteria:
+        #   Segment times only increase, nothing is transcribed twice, the last window reaches the
+        #   end, no live files are left and finish_recording gets the transcript.
+        with open(self.recording, "wb") as f:
+            f.write(wav_header())
+        def record():
+            for part in range(3):
+                with open(self.recording, "ab") as f:
+                    f.write(tenths(part * 4, 4))
+                time.sleep(0.2)
+        writer = threading.Thread(target=record)
+        writer.start()
+        self.assertEqual(tail_recording(self.recording, self.pipeline), "result")
+        writer.join()
+
+        times = [float(word) for word in self.transcripts[0].split()]
+        self.assertEqual(times[0], 0.0)
+        self.assertEqual(times, sorted(set(times)))
+        self.assertGreaterEqual(mock_transcribe_segments.call_count, 3)
+        last_samples = mock_transcribe_segments.call_args[0][0]
+        self.assertEqual(times[-2] + len(last_samples) / 16000, 12.0)
+        self.assertEqual(sorted(os.listdir(self.test_folder)), ["meeting.wav", "meeting_transcript.md"])
+
+    @patch('Scripts.live_transcriber.transcribe_segments', side_effect=fake_segments)
+    def test_resumes_where_it_left_off(self, mock_transcribe_segments):
+        # BDD:
+        #   Scenario: Live mode was stopped during a meeting
+        #     Given a finished 8 second recording, 6 seconds of which are already in the live transcript
+        #     When tail_recording is called again
+        #     Then only the last 2 seconds should be transcribed and appended
+        # Pass Criteria:
+        #   One window starting at 6.0 and the earlier text kept.
+        with open(self.recording, "wb") as f:
+            f.write(wav_header() + tenths(0, 8))
+        with open(os.path.join(self.test_folder, ".meeting_transcript.md.live"), "w", encoding="utf-8") as f:
+            f.write("earlier ")
+        with open(os.path.join(self.test_folder, ".meeting_transcript.md.live.json"), "w", encoding="utf-8") as f:
+            f.write('{"committed_seconds": 6.0}')
+        self.pipeline.config['live']['idle_seconds'] = 0
+        tail_recording(self.recording, self.pipeline)
+        mock_transcribe_segments.assert_called_once()
+        self.assertEqual(self.transcripts[0].split(), ["earlier", "6.0", "7.0"])
+
+    def test_read_pcm_window_mixes_down_and_resamples(self):
+        # BDD:
+        #   Scenario: Read a stereo 32 kHz recording
+        #     Given a 2 second stereo 32 kHz WAV with only the left channel at half volume
+        #     When read_pcm_window reads one second from 0.5 seconds in
+        #     Then it should return one second of 16 kHz mono samples at quarter volume
+        # Pass Criteria:
+        #   16000 samples of 0.25 covering 1.0 seconds.
+        frames = np.zeros((64000, 2), dtype=np.int16)
+        frames[:, 0] = 16384
+        with open(self.recording, "wb") as f:
+            f.write(wav_header(32000, 2) + frames.tobytes())
+        samples, seconds = read_pcm_window(self.recording, probe_media(self.recording), 0.5, 1.0)
+        self.assertEqual(seconds, 1.0)
+        self.assertEqual(len(samples), 16000)
+        self.assertTrue(np.allclose(samples, 0.25))
+
+if __name__ == '__main__':
+    unittest.main()
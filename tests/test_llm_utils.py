@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch
-from Scripts.llm_utils import call_llm_api
+from Scripts.llm_utils import call_llm_api, get_llm_client, _clients
 import os
 
 class TestLLMUtils(unittest.TestCase):
@@ -123,5 +123,23 @@ class TestLLMUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             call_llm_api(model="test_model", content="Test content", systemPrompt="Test system prompt", client_type="unsupported")
 
+    @patch('Scripts.llm_utils._make_client', side_effect=lambda client_type, base_url=None: object())
+    def test_preloaded_client_shared_whatever_the_base_url(self, mock_make_client):
+        # BDD:
+        #   Scenario: Preload a client with llm.base_url set
+        #     Given a groq client was preloaded with a base_url, as preload_models does
+        #     When call_llm_api looks it up without one
+        #     Then the preloaded client should be reused
+        #     And OpenAI and Anthropic clients, which use base_url, should be kept per base_url
+        # Pass Criteria:
+        #   One groq client is built, and two each of the OpenAI and Anthropic clients.
+        _clients.clear()
+        self.addCleanup(_clients.clear)
+        self.assertIs(get_llm_client("groq", "http://localhost:8089/v1"), get_llm_client("groq"))
+        self.assertIsNot(get_llm_client("openai", "http://localhost:8089/v1"), get_llm_client("openai"))
+        self.assertIsNot(get_llm_client("anthropic", "http://localhost:8089/v1"), get_llm_client("anthropic"))
+        self.assertIs(get_llm_client("anthropic", "http://localhost:8089/v1"), get_llm_client("anthropic", "http://localhost:8089/v1"))
+        self.assertEqual(mock_make_client.call_count, 5)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import os
+import wave
+import struct
+import shutil
+from unittest.mock import patch
+from Scripts.media_probe import probe_media, is_whisper_native_wav, format_duration
+
+def box(box_type, body):
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+class TestMediaProbe(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy folder for the probed files
+        self.test_folder = "test_probe"
+        os.makedirs(self.test_folder, exist_ok=True)
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_folder)
+
+    def test_probe_wav(self):
+        # BDD:
+        #   Scenario: Probe a 16 kHz mono WAV file
+        #     Given a 16 kHz mono 16-bit PCM WAV file
+        #     When the probe_media function is called
+        #     Then its duration, sample rate, channels and codec should be read from the header
+        #     And it should be recognized as needing no conversion for Whisper
+        # Pass Criteria:
+        #   The probed values match the file and is_whisper_native_wav returns True.
+        path = os.path.join(self.test_folder, "native.wav")
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00\x00" * 24000)
+        info = probe_media(path)
+        self.assertEqual((info.container, info.codec, info.sample_rate, info.channels), ("wav", "pcm_s16le", 16000, 1))
+        self.assertAlmostEqual(info.duration, 1.5)
+        self.assertTrue(is_whisper_native_wav(info))
+
+    def test_probe_wav_needing_conversion(self):
+        # BDD:
+        #   Scenario: Probe a 44.1 kHz stereo WAV file
+        #     Given a 44.1 kHz stereo WAV file
+        #     When the probe_media function is called
+        #     Then it should not be treated as Whisper's native format
+        # Pass Criteria:
+        #   is_whisper_native_wav returns False.
+        path = os.path.join(self.test_folder, "stereo.wav")
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(44100)
+            wav_file.writeframes(b"\x00\x00\x00\x00" * 44100)
+        info = probe_media(path)
+        self.assertAlmostEqual(info.duration, 1.0)
+        self.assertFalse(is_whisper_native_wav(info))
+
+    def test_probe_large_wav_reads_header_only(self):
+        # BDD:
+        #   Scenario: Probe a long recording
+        #     Given a WAV file with two hours of audio
+        #     When the probe_media function is called
+        #     Then the duration should come from the header without reading the samples
+        # Pass Criteria:
+        #   The duration is two hours (the sparse sample data is never read).
+        path = os.path.join(self.test_folder, "long.wav")
+        data_size = 16000 * 2 * 7200
+        with open(path, "wb") as f:
+            f.write(b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE")
+            f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+            f.write(b"data" + struct.pack("<I", data_size))
+            f.truncate(44 + data_size)
+        self.assertAlmostEqual(probe_media(path).duration, 7200.0)
+
+    def test_probe_flac(self):
+        # BDD:
+        #   Scenario: Probe a FLAC file
+        #     Given a FLAC file's STREAMINFO header
+        #     When the probe_media function is called
+        #     Then the duration, sample rate and channels should be read from it
+        # Pass Criteria:
+        #   The probed values match the header.
+        path = os.path.join(self.test_folder, "test.flac")
+        packed = (48000 << 44) | ((2 - 1) << 41) | ((16 - 1) << 36) | (48000 * 90)
+        streaminfo = struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+        with open(path, "wb") as f:
+            f.write(b"fLaC" + bytes([0x80]) + len(streaminfo).to_bytes(3, "big") + streaminfo)
+        info = probe_media(path)
+        self.assertEqual((info.codec, info.sample_rate, info.channels), ("flac", 48000, 2))
+        self.assertAlmostEqual(info.duration, 90.0)
+
+    def test_probe_mp4(self):
+        # BDD:
+        #   Scenario: Probe an M4A file with its moov box after the media data
+        #     Given an MP4 file with an AAC sound track
+        #     When the probe_media function is called
+        #     Then the duration should come from mvhd and the audio format from the sound track's sample entry
+        # Pass Criteria:
+        #   The probed values match the boxes.
+        mvhd = box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">IIII", 0, 0, 1000, 125500) + b"\x00" * 80)
+        hdlr = box(b"hdlr", b"\x00" * 8 + b"soun" + b"\x00" * 12)
+        mp4a = box(b"mp4a", b"\x00" * 6 + struct.pack(">H", 1) + b"\x00" * 8 + struct.pack(">HHHHI", 1, 16, 0, 0, 44100 << 16))
+        stsd = box(b"stsd", struct.pack(">II", 0, 1) + mp4a)
+        trak = box(b"trak", box(b"mdia", hdlr + box(b"minf", box(b"stbl", stsd))))
+        path = os.path.join(self.test_folder, "test.m4a")
+        with open(path, "wb") as f:
+            f.write(box(b"ftyp", b"M4A \x00\x00\x00\x00") + box(b"mdat", b"\x00" * 4096) + box(b"moov", mvhd + trak))
+        info = probe_media(path)
+        self.assertEqual((info.container, info.codec, info.sample_rate, info.channels), ("mp4", "aac", 44100, 1))
+        self.assertAlmostEqual(info.duration, 125.5)
+
+    @patch('Scripts.media_probe.probe_with_ffprobe', return_value=None)
+    def test_probe_fragmented_mp4(self, mock_ffprobe):
+        # BDD:
+        #   Scenario: Probe fragmented MP4 files, as OBS, browsers and screen recorders write them
+        #     Given MP4 files whose mvhd duration is 0 and which have an mvex box, one with an mehd box
+        #     When the probe_media function is called
+        #     Then the duration should come from mehd, or be unknown rather than 0 without it
+        #     And a non-fragmented MP4 with a 0 duration should still be empty
+        # Pass Criteria:
+        #   Durations 42.0, None and 0.0.
+        mvhd = box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">IIII", 0, 0, 1000, 0) + b"\x00" * 80)
+        mehd = box(b"mehd", b"\x00\x00\x00\x00" + struct.pack(">I", 42000))
+        durations = []
+        for name, moov in (("with_mehd", mvhd + box(b"mvex", mehd)), ("without_mehd", mvhd + box(b"mvex", b"")), ("plain", mvhd)):
+            path = os.path.join(self.test_folder, f"{name}.mp4")
+            with open(path, "wb") as f:
+                f.write(box(b"ftyp", b"isom\x00\x00\x00\x00") + box(b"moov", moov) + box(b"moof", b"\x00" * 16))
+            durations.append(probe_media(path).duration)
+        self.assertEqual(durations, [42.0, None, 0.0])
+
+    def test_probe_mp3(self):
+        # BDD:
+        #   Scenario: Probe a constant bitrate MP3 file
+        #     Given an MP3 file of 128 kbps frames after an ID3 tag
+        #     When the probe_media function is called
+        #     Then the duration should be estimated from the frame header's bitrate
+        # Pass Criteria:
+        #   The duration matches the audio data size at 128 kbps.
+        path = os.path.join(self.test_folder, "test.mp3")
+        frame_header = bytes([0xFF, 0xFB, 0x90, 0x44])  # MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo
+        with open(path, "wb") as f:
+            f.write(b"ID3\x03\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10)
+            f.write(frame_header + b"\x00" * (16000 * 4 - 4))
+        info = probe_media(path)
+        self.assertEqual((info.codec, info.sample_rate, info.channels), ("mp3", 44100, 2))
+        self.assertAlmostEqual(info.duration, 4.0)
+
+    def test_probe_empty_and_unknown_files(self):
+        # BDD:
+        #   Scenario: Probe empty and unreadable files
+        #     Given a zero-length file and a file that isn't real audio
+        #     When the probe_media function is called
+        #     Then the empty file should report zero duration
+        #     And the unreadable file should not be probed as audio
+        # Pass Criteria:
+        #   The empty file has a duration of 0 and the fake WAV file's probe has no WAV container.
+        empty_path = os.path.join(self.test_folder, "empty.wav")
+        open(empty_path, "w").close()
+        self.assertEqual(probe_media(empty_path).duration, 0.0)
+        fake_path = os.path.join(self.test_folder, "fake.wav")
+        with open(fake_path, "w") as f:
+            f.write("This is a dummy audio file.")
+        info = probe_media(fake_path)
+        self.assertTrue(info is None or info.container != "wav")
+
+    def test_format_duration(self):
+        # BDD:
+        #   Scenario: Format a duration for display
+        #     Given a duration in seconds
+        #     When the format_duration function is called
+        #     Then it should be formatted as H:MM:SS
+        # Pass Criteria:
+        #   3725 seconds is formatted as 1:02:05.
+        self.assertEqual(format_duration(3725), "1:02:05")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import errno
+import shutil
+from unittest.mock import patch
+from Scripts.output_writer import atomic_move, wait_for_output_moves
+
+real_replace = os.replace
+
+def cross_device_replace(source_path, destination_path):
+    # Behave as if the queue and output folders were on different filesystems:
+    # only renames of staged files within the output folder succeed
+    if not os.path.basename(source_path).startswith("."):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    return real_replace(source_path, destination_path)
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        # Create dummy queue and output folders
+        self.test_queue_folder = "test_writer_queue"
+        self.test_output_folder = "test_writer_output"
+        os.makedirs(self.test_queue_folder, exist_ok=True)
+        os.makedirs(self.test_output_folder, exist_ok=True)
+        self.source = os.path.join(self.test_queue_folder, "meeting.wav")
+        self.destination = os.path.join(self.test_output_folder, "meeting.wav")
+        with open(self.source, "wb") as f:
+            f.write(os.urandom(256 * 1024))
+        with open(self.source, "rb") as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_queue_folder)
+        shutil.rmtree(self.test_output_folder)
+
+    def test_same_device_move(self):
+        # BDD:
+        #   Scenario: Move within one filesystem
+        #     Given a file and a destination on the same filesystem
+        #     When the atomic_move function is called
+        #     Then the file should be renamed into place
+        # Pass Criteria:
+        #   The destination has the file's content and the source is gone.
+        self.assertTrue(atomic_move(self.source, self.destination))
+        self.assertFalse(os.path.exists(self.source))
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+
+    @patch('Scripts.output_writer.os.replace', side_effect=cross_device_replace)
+    def test_cross_device_move(self, mock_replace):
+        # BDD:
+        #   Scenario: Move to another filesystem
+        #     Given renaming into the output folder fails with EXDEV
+        #     When the atomic_move function is called
+        #     Then the file should be copied to a hidden staging name and renamed into place
+        #     And the source should be removed
+        # Pass Criteria:
+        #   The destination has the file's content, no staging file is left and the source is gone.
+        self.assertTrue(atomic_move(self.source, self.destination))
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(os.listdir(self.test_output_folder), ["meeting.wav"])
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        staged_source = mock_replace.call_args_list[-1][0][0]
+        self.assertTrue(os.path.basename(staged_source).startswith(".meeting.wav"))
+
+    @patch('Scripts.output_writer.os.replace', side_effect=cross_device_replace)
+    def test_interrupted_cross_device_move(self, mock_replace):
+        # BDD:
+        #   Scenario: A cross-device copy fails part way
+        #     Given renaming fails with EXDEV and the copy is interrupted
+        #     When the atomic_move function is called
+        #     Then no partial file should be visible in the output folder
+        #     And the source should stay in the queue
+        # Pass Criteria:
+        #   The error is raised, the output folder is empty and the source still exists.
+        with patch('Scripts.output_writer.shutil.copyfileobj', side_effect=OSError(errno.EIO, "I/O error")):
+            with self.assertRaises(OSError):
+                atomic_move(self.source, self.destination)
+        self.assertEqual(os.listdir(self.test_output_folder), [])
+        self.assertTrue(os.path.exists(self.source))
+
+    @patch('Scripts.output_writer.same_device', return_value=False)
+    @patch('Scripts.output_writer.os.replace', side_effect=cross_device_replace)
+    def test_background_cross_device_move(self, mock_replace, mock_same_device):
+        # BDD:
+        #   Scenario: Large cross-device copies run in the background
+        #     Given a file larger than the background copy threshold on another filesystem
+        #     When the atomic_move function is called
+        #     Then it should return before the copy is done
+        #     And the file should be in place once wait_for_output_moves returns
+        # Pass Criteria:
+        #   atomic_move returns False, the completion callback runs and the destination has the file's content.
+        completed = []
+        self.assertFalse(atomic_move(self.source, self.destination, 1024, lambda: completed.append(True)))
+        wait_for_output_moves()
+        self.assertEqual(completed, [True])
+        self.assertFalse(os.path.exists(self.source))
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import io
+import os
+import wave
+import shutil
+import tempfile
+import numpy as np
+from unittest.mock import patch, MagicMock
+from Scripts.pipeline import Pipeline, Transcription
+from Scripts.transcriber_utils import clear_model_cache
+from Scripts.leases import lease_path, release_all
+
+def wav_bytes(samples):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes((np.asarray(samples) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        # A pipeline on the faster whisper engine without VAD, and a summary folder
+        self.test_folder = tempfile.mkdtemp(prefix="test_pipeline_")
+        with open(os.path.join(self.test_folder, "summary-rules.txt"), "w") as f:
+            f.write("Summarize the meeting.")
+        self.pipeline = Pipeline({
+            'transcription_engine': 'faster_whisper',
+            'faster_whisper': {'model': 'small.en', 'device': 'cpu', 'compute_type': 'int8'},
+            'llm': {'model': 'test-model', 'client_type': 'openai'},
+            'transcript_cleanup': {'enabled': False},
+        })
+        clear_model_cache()
+
+    def tearDown(self):
+        # Clean up the dummy folder
+        shutil.rmtree(self.test_folder)
+
+    @patch('Scripts.transcriber_utils.WhisperModel')
+    def test_transcribe_bytes_and_stream(self, mock_whisper_model):
+        # BDD:
+        #   Scenario: Transcribe a recording held in memory
+        #     Given the bytes of a 16 kHz mono WAV recording
+        #     When Pipeline.transcribe is called with the bytes and then with a stream of them
+        #     Then the samples should reach the model without a temporary file
+        #     And a Transcription with the text and recording length should be returned
+        # Pass Criteria:
+        #   The text matches, audio_seconds is 2 and the model is loaded once for both calls.
+        mock_model = mock_whisper_model.return_value
+        mock_model.transcribe.return_value = ([MagicMock(text="Hello there.", id=1, no_speech_prob=0.0, avg_logprob=0.0)], {})
+        data = wav_bytes(np.zeros(32000))
+        for audio in (data, io.BytesIO(data)):
+            result = self.pipeline.transcribe(audio)
+            self.assertIsInstance(result, Transcription)
+            self.assertEqual(result.text, "Hello there. ")
+            self.assertAlmostEqual(result.audio_seconds, 2.0)
+        samples = mock_model.transcribe.call_args[0][0]
+        self.assertIsInstance(samples, np.ndarray)
+        self.assertEqual(len(samples), 32000)
+        mock_whisper_model.assert_called_once()
+
+    @patch('Scripts.summarizer.call_llm_api')
+    def test_summarize_text(self, mock_call_llm_api):
+        # BDD:
+        #   Scenario: Summarize transcript text
+        #     Given transcript text
+        #     When Pipeline.summarize is called with a prompt, with named prompts and with a summary folder
+        #     Then each should be summarized with the matching rules
+        # Pass Criteria:
+        #   The results are keyed by summary name and hold the LLM's answers.
+        mock_call_llm_api.side_effect = lambda **kwargs: f"Summary using: {kwargs['systemPrompt']}"
+        self.assertEqual(self.pipeline.summarize("We met.", "Be brief."), {'summary': "Summary using: Be brief."})
+        self.assertEqual(self.pipeline.summarize("We met.", {'actions': "List actions."}), {'actions': "Summary using: List actions."})
+        self.assertEqual(self.pipeline.summarize("We met.", folder=self.test_folder), {'summary': "Summary using: Summarize the meeting."})
+        self.assertEqual(mock_call_llm_api.call_args[1]['content'], "We met.")
+
+    def test_summarize_needs_rules(self):
+        # BDD:
+        #   Scenario: Summarize without any rules
+        #     Given transcript text and neither rules nor a folder
+        #     When Pipeline.summarize is called
+        #     Then a ValueError should be raised
+        # Pass Criteria:
+        #   ValueError is raised.
+        with self.assertRaises(ValueError):
+            self.pipeline.summarize("We met.")
+    def test_process_claims_video_audio_and_transcript(self):
+        # BDD:
+        #   Scenario: Process a video dropped into a summary folder of a shared queue
+        #     Given leases are enabled and the moves to the output folder finish in the background
+        #     When Pipeline.process is called on the video
+        #     Then the video, the audio extracted from it and the transcript should all be claimed
+        #     And each claim should be given up only once that file's move has finished
+        # Pass Criteria:
+        #   All three leases exist while transcribing and after process returns, and are gone once every move completes.
+        self.pipeline.config['leases'] = {'enabled': True}
+        self.addCleanup(release_all)
+        video_path = os.path.join(self.test_folder, "call.mp4")
+        audio_path = os.path.join(self.test_folder, "call.wav")
+        transcript_path = os.path.join(self.test_folder, "call_transcript.md")
+        for path in (video_path, audio_path):
+            open(path, "wb").close()
+        with open(transcript_path, "w") as f:
+            f.write("We met.")
+        held_while_transcribing = []
+        def transcribe_file(path):
+            held_while_transcribing.extend(os.path.exists(lease_path(held)) for held in (video_path, audio_path, transcript_path))
+            return transcript_path
+        moves = []
+        with patch.object(self.pipeline, 'extract_audio_file', return_value=audio_path), \
+             patch.object(self.pipeline, 'transcribe_file', side_effect=transcribe_file), \
+             patch('Scripts.pipeline.generate_summaries', return_value=[(None, "Summary")]), \
+             patch('Scripts.pipeline.save_summary'), \
+             patch('Scripts.pipeline.move_file', side_effect=lambda path, config, on_complete: moves.append((path, on_complete))):
+            self.pipeline.process(video_path)
+        self.assertEqual(held_while_transcribing, [True, True, True])
+        self.assertEqual([path for path, _ in moves], [video_path, audio_path, transcript_path])
+        for path, on_complete in moves:
+            self.assertTrue(os.path.exists(lease_path(path)))
+            on_complete(path)
+            self.assertFalse(os.path.exists(lease_path(path)))
+
+if __name__ == '__main__':
+    unittest.main()
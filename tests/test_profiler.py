@@ -0,0 +1,114 @@
+import unittest
+import os
+import json
+import time
+import pstats
+import shutil
+import tempfile
+import threading
+from Scripts.profiler import (profiled, enable_profiling, disable_profiling, is_profiling, write_profile,
+                              take_worker_profile, merge_worker_profile, reset_for_worker)
+
+@profiled("outer")
+def outer_stage(name):
+    time.sleep(0.01)
+    return inner_stage(name)
+
+@profiled("inner")
+def inner_stage(name):
+    return name.upper()
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        # An empty folder for the profile
+        self.test_folder = tempfile.mkdtemp(prefix="test_profiler_")
+        self.profile_folder = os.path.join(self.test_folder, "profile")
+
+    def tearDown(self):
+        # Turn profiling off again and clean up the folder
+        disable_profiling()
+        shutil.rmtree(self.test_folder)
+
+    def read_trace(self):
+        with open(os.path.join(self.profile_folder, "trace.json"), "r", encoding="utf-8") as f:
+            return json.load(f)['traceEvents']
+
+    def test_disabled_by_default(self):
+        # BDD:
+        #   Scenario: Run without --profile
+        #     Given profiling has not been enabled
+        #     When a profiled stage is called and write_profile is called
+        #     Then the stage should simply run and nothing should be written
+        # Pass Criteria:
+        #   The stage returns its result and the profile folder is not created.
+        self.assertFalse(is_profiling())
+        self.assertEqual(outer_stage("call.wav"), "CALL.WAV")
+        write_profile()
+        self.assertFalse(os.path.exists(self.profile_folder))
+
+    def test_stages_profiled_across_threads(self):
+        # BDD:
+        #   Scenario: Profile stages running on several threads
+        #     Given profiling is enabled
+        #     When a stage that calls another stage runs on two threads at once
+        #     Then each stage should get its own pstats file
+        #     And trace.json should hold a timed event for every call, on the thread that made it
+        # Pass Criteria:
+        #   outer.pstats loads with pstats and includes the sleep, and there are two outer and two inner
+        #   events across two named threads.
+        enable_profiling(self.profile_folder)
+        threads = [threading.Thread(target=outer_stage, args=(f"call{index}.wav",), name=f"stage-{index}") for index in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        write_profile()
+
+        stats = pstats.Stats(os.path.join(self.profile_folder, "outer.pstats"))
+        self.assertTrue(any(function[2] == "<built-in method time.sleep>" for function in stats.stats))
+        events = self.read_trace()
+        stage_events = [event for event in events if event['ph'] == "X"]
+        self.assertEqual(sorted(event['name'] for event in stage_events), ["inner", "inner", "outer", "outer"])
+        self.assertEqual({event['args']['input'] for event in stage_events if event['name'] == "outer"}, {"call0.wav", "call1.wav"})
+        self.assertTrue(all(event['dur'] >= 10000 for event in stage_events if event['name'] == "outer"))
+        thread_names = {event['args']['name'] for event in events if event['ph'] == "M"}
+        self.assertEqual(thread_names, {"stage-0", "stage-1"})
+
+    def test_worker_profile_merged(self):
+        # BDD:
+        #   Scenario: Profile a worker process
+        #     Given profiling is enabled and a worker has run a stage
+        #     When the worker hands over its profile and the parent merges it
+        #     Then the parent's profile should include the worker's stage
+        # Pass Criteria:
+        #   The handed-over data survives pickling, and the merged pstats file and trace event are written.
+        import pickle
+        enable_profiling(self.profile_folder)
+        inner_stage("call.wav")
+        data = pickle.loads(pickle.dumps(take_worker_profile()))
+        self.assertIsNone(take_worker_profile()['stats'].get("inner"))
+        reset_for_worker()
+        merge_worker_profile(data)
+        write_profile()
+        self.assertTrue(os.path.exists(os.path.join(self.profile_folder, "inner.pstats")))
+        self.assertEqual([event['name'] for event in self.read_trace() if event['ph'] == "X"], ["inner"])
+
+    def test_memory_sampling(self):
+        # BDD:
+        #   Scenario: Profile with memory sampling
+        #     Given profiling is enabled with memory sampling
+        #     When a stage runs
+        #     Then its event should record the memory it added
+        #     And memory.txt should list the top allocation sites
+        # Pass Criteria:
+        #   The event has memory_delta_mb, there is a memory counter event and memory.txt exists.
+        enable_profiling(self.profile_folder, memory=True)
+        outer_stage("call.wav")
+        write_profile()
+        events = self.read_trace()
+        self.assertIn('memory_delta_mb', next(event for event in events if event['name'] == "outer")['args'])
+        self.assertTrue(any(event['ph'] == "C" for event in events))
+        self.assertTrue(os.path.exists(os.path.join(self.profile_folder, "memory.txt")))
+
+if __name__ == '__main__':
+    unittest.main()
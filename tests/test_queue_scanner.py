@@ -0,0 +1,69 @@
+import unittest
+import os
+import shutil
+from Scripts.queue_scanner import scan_queue, make_work_item
+
+class TestQueueScanner(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue with a summary folder, a folder without rules and a top-level video
+        self.test_queue_folder = "test_scan_queue"
+        self.meeting_folder = os.path.join(self.test_queue_folder, "meeting")
+        self.no_rules_folder = os.path.join(self.test_queue_folder, "no_rules")
+        os.makedirs(self.meeting_folder, exist_ok=True)
+        os.makedirs(self.no_rules_folder, exist_ok=True)
+        files = {
+            os.path.join(self.test_queue_folder, "test_video.MP4"): "This is a dummy video file.",
+            os.path.join(self.test_queue_folder, "notes.txt"): "Not a recording.",
+            os.path.join(self.meeting_folder, "summary-rules.txt"): "This is a dummy summary rules file.",
+            os.path.join(self.meeting_folder, "test_audio.mp3"): "This is a dummy audio file.",
+            os.path.join(self.meeting_folder, "standup_transcript.md"): "This is a dummy transcript file.",
+            os.path.join(self.meeting_folder, "standup_transcript_summary.md"): "This is a dummy summary file.",
+            os.path.join(self.meeting_folder, ".hidden.wav"): "Hidden file.",
+            os.path.join(self.no_rules_folder, "ignored.wav"): "This is a dummy audio file.",
+        }
+        for path, content in files.items():
+            with open(path, "w") as f:
+                f.write(content)
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_queue_folder)
+
+    def test_scan_queue(self):
+        # BDD:
+        #   Scenario: Scan the queue into a work plan
+        #     Given a queue folder with a top-level video, a summary folder and a folder without summary rules
+        #     When the scan_queue function is called
+        #     Then videos, audio files and transcripts should be listed with their summary folder, size and mtime
+        #     And folders without a summary-rules.txt file should be reported as skipped
+        # Pass Criteria:
+        #   The plan contains exactly the expected items and skipped folder.
+        plan = scan_queue(self.test_queue_folder)
+        self.assertEqual([item.filename for item in plan.videos], ["test_video.MP4"])
+        self.assertEqual(plan.videos[0].summary_folder, self.test_queue_folder)
+        self.assertEqual([item.filename for item in plan.audio], ["test_audio.mp3"])
+        self.assertEqual(plan.audio[0].kind, "audio")
+        self.assertEqual(plan.audio[0].summary_folder, self.meeting_folder)
+        self.assertEqual(plan.audio[0].size, len("This is a dummy audio file."))
+        self.assertGreater(plan.audio[0].mtime, 0)
+        self.assertEqual([item.filename for item in plan.transcripts], ["standup_transcript.md"])
+        self.assertEqual(plan.skipped_folders, [self.no_rules_folder])
+
+    def test_make_work_item(self):
+        # BDD:
+        #   Scenario: Add a file produced by an earlier stage to the plan
+        #     Given a transcript written after the scan
+        #     When the make_work_item function is called
+        #     Then a work item should be returned with its size and summary folder
+        # Pass Criteria:
+        #   The work item describes the new file.
+        path = os.path.join(self.meeting_folder, "new_transcript.md")
+        with open(path, "w") as f:
+            f.write("New transcript.")
+        item = make_work_item(path, "transcript", self.meeting_folder)
+        self.assertEqual(item.filename, "new_transcript.md")
+        self.assertEqual(item.size, len("New transcript."))
+        self.assertEqual(item.summary_folder, self.meeting_folder)
+
+if __name__ == '__main__':
+    unittest.main()
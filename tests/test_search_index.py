@@ -0,0 +1,139 @@
+import unittest
+import os
+import shutil
+import tempfile
+from Scripts.search_index import split_passages, index_document, rebuild_index, search, get_search_index_config, connect
+from unittest.mock import patch
+from Scripts.utils import move_file
+from Scripts.output_writer import wait_for_output_moves
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue folder and an output folder with the search index enabled
+        self.test_folder = tempfile.mkdtemp(prefix="test_search_index_")
+        self.queue_folder = os.path.join(self.test_folder, "queue", "Meetings")
+        os.makedirs(self.queue_folder)
+        self.output_folder = os.path.join(self.test_folder, "output")
+        self.config = {
+            'output_structure': {'base_folder': self.output_folder, 'structure': ["SUMMARY-TYPE", "FILE-NAME"]},
+            'search_index': {'enabled': True},
+        }
+
+    def tearDown(self):
+        # Clean up the dummy folders
+        shutil.rmtree(self.test_folder)
+
+    def write(self, folder, filename, text):
+        path = os.path.join(folder, filename)
+        os.makedirs(folder, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_split_passages_keeps_segment_times(self):
+        # BDD:
+        #   Scenario: Split a timestamped transcript and a summary into passages
+        #     Given a transcript with [H:MM:SS] lines and a summary with paragraphs
+        #     When split_passages is called on each
+        #     Then transcript passages should start at their first segment's time
+        #     And summary paragraphs should become passages without a time
+        # Pass Criteria:
+        #   Times are in seconds and long runs of segments are split.
+        transcript = "[0:00:05] Hello everyone.\n[0:01:10] " + "word " * 200 + "\n[1:00:00] Next item."
+        passages = split_passages(transcript)
+        self.assertEqual(passages[0], (5, "Hello everyone."))
+        self.assertEqual([start for start, _ in passages], [5, 70, 3600])
+        self.assertEqual(split_passages("First point.\n\nSecond point.\n"), [(None, "First point."), (None, "Second point.")])
+
+    def test_move_file_indexes_transcripts_and_summaries(self):
+        # BDD:
+        #   Scenario: Files are indexed as they land in the output folder
+        #     Given a timestamped transcript and a summary in a summary folder
+        #     When both are moved with move_file
+        #     Then a search should find them ranked, with the transcript's time offset
+        # Pass Criteria:
+        #   The hit points at the moved transcript with the segment's start time, and --kind filters.
+        transcript = self.write(self.queue_folder, "call_transcript.md",
+                                "[0:00:01] Welcome to the weekly sync.\n[0:12:30] The budget review moves to Friday.")
+        summary = self.write(self.queue_folder, "call_transcript_summary.md", "Decisions: the budget review is postponed.")
+        moved_transcript = move_file(transcript, self.config)
+        moved_summary = move_file(summary, self.config)
+
+        hits = search("budget review", self.config)
+        self.assertEqual({hit['path'] for hit in hits}, {os.path.abspath(moved_transcript), os.path.abspath(moved_summary)})
+        transcript_hit = search("budget", self.config, kind="transcript")
+        self.assertEqual(len(transcript_hit), 1)
+        self.assertEqual(transcript_hit[0]['start_seconds'], 750)
+        self.assertIn("[budget]", transcript_hit[0]['snippet'])
+        self.assertEqual(search("postponed", self.config)[0]['kind'], "summary")
+        # Words are matched by stem, and a query that isn't valid FTS5 is still searched
+        self.assertEqual(len(search("moving", self.config)), 1)
+        self.assertEqual(len(search("budget (review", self.config)), 2)
+
+    @patch('Scripts.output_writer.same_device', return_value=False)
+    def test_background_move_indexed_once_in_place(self, mock_same_device):
+        # BDD:
+        #   Scenario: A transcript is copied to the output folder in the background
+        #     Given a cross-device move large enough to run in the background
+        #     When the transcript is moved with move_file and the move finishes
+        #     Then it should be indexed with the archived file's mtime
+        #     And a rebuild should find nothing to re-index
+        # Pass Criteria:
+        #   The transcript is found, and rebuild_index returns (0, 0).
+        self.config['output_structure']['background_copy_mb'] = 0.000001
+        transcript = self.write(self.queue_folder, "call_transcript.md", "The budget review moves to Friday.")
+        moved_transcript = move_file(transcript, self.config)
+        wait_for_output_moves()
+        self.assertEqual(search("budget", self.config)[0]['path'], os.path.abspath(moved_transcript))
+        self.assertEqual(rebuild_index(self.config), (0, 0))
+
+    def test_rebuild_indexes_existing_archive(self):
+        # BDD:
+        #   Scenario: Index an existing output folder
+        #     Given an output folder with transcripts that were never indexed
+        #     When rebuild_index is called, a file is removed and it is called again
+        #     Then every file should be searchable and the removed one dropped
+        #     And unchanged files should not be indexed twice
+        # Pass Criteria:
+        #   The counts are (2, 0), then (0, 1), and the removed file is no longer found.
+        first = self.write(os.path.join(self.output_folder, "Meetings", "a"), "a_transcript.md", "Quarterly roadmap planning.")
+        self.write(os.path.join(self.output_folder, "Meetings", "b"), "b_transcript.md", "Hiring plan for the roadmap.")
+        self.assertEqual(rebuild_index(self.config), (2, 0))
+        self.assertEqual(len(search("roadmap", self.config)), 2)
+        os.remove(first)
+        self.assertEqual(rebuild_index(self.config), (0, 1))
+        self.assertEqual(search("quarterly", self.config), [])
+        self.assertTrue(os.path.exists(get_search_index_config(self.config)['path']))
+
+    def test_no_wal_on_shared_storage(self):
+        # BDD:
+        #   Scenario: The index lives on a network filesystem
+        #     Given an index path that is not on a local disk, and one that is
+        #     When connect is called
+        #     Then the shared index should use the rollback journal and the local one WAL
+        # Pass Criteria:
+        #   journal_mode is "delete" on shared storage and "wal" locally.
+        for local, mode in ((False, "delete"), (True, "wal")):
+            with patch('Scripts.search_index.is_local_path', return_value=local):
+                connection = connect(os.path.join(self.test_folder, f"index-{mode}.sqlite"))
+            try:
+                self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], mode)
+            finally:
+                connection.close()
+
+    def test_disabled_index(self):
+        # BDD:
+        #   Scenario: The search index is disabled
+        #     Given a config without search_index enabled
+        #     When a transcript is moved and indexed
+        #     Then no index should be created
+        # Pass Criteria:
+        #   The index file doesn't exist and search returns nothing.
+        self.config['search_index'] = {'enabled': False}
+        transcript = self.write(self.queue_folder, "call_transcript.md", "Nothing to see.")
+        index_document(move_file(transcript, self.config), "Nothing to see.", self.config)
+        self.assertFalse(os.path.exists(get_search_index_config(self.config)['path']))
+        self.assertEqual(search("nothing", self.config), [])
+
+if __name__ == '__main__':
+    unittest.main()
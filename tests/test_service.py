@@ -0,0 +1,184 @@
+import unittest
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+from Scripts.service import make_server, get_service_config, _evict_jobs, _jobs, _jobs_lock
+from Scripts.pipeline import PipelineResult
+from Scripts.leases import lease_path, release
+from Scripts.queue_scanner import scan_queue
+
+def fake_process(path, on_stage=None):
+    # Stand in for the pipeline: report each stage and return the recording's content as its transcript
+    for stage in ("transcribing", "summarizing"):
+        on_stage(stage)
+    with open(path, "rb") as f:
+        transcript = f.read().decode("utf-8")
+    return PipelineResult(transcript, {'summary': f"Summary of {os.path.basename(path)}"})
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy queue with one summary folder and start the service on a free port
+        self.test_queue_folder = tempfile.mkdtemp(prefix="test_service_queue_")
+        os.makedirs(os.path.join(self.test_queue_folder, "Meetings"))
+        with open(os.path.join(self.test_queue_folder, "Meetings", "summary-rules.txt"), "w") as f:
+            f.write("Summarize the meeting.")
+        patchers = [
+            patch('Scripts.service.Pipeline.process', side_effect=fake_process),
+            patch('Scripts.service.preload_transcription_model'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.server = make_server({'meeting_recordings_folder': self.test_queue_folder, 'service': {'workers': 2}}, "127.0.0.1", 0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        # Stop the service and clean up the dummy queue
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.executor.shutdown(wait=True)
+        shutil.rmtree(self.test_queue_folder)
+
+    def request(self, path, data=None):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.base_url + path, data=data)) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def wait_for(self, job_id):
+        for _ in range(100):
+            status, job = self.request(f"/jobs/{job_id}")
+            if job['status'] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_submit_and_fetch_result(self):
+        # BDD:
+        #   Scenario: Submit a recording over HTTP
+        #     Given the service is running
+        #     When a recording is posted to /jobs for a summary folder
+        #     Then the job should be accepted and run through the pipeline
+        #     And its result should hold the transcript and summaries
+        # Pass Criteria:
+        #   202 on submit, the job reaches done with per-stage timings and /result returns the transcript.
+        status, job = self.request("/jobs?folder=Meetings&filename=call.wav", b"hello world")
+        self.assertEqual(status, 202)
+        finished = self.wait_for(job['id'])
+        self.assertEqual(finished['status'], "done")
+        self.assertEqual(set(finished['timings']), {"transcribing", "summarizing"})
+        status, result = self.request(f"/jobs/{job['id']}/result")
+        self.assertEqual(status, 200)
+        self.assertEqual(result['transcript'], "hello world")
+        self.assertEqual(result['summaries'], {'summary': "Summary of call.wav"})
+
+    def test_concurrent_uploads_of_same_name(self):
+        # BDD:
+        #   Scenario: Two tools upload files with the same name at once
+        #     Given the service is running
+        #     When two recordings named call.wav are submitted concurrently
+        #     Then each should be saved under its own name and keep its own content
+        # Pass Criteria:
+        #   Both jobs finish with their own transcript and different filenames.
+        results = {}
+        def submit(content):
+            results[content] = self.request("/jobs?folder=Meetings&filename=call.wav", content.encode())[1]
+        threads = [threading.Thread(target=submit, args=(content,)) for content in ("first", "second")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertNotEqual(results["first"]['filename'], results["second"]['filename'])
+        for content, job in results.items():
+            self.wait_for(job['id'])
+            self.assertEqual(self.request(f"/jobs/{job['id']}/result")[1]['transcript'], content)
+
+    def test_finished_jobs_are_evicted(self):
+        # BDD:
+        #   Scenario: A long-running service has finished many jobs
+        #     Given two finished jobs and a service that keeps one finished job and results for an hour
+        #     When finished jobs are evicted an hour later
+        #     Then the older job should be forgotten and the newer one's result dropped
+        # Pass Criteria:
+        #   The first job is 404, the second's result is 410 and its status is still reported.
+        jobs = [self.request("/jobs?folder=Meetings&filename=call.wav", content)[1] for content in (b"first", b"second")]
+        finished = [self.wait_for(job['id']) for job in jobs]
+        self.server.pipeline.config['service']['max_finished_jobs'] = 1
+        with _jobs_lock:
+            _evict_jobs(get_service_config(self.server.pipeline.config), max(job['finished_at'] for job in finished) + 3600)
+        self.assertNotIn(jobs[0]['id'], _jobs)
+        self.assertIsNone(_jobs[jobs[1]['id']]['result'])
+        self.assertEqual(self.request(f"/jobs/{jobs[0]['id']}")[0], 404)
+        self.assertEqual(self.request(f"/jobs/{jobs[1]['id']}")[1]['status'], "done")
+        self.assertEqual(self.request(f"/jobs/{jobs[1]['id']}/result")[0], 410)
+
+    def test_queued_uploads_hidden_from_folder_runs(self):
+        # BDD:
+        #   Scenario: More uploads arrive than there are workers
+        #     Given the service is running with two workers that are both busy
+        #     When a third recording is submitted
+        #     Then it should wait under a hidden name the queue scanner ignores
+        #     And only appear in the summary folder once its job starts
+        # Pass Criteria:
+        #   While queued, scan_queue doesn't list the third upload; it is processed once a worker is free.
+        release_workers = threading.Event()
+        def process(path, on_stage=None):
+            release_workers.wait(5)
+            return fake_process(path, on_stage)
+        with patch('Scripts.service.Pipeline.process', side_effect=process):
+            jobs = [self.request(f"/jobs?folder=Meetings&filename=call{index}.wav", b"hello")[1] for index in range(3)]
+            for _ in range(100):
+                if all(self.request(f"/jobs/{job['id']}")[1]['started_at'] for job in jobs[:2]):
+                    break
+                time.sleep(0.05)
+            self.assertIsNone(self.request(f"/jobs/{jobs[2]['id']}")[1]['started_at'])
+            scanned = [item.filename for item in scan_queue(self.test_queue_folder).audio]
+            self.assertEqual(sorted(scanned), ["call0.wav", "call1.wav"])
+            release_workers.set()
+            self.assertEqual(self.wait_for(jobs[2]['id'])['status'], "done")
+
+    def test_rejects_bad_submissions(self):
+        # BDD:
+        #   Scenario: Invalid submissions
+        #     Given the service is running
+        #     When a recording is posted for an unknown folder, a path outside the queue or with an unsupported extension
+        #     Then it should be rejected without writing anything
+        # Pass Criteria:
+        #   400 for the folders, 415 for the extension and an unknown job is 404.
+        self.assertEqual(self.request("/jobs?folder=Unknown&filename=call.wav", b"x")[0], 400)
+        self.assertEqual(self.request("/jobs?folder=..&filename=call.wav", b"x")[0], 400)
+        self.assertEqual(self.request("/jobs?folder=Meetings&filename=notes.txt", b"x")[0], 415)
+        self.assertEqual(self.request("/jobs/unknown")[0], 404)
+        self.assertEqual(os.listdir(os.path.join(self.test_queue_folder, "Meetings")), ["summary-rules.txt"])
+    def test_upload_claimed_until_job_finishes(self):
+        # BDD:
+        #   Scenario: A folder run shares the queue with the service
+        #     Given the service is running with leases enabled
+        #     When a recording is submitted
+        #     Then it should be claimed from the moment it is saved until its job has finished
+        # Pass Criteria:
+        #   The upload's lease exists while the job runs and is gone once it is done.
+        self.server.pipeline.config['leases'] = {'enabled': True}
+        held = []
+        def process(path, on_stage=None):
+            held.append(os.path.exists(lease_path(path)))
+            result = fake_process(path, on_stage)
+            # The pipeline releases the upload once it has moved it out of the queue
+            release(path)
+            return result
+        with patch('Scripts.service.Pipeline.process', side_effect=process):
+            job = self.request("/jobs?folder=Meetings&filename=call.wav", b"hello world")[1]
+            self.assertEqual(self.wait_for(job['id'])['status'], "done")
+        self.assertEqual(held, [True])
+        self.assertFalse(os.path.exists(lease_path(os.path.join(self.test_queue_folder, "Meetings", job['filename']))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import os
 from unittest.mock import patch
-from Scripts.summarizer import summarize_transcript, get_unique_filename
+from Scripts.summarizer import summarize_transcript, get_unique_filename, get_summary_rule_sets
 from Scripts.config_handler import get_config
 
 class TestSummarizer(unittest.TestCase):
@@ -70,6 +70,41 @@ class TestSummarizer(unittest.TestCase):
             summary = f.read()
         self.assertEqual(summary, "This is a test summary.")
 
+    @patch('Scripts.summarizer.move_file')
+    @patch('Scripts.summarizer.call_llm_api')
+    def test_summarize_transcript_fan_out(self, mock_call_llm_api, mock_move_file):
+        # BDD:
+        #   Scenario: Fan out one transcript to several summary types
+        #     Given a transcript folder whose summary-config.yaml lists an extra rules file
+        #     When the summarize_transcript function is called
+        #     Then one summary should be produced per rules file from the single transcript
+        #     And the extra summary should be named after its entry
+        # Pass Criteria:
+        #   The LLM is called once per rules file and both summary files are written with the matching content.
+        mock_call_llm_api.side_effect = lambda **kwargs: f"Summary using: {kwargs['systemPrompt']}"
+        extra_rules_file = os.path.join(self.test_transcript_folder, "action-items.txt")
+        folder_config_file = os.path.join(self.test_transcript_folder, "summary-config.yaml")
+        named_summary_file = os.path.join(self.test_transcript_folder, "test_transcript_action-items_summary.md")
+        with open(extra_rules_file, "w") as f:
+            f.write("List the action items.")
+        with open(folder_config_file, "w") as f:
+            f.write("summaries:\n  - name: action-items\n    rules: action-items.txt\n  - missing-rules.txt\n")
+        try:
+            rule_sets = get_summary_rule_sets(self.test_transcript_folder)
+            self.assertEqual(rule_sets, [(None, "This is a test summary rules file."), ("action-items", "List the action items.")])
+
+            summary_path = summarize_transcript(self.test_transcript_file, self.test_config.copy())
+            self.assertEqual(mock_call_llm_api.call_count, 2)
+            with open(summary_path, "r") as f:
+                self.assertEqual(f.read(), "Summary using: This is a test summary rules file.")
+            with open(named_summary_file, "r") as f:
+                self.assertEqual(f.read(), "Summary using: List the action items.")
+            self.assertEqual(mock_move_file.call_count, 2)
+        finally:
+            for path in (extra_rules_file, folder_config_file, named_summary_file):
+                if os.path.exists(path):
+                    os.remove(path)
+
     def test_summarize_transcript_error(self):
         # BDD:
         #   Scenario: Error during transcript summarization
@@ -1,7 +1,11 @@
 import unittest
 import os
+import wave
+import shutil
+import tempfile
+import numpy as np
 from unittest.mock import patch, MagicMock
-from Scripts.transcriber_utils import transcribe_with_whisper, transcribe_with_faster_whisper, transcribe_audio
+from Scripts.transcriber_utils import transcribe_with_whisper, transcribe_with_faster_whisper, transcribe_audio, format_segment, get_playback_speed, clear_model_cache, preload_transcription_model, whisper_transcript
 
 class TestTranscriberUtils(unittest.TestCase):
     def setUp(self):
@@ -16,6 +20,8 @@ class TestTranscriberUtils(unittest.TestCase):
             'faster_whisper': {'model': 'test_faster_whisper_model', 'device': 'cpu', 'compute_type': 'int8'},
             'transcription_engine': 'whisper'
         }
+        # Every test loads its own (mocked) model
+        clear_model_cache()
 
     def tearDown(self):
         # Clean up the dummy files and folders
@@ -94,6 +100,131 @@ class TestTranscriberUtils(unittest.TestCase):
         with self.assertRaises(Exception):
             transcribe_with_faster_whisper("non_existent_file.mp3", self.test_audio_folder, config['faster_whisper'])
 
+    def write_wav(self, name, parts):
+        # 16 kHz mono WAV of (seconds, is_speech) parts, speech is loud noise and silence is faint hiss
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, name)
+        rng = np.random.default_rng(0)
+        samples = np.concatenate([
+            rng.standard_normal(int(seconds * 16000)) * (0.2 if is_speech else 0.0005) for seconds, is_speech in parts
+        ])
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+        return path
+
+    @patch('Scripts.transcriber_utils.whisper.load_model')
+    @patch('Scripts.transcriber_utils.WhisperModel')
+    def test_no_speech_skips_model(self, mock_whisper_model, mock_load_model):
+        # BDD:
+        #   Scenario: A recording with no speech
+        #     Given a silent 16 kHz mono WAV file and VAD enabled
+        #     When either transcription engine is called
+        #     Then no model should be loaded
+        #     And no transcript should be written
+        # Pass Criteria:
+        #   Both engines return None without loading a model.
+        silent_file = self.write_wav("silent.wav", [(20, False)])
+        vad_config = {'enabled': True, 'energy_threshold_db': -45, 'margin_db': 10, 'frame_ms': 30,
+                      'min_speech_ms': 250, 'min_silence_ms': 600, 'padding_ms': 300}
+        self.assertIsNone(transcribe_with_whisper(silent_file, os.path.dirname(silent_file), self.test_config['whisper'], vad_config=vad_config))
+        self.assertIsNone(transcribe_with_faster_whisper(silent_file, os.path.dirname(silent_file), self.test_config['faster_whisper'], vad_config=vad_config))
+        mock_load_model.assert_not_called()
+        mock_whisper_model.assert_not_called()
+
+    @patch('Scripts.transcriber_utils.WhisperModel')
+    def test_vad_timestamps_map_to_original_time(self, mock_whisper_model):
+        # BDD:
+        #   Scenario: Timestamps after silence is removed
+        #     Given a WAV file with 60 seconds of silence before speech, VAD enabled and timestamps on
+        #     When the transcribe_with_faster_whisper function is called
+        #     Then the model should only be given the speech
+        #     And the transcript timestamps should be times in the original recording
+        # Pass Criteria:
+        #   The model input is a few seconds long and the segment is stamped at about one minute.
+        speech_file = self.write_wav("late_start.wav", [(60, False), (3, True)])
+        mock_model = MagicMock()
+        mock_whisper_model.return_value = mock_model
+        mock_model.transcribe.return_value = ([MagicMock(text=" Hello there.", id=1, start=0.5)], {})
+        vad_config = {'enabled': True, 'energy_threshold_db': -45, 'margin_db': 10, 'frame_ms': 30,
+                      'min_speech_ms': 250, 'min_silence_ms': 600, 'padding_ms': 300}
+        transcript_path = transcribe_with_faster_whisper(
+            speech_file, os.path.dirname(speech_file), self.test_config['faster_whisper'], vad_config=vad_config, timestamps=True
+        )
+        self.assertLess(len(mock_model.transcribe.call_args[0][0]), 4 * 16000)
+        with open(transcript_path, "r") as f:
+            self.assertEqual(f.read(), "[0:01:00] Hello there.\n")
+
+    @patch('Scripts.transcriber_utils.transcribe_with_faster_whisper')
+    def test_transcribe_audio_playback_speed(self, mock_faster_whisper):
+        # BDD:
+        #   Scenario: A summary folder with a playback speed
+        #     Given an audio file in a folder whose summary-config.yaml sets playback_speed to 1.5
+        #     When the transcribe_audio function is called
+        #     Then the engine should be asked to transcribe at 1.5x
+        # Pass Criteria:
+        #   The engine is called with a tempo of 1.5.
+        folder_config_path = os.path.join(self.test_audio_folder, "summary-config.yaml")
+        with open(folder_config_path, "w") as f:
+            f.write("playback_speed: 1.5\n")
+        config = self.test_config.copy()
+        config['transcription_engine'] = 'faster_whisper'
+        try:
+            transcribe_audio(self.test_audio_file, self.test_audio_folder, config)
+            self.assertEqual(get_playback_speed(self.test_audio_folder), 1.5)
+        finally:
+            os.remove(folder_config_path)
+        self.assertEqual(mock_faster_whisper.call_args[0][-1], 1.5)
+
+    def test_format_segment_rescales_tempo(self):
+        # BDD:
+        #   Scenario: Timestamps of sped up audio
+        #     Given a segment 40 seconds into audio played back at 1.5x
+        #     When the format_segment function is called
+        #     Then the timestamp should be the time in the original recording
+        # Pass Criteria:
+        #   The segment is stamped at one minute.
+        self.assertEqual(format_segment(" Hello.", 40.0, None, True, 1.5), "[0:01:00] Hello.")
+        self.assertEqual(format_segment(" Hello.", 40.0, None, False, 1.5), " Hello.")
+
+    @patch('Scripts.transcriber_utils.WhisperModel')
+    def test_model_loaded_once_per_run(self, mock_whisper_model):
+        # BDD:
+        #   Scenario: Transcribe several files in one run
+        #     Given two audio files and faster whisper config
+        #     When the transcribe_with_faster_whisper function is called for each
+        #     Then the model should be loaded only once
+        # Pass Criteria:
+        #   WhisperModel is constructed once and used for both transcriptions.
+        mock_model = mock_whisper_model.return_value
+        mock_model.transcribe.return_value = ([MagicMock(text="Hello.", id=1)], {})
+        config = self.test_config['faster_whisper']
+        for _ in range(2):
+            transcript_path = transcribe_with_faster_whisper(self.test_audio_file, self.test_audio_folder, config)
+            os.remove(transcript_path)
+        mock_whisper_model.assert_called_once_with('test_faster_whisper_model', device='cpu', compute_type='int8')
+        self.assertEqual(mock_model.transcribe.call_count, 2)
+
+    @patch('Scripts.transcriber_utils.WhisperModel')
+    def test_preloaded_model_is_reused(self, mock_whisper_model):
+        # BDD:
+        #   Scenario: Preload the model before the first transcription
+        #     Given the faster whisper engine is configured
+        #     When the preload_transcription_model function is called and a file is then transcribed
+        #     Then the transcription should use the preloaded model instead of loading another
+        # Pass Criteria:
+        #   WhisperModel is constructed once.
+        mock_whisper_model.return_value.transcribe.return_value = ([MagicMock(text="Hello.", id=1)], {})
+        config = self.test_config.copy()
+        config['transcription_engine'] = 'faster_whisper'
+        preload_transcription_model(config)
+        transcript_path = transcribe_with_faster_whisper(self.test_audio_file, self.test_audio_folder, config['faster_whisper'])
+        os.remove(transcript_path)
+        mock_whisper_model.assert_called_once()
+
     @patch('Scripts.transcriber_utils.transcribe_with_whisper')
     @patch('Scripts.transcriber_utils.transcribe_with_faster_whisper')
     def test_transcribe_audio_selects_whisper(self, mock_faster_whisper, mock_whisper):
@@ -139,5 +270,108 @@ class TestTranscriberUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             transcribe_audio(self.test_audio_file, self.test_audio_folder, config)
 
+    def test_whisper_detects_language_once(self):
+        # BDD:
+        #   Scenario: Transcribe a long recording with language auto
+        #     Given 90 seconds of audio whose first 30 second window is silent
+        #     When whisper_transcript is called with language auto
+        #     Then the language should be detected on the first window with speech
+        #     And passed explicitly when transcribing the windows after it
+        # Pass Criteria:
+        #   The windows are transcribed with language None, None and "fr", and on_language gets "fr" once.
+        mock_model = MagicMock(device="cpu")
+        mock_model.transcribe.side_effect = [
+            {"text": "", "language": "en"}, {"text": "Bonjour.", "language": "fr"}, {"text": "Merci.", "language": "fr"},
+        ]
+        on_language = MagicMock()
+        text = whisper_transcript(mock_model, np.zeros(90 * 16000, dtype=np.float32), {'language': "auto"}, on_language=on_language)
+        self.assertEqual(text.split(), ["Bonjour.", "Merci."])
+        self.assertEqual([call.kwargs['language'] for call in mock_model.transcribe.call_args_list], [None, None, "fr"])
+        on_language.assert_called_once_with("fr")
+
+    @patch('Scripts.transcriber_utils.transcribe_with_faster_whisper')
+    def test_transcribe_audio_uses_pinned_language(self, mock_faster_whisper):
+        # BDD:
+        #   Scenario: A summary folder whose language has been pinned
+        #     Given faster_whisper with language auto and a language cache pinning "de" for the folder
+        #     When transcribe_audio is called
+        #     Then the engine should be given "de" and no callback to record a detection
+        # Pass Criteria:
+        #   transcribe_with_faster_whisper gets language "de" and on_language None.
+        config = dict(self.test_config, transcription_engine='faster_whisper', meeting_recordings_folder=".",
+                      language_detection={'pin_after': 2, 'cache_file': os.path.join(self.test_audio_folder, "languages.json")})
+        with open(config['language_detection']['cache_file'], "w") as f:
+            f.write('{"test_audio": {"detected": ["de", "de"], "pinned": "de"}}')
+        try:
+            transcribe_audio(self.test_audio_file, self.test_audio_folder, config)
+        finally:
+            os.remove(config['language_detection']['cache_file'])
+        args = mock_faster_whisper.call_args[0]
+        self.assertEqual(args[2]['language'], "de")
+        self.assertIsNone(mock_faster_whisper.call_args.kwargs['on_language'])
+
+    @patch('Scripts.transcriber_utils.WhisperModel')
+    def test_transcript_streamed_to_partial_file(self, mock_whisper_model):
+        # BDD:
+        #   Scenario: Stream a transcript to disk as segments are produced
+        #     Given a Faster Whisper model that produces two segments, and on a second run fails after one
+        #     When transcribe_with_faster_whisper is called
+        #     Then segments should be written to a hidden partial file while transcription runs
+        #     And the transcript should only appear once it is complete
+        # Pass Criteria:
+        #   The first run writes the full transcript, and the failed run leaves no transcript or partial file.
+        output_folder = tempfile.mkdtemp(prefix="test_stream_")
+        self.addCleanup(shutil.rmtree, output_folder)
+        audio_file = os.path.join(output_folder, "call.mp3")
+        open(audio_file, "w").close()
+        transcript_path = os.path.join(output_folder, "call_transcript.md")
+        partial_path = os.path.join(output_folder, ".call_transcript.md.partial")
+        def segments(fail):
+            yield MagicMock(text="Hello.", id=1, no_speech_prob=0.0, avg_logprob=0.0)
+            self.assertTrue(os.path.exists(partial_path))
+            self.assertFalse(os.path.exists(transcript_path))
+            if fail:
+                raise RuntimeError("decoder failed")
+            yield MagicMock(text="Bye.", id=2, no_speech_prob=0.0, avg_logprob=0.0)
+        mock_model = mock_whisper_model.return_value
+        mock_model.transcribe.side_effect = [(segments(fail=False), None), (segments(fail=True), None)]
+
+        self.assertEqual(transcribe_with_faster_whisper(audio_file, output_folder, self.test_config['faster_whisper']), transcript_path)
+        with open(transcript_path, "r") as f:
+            self.assertEqual(f.read(), "Hello. Bye. ")
+        os.remove(transcript_path)
+        self.assertIsNone(transcribe_with_faster_whisper(audio_file, output_folder, self.test_config['faster_whisper']))
+        self.assertEqual(os.listdir(output_folder), ["call.mp3"])
+
+    def test_whisper_context_segmentation(self):
+        # BDD:
+        #   Scenario: Transcribe with context-carrying segmentation
+        #     Given 70 seconds of sound with a pause from 26.5 to 27.5 seconds and segmentation "context"
+        #     When whisper_transcript is called
+        #     Then the first window should end in the pause rather than at 30 seconds
+        #     And its last segment, which runs into the cut, should be redone by a second window starting at its timestamp
+        #     And each window should be prompted with the previous one's text, unless that text was a repetition loop
+        # Pass Criteria:
+        #   The first window is silent after 27.5 s, the second starts at 0:00:10 with prompt "A",
+        #   and the third gets no prompt.
+        audio = np.random.default_rng(0).uniform(-0.5, 0.5, 70 * 16000).astype(np.float32)
+        audio[int(26.5 * 16000):int(27.5 * 16000)] = 0
+        results = [
+            {"text": "A B", "segments": [{"start": 0.0, "end": 10.0, "text": "A"}, {"start": 10.0, "end": 27.2, "text": "B"}]},
+            {"text": "C", "segments": [{"start": 0.0, "end": 5.0, "text": "C", "compression_ratio": 3.0}]},
+        ]
+        mock_model = MagicMock(device="cpu")
+        mock_model.transcribe.side_effect = lambda *args, **kwargs: results.pop(0) if results else {"text": "", "segments": []}
+        text = whisper_transcript(mock_model, audio, {'language': "en", 'segmentation': "context"}, timestamps=True)
+
+        calls = mock_model.transcribe.call_args_list
+        first_window = calls[0][0][0]
+        self.assertNotEqual(first_window[26 * 16000], 0)
+        self.assertEqual(np.count_nonzero(first_window[int(27.5 * 16000):]), 0)
+        self.assertNotIn('initial_prompt', calls[0].kwargs)
+        self.assertEqual(calls[1].kwargs['initial_prompt'], "A")
+        self.assertNotIn('initial_prompt', calls[2].kwargs)
+        self.assertEqual(text.split("\n")[:2], ["[0:00:00] A", "[0:00:10] C"])
+
 if __name__ == '__main__':
     unittest.main()
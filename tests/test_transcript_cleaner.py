@@ -0,0 +1,110 @@
+import unittest
+from types import SimpleNamespace
+from Scripts.transcript_cleaner import clean_transcript, collapse_repeated_phrases, get_cleanup_config, is_low_confidence_segment, remove_fillers
+
+class TestTranscriptCleaner(unittest.TestCase):
+    def setUp(self):
+        self.test_config = {
+            'transcript_cleanup': {
+                'enabled': True,
+                'max_phrase_repeats': 3
+            }
+        }
+
+    def test_collapse_repeated_phrases(self):
+        # BDD:
+        #   Scenario: Collapse a hallucination loop
+        #     Given a transcript where the same phrase is repeated many times back to back
+        #     When the collapse_repeated_phrases function is called
+        #     Then the phrase should be kept at most max_repeats times
+        # Pass Criteria:
+        #   The loop is collapsed to three copies and the surrounding text is untouched.
+        text = "We are done. " + "Thank you. " * 10 + "Bye."
+        collapsed = collapse_repeated_phrases(text, max_repeats=3)
+        self.assertEqual(collapsed, "We are done. Thank you. Thank you. Thank you. Bye.")
+
+    def test_collapse_repeated_phrases_keeps_short_repeats(self):
+        # BDD:
+        #   Scenario: Natural repetition is preserved
+        #     Given a transcript with a word repeated twice
+        #     When the collapse_repeated_phrases function is called
+        #     Then the text should be unchanged
+        # Pass Criteria:
+        #   The function returns the original text.
+        text = "That was very very good."
+        self.assertEqual(collapse_repeated_phrases(text, max_repeats=3), text)
+
+    def test_remove_fillers(self):
+        # BDD:
+        #   Scenario: Remove filler words
+        #     Given a transcript containing filler words
+        #     When the remove_fillers function is called
+        #     Then the filler words should be removed without touching words that contain them
+        # Pass Criteria:
+        #   "um" and "uh" are removed while "umbrella" and "huh" are kept.
+        cleaned = remove_fillers("Um, the umbrella is, uh, here huh", ["um", "uh"])
+        self.assertNotIn("Um,", cleaned)
+        self.assertNotIn(" uh,", cleaned)
+        self.assertIn("umbrella", cleaned)
+        self.assertIn("huh", cleaned)
+
+    def test_clean_transcript_reports_tokens_saved(self):
+        # BDD:
+        #   Scenario: Clean a transcript before summarization
+        #     Given a transcript with fillers, a repetition loop and silence tags
+        #     When the clean_transcript function is called with cleanup enabled
+        #     Then the cleaned text should be shorter
+        #     And the stats should report the tokens saved
+        # Pass Criteria:
+        #   Silence tags are removed and tokens_saved is positive and consistent with the other stats.
+        text = "Um, let's start.   [BLANK_AUDIO]  " + "Thank you. " * 20 + "\n\n\n\nNext item."
+        cleaned, stats = clean_transcript(text, self.test_config)
+        self.assertNotIn("[BLANK_AUDIO]", cleaned)
+        self.assertNotIn("\n\n\n", cleaned)
+        self.assertEqual(cleaned.count("Thank you."), 3)
+        self.assertGreater(stats['tokens_saved'], 0)
+        self.assertEqual(stats['original_tokens'] - stats['cleaned_tokens'], stats['tokens_saved'])
+
+    def test_clean_transcript_with_timestamps(self):
+        # BDD:
+        #   Scenario: Clean a transcript with timestamped lines
+        #     Given a transcript with a [H:MM:SS] timestamp at the start of each line
+        #     When the clean_transcript function is called with cleanup enabled
+        #     Then the timestamps of lines with speech should be kept
+        #     And lines left with only a timestamp should be dropped
+        # Pass Criteria:
+        #   The cleaned transcript has one line per spoken segment, each with its timestamp.
+        text = "[0:00:01] Um, let's start.\n[0:00:04] [BLANK_AUDIO]\n[0:01:10] Next item."
+        cleaned, stats = clean_transcript(text, self.test_config)
+        self.assertEqual(cleaned, "[0:00:01] let's start.\n[0:01:10] Next item.")
+
+    def test_clean_transcript_disabled(self):
+        # BDD:
+        #   Scenario: Cleanup disabled
+        #     Given a config without transcript_cleanup enabled
+        #     When the clean_transcript function is called
+        #     Then the transcript should be returned unchanged
+        # Pass Criteria:
+        #   The function returns the original text and reports no tokens saved.
+        text = "Um, Thank you. Thank you. Thank you. Thank you."
+        cleaned, stats = clean_transcript(text, {})
+        self.assertEqual(cleaned, text)
+        self.assertEqual(stats['tokens_saved'], 0)
+
+    def test_is_low_confidence_segment(self):
+        # BDD:
+        #   Scenario: Detect no-speech segments
+        #     Given Whisper result segments and Faster Whisper segment objects
+        #     When the is_low_confidence_segment function is called
+        #     Then only segments with a high no-speech probability and a low log probability should be flagged
+        # Pass Criteria:
+        #   The silent segment is flagged and the confident or incomplete segments are not.
+        cleanup_config = get_cleanup_config(self.test_config)
+        self.assertTrue(is_low_confidence_segment({'no_speech_prob': 0.9, 'avg_logprob': -1.5}, cleanup_config))
+        self.assertFalse(is_low_confidence_segment({'no_speech_prob': 0.9, 'avg_logprob': -0.2}, cleanup_config))
+        self.assertTrue(is_low_confidence_segment(SimpleNamespace(no_speech_prob=0.8, avg_logprob=-2.0), cleanup_config))
+        self.assertFalse(is_low_confidence_segment(SimpleNamespace(text="no stats"), cleanup_config))
+        self.assertFalse(is_low_confidence_segment({'no_speech_prob': 0.9, 'avg_logprob': -1.5}, get_cleanup_config({})))
+
+if __name__ == '__main__':
+    unittest.main()
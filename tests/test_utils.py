@@ -98,5 +98,21 @@ class TestUtils(unittest.TestCase):
         today_date = datetime.now().strftime("%Y-%m-%d")
         self.assertTrue(os.path.exists(os.path.join("test_output", today_date, "test_summary_type", "test_file", "test_file.txt")))
 
+    def test_move_file_named_summary_with_filename_structure(self):
+        # BDD:
+        #   Scenario: Move a named summary fanned out from a transcript
+        #     Given a named summary file and a config with 'FILE-NAME' in the output structure
+        #     When the move_file function is called
+        #     Then the summary should be moved to the same folder as the recording's other files
+        # Pass Criteria:
+        #   The file is moved to a folder named after the original recording.
+        config = self.test_config.copy()
+        config['output_structure']['structure'] = ['FILE-NAME']
+        test_file = os.path.join(self.test_source_folder, "standup_transcript_action-items_summary.md")
+        with open(test_file, "w") as f:
+            f.write("These are test action items.")
+        move_file(test_file, config)
+        self.assertTrue(os.path.exists(os.path.join("test_output", "standup", "standup_transcript_action-items_summary.md")))
+
 if __name__ == '__main__':
     unittest.main()
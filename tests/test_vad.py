@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+from Scripts.vad import get_vad_config, detect_speech, compact_speech, to_original_time, apply_vad
+
+SAMPLE_RATE = 16000
+
+def make_recording(layout, seed=0):
+    """
+    Build a recording from (seconds, is_speech) parts: speech is loud noise, silence is faint hiss.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    for seconds, is_speech in layout:
+        level = 0.2 if is_speech else 0.0005
+        parts.append((rng.standard_normal(int(seconds * SAMPLE_RATE)) * level).astype(np.float32))
+    return np.concatenate(parts)
+
+class TestVad(unittest.TestCase):
+    def setUp(self):
+        self.vad_config = get_vad_config({'vad': {'enabled': True, 'padding_ms': 0}})
+
+    def test_detect_speech_regions(self):
+        # BDD:
+        #   Scenario: Find speech between long silences
+        #     Given a recording of 5s silence, 2s speech, 10s silence and 3s speech
+        #     When the detect_speech function is called
+        #     Then it should return the two speech regions
+        # Pass Criteria:
+        #   Two regions are found within a frame of the speech boundaries.
+        audio = make_recording([(5, False), (2, True), (10, False), (3, True)])
+        regions = detect_speech(audio, self.vad_config)
+        self.assertEqual(len(regions), 2)
+        expected = [(5, 7), (17, 20)]
+        for (start, end), (expected_start, expected_end) in zip(regions, expected):
+            self.assertAlmostEqual(start / SAMPLE_RATE, expected_start, delta=0.05)
+            self.assertAlmostEqual(end / SAMPLE_RATE, expected_end, delta=0.05)
+
+    def test_short_pauses_are_kept(self):
+        # BDD:
+        #   Scenario: Pauses between sentences
+        #     Given speech with a 0.3s pause, shorter than min_silence_ms
+        #     When the detect_speech function is called
+        #     Then the pause should be kept inside one region
+        # Pass Criteria:
+        #   A single region is returned.
+        audio = make_recording([(1, False), (2, True), (0.3, False), (2, True), (1, False)])
+        self.assertEqual(len(detect_speech(audio, self.vad_config)), 1)
+
+    def test_timestamp_map(self):
+        # BDD:
+        #   Scenario: Map speech-only times back to the original recording
+        #     Given the speech regions of a recording joined together
+        #     When the to_original_time function is called with times in the joined audio
+        #     Then the times should land in the original recording
+        # Pass Criteria:
+        #   A time in the second region maps past the silence that was removed.
+        audio = make_recording([(5, False), (2, True), (10, False), (3, True)])
+        speech, timestamp_map = compact_speech(audio, detect_speech(audio, self.vad_config))
+        self.assertAlmostEqual(len(speech) / SAMPLE_RATE, 5, delta=0.1)
+        self.assertAlmostEqual(to_original_time(1.0, timestamp_map), 6.0, delta=0.1)
+        self.assertAlmostEqual(to_original_time(3.0, timestamp_map), 18.0, delta=0.1)
+        self.assertEqual(to_original_time(3.0, None), 3.0)
+
+    def test_silent_recording(self):
+        # BDD:
+        #   Scenario: A recording with no speech
+        #     Given a recording of faint hiss only
+        #     When the apply_vad function is called
+        #     Then the returned audio should be empty
+        # Pass Criteria:
+        #   No audio and an empty timestamp map are returned.
+        audio = make_recording([(30, False)])
+        speech, timestamp_map = apply_vad(audio, self.vad_config)
+        self.assertEqual(len(speech), 0)
+        self.assertEqual(timestamp_map, [])
+
+    def test_continuous_speech_is_kept(self):
+        # BDD:
+        #   Scenario: A recording that is speech throughout
+        #     Given a recording with no silence
+        #     When the apply_vad function is called
+        #     Then all of the audio should be kept
+        # Pass Criteria:
+        #   The returned audio is the same length as the recording.
+        audio = make_recording([(10, True)])
+        speech, timestamp_map = apply_vad(audio, self.vad_config)
+        self.assertEqual(len(speech), len(audio))
+
+    def test_vad_disabled(self):
+        # BDD:
+        #   Scenario: VAD disabled
+        #     Given VAD is disabled in the config
+        #     When the apply_vad function is called
+        #     Then the audio should be returned unchanged without a timestamp map
+        # Pass Criteria:
+        #   The same audio and no timestamp map are returned.
+        audio = make_recording([(5, False), (2, True)])
+        speech, timestamp_map = apply_vad(audio, get_vad_config({}))
+        self.assertIs(speech, audio)
+        self.assertIsNone(timestamp_map)
+
+if __name__ == '__main__':
+    unittest.main()
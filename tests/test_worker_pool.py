@@ -0,0 +1,143 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock
+from Scripts.worker_pool import get_worker_pool_config, memory_usage, start_transcription_pool, submit_transcription, collect_transcription, stop_transcription_pool, split_threads
+
+def fake_transcribe(audio_file_path, queue_folder, config):
+    # Runs in the forked worker: write the transcript and hold some private memory
+    transcript_path = os.path.splitext(audio_file_path)[0] + "_transcript.md"
+    with open(transcript_path, "w") as f:
+        f.write(f"transcribed by {os.getpid()}")
+    return transcript_path
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        # Create a dummy summary folder with a few recordings
+        self.test_folder = tempfile.mkdtemp(prefix="test_worker_pool_")
+        self.audio_paths = []
+        for index in range(4):
+            path = os.path.join(self.test_folder, f"meeting{index}.wav")
+            with open(path, "wb") as f:
+                f.write(b"\x00" * 1000)
+            self.audio_paths.append(path)
+        self.test_config = {'transcription_engine': 'faster_whisper', 'worker_pool': {'enabled': True, 'workers': 2}}
+
+    def tearDown(self):
+        # Clean up the dummy files and folders
+        shutil.rmtree(self.test_folder)
+
+    def test_worker_pool_config_defaults(self):
+        # BDD:
+        #   Scenario: Worker pool settings
+        #     Given a config without a worker_pool section
+        #     When the get_worker_pool_config function is called
+        #     Then the pool should be disabled with two workers
+        # Pass Criteria:
+        #   enabled is False and workers is 2.
+        self.assertEqual(get_worker_pool_config({}), {'enabled': False, 'workers': 2})
+
+    @unittest.skipUnless(os.path.exists("/proc/self/smaps_rollup"), "needs /proc/self/smaps_rollup")
+    def test_memory_usage(self):
+        # BDD:
+        #   Scenario: Measure this process's memory
+        #     Given a Linux system
+        #     When the memory_usage function is called
+        #     Then it should report RSS, PSS and USS
+        # Pass Criteria:
+        #   All three are positive and USS <= PSS <= RSS.
+        usage = memory_usage()
+        self.assertGreater(usage['uss'], 0)
+        self.assertLessEqual(usage['uss'], usage['pss'])
+        self.assertLessEqual(usage['pss'], usage['rss'])
+
+    def test_pool_disabled(self):
+        # BDD:
+        #   Scenario: Worker pool off or not worth it
+        #     Given the pool is disabled, or there is only one recording
+        #     When the start_transcription_pool function is called
+        #     Then no pool should be started
+        # Pass Criteria:
+        #   start_transcription_pool returns None.
+        self.assertIsNone(start_transcription_pool({}, 4))
+        self.assertIsNone(start_transcription_pool(self.test_config, 1))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    @patch('Scripts.worker_pool.model_loaded_in_process', return_value=False)
+    @patch('Scripts.worker_pool.resolve_transcription_device', return_value="cpu")
+    @patch('Scripts.worker_pool.transcribe_audio_flow', side_effect=fake_transcribe)
+    @patch('Scripts.worker_pool.load_transcription_model')
+    def test_pool_transcribes_in_forked_workers(self, mock_load_model, mock_transcribe, mock_device, mock_model_loaded):
+        # BDD:
+        #   Scenario: Transcribe recordings in forked workers
+        #     Given the worker pool is enabled with two workers for the whisper engine on the CPU
+        #     When four recordings are submitted
+        #     Then the model should be loaded once in the parent, on the calling thread
+        #     And each recording should be transcribed in a worker process
+        #     And the transcripts should be collected in submission order
+        # Pass Criteria:
+        #   One model load, four transcripts in order, none written by the parent process.
+        mock_load_model.return_value = MagicMock()
+        self.test_config['transcription_engine'] = 'whisper'
+        pool = start_transcription_pool(self.test_config, len(self.audio_paths))
+        self.assertIsNotNone(pool)
+        try:
+            submitted = [submit_transcription(pool, path, self.test_folder, self.test_config) for path in self.audio_paths]
+            transcripts = [collect_transcription(result) for result in submitted]
+        finally:
+            stop_transcription_pool(pool)
+        mock_load_model.assert_called_once_with(self.test_config, on_this_thread=True)
+        mock_load_model.return_value.share_memory.assert_called_once()
+        self.assertEqual(transcripts, [os.path.splitext(path)[0] + "_transcript.md" for path in self.audio_paths])
+        for transcript in transcripts:
+            with open(transcript) as f:
+                self.assertNotEqual(f.read(), f"transcribed by {os.getpid()}")
+
+    @patch('Scripts.worker_pool.multiprocessing.get_context')
+    @patch('Scripts.worker_pool.model_loaded_in_process', return_value=False)
+    @patch('Scripts.worker_pool.resolve_transcription_device')
+    @patch('Scripts.worker_pool.load_transcription_model')
+    def test_pool_spawns_workers_when_fork_is_unsafe(self, mock_load_model, mock_device, mock_model_loaded, mock_get_context):
+        # BDD:
+        #   Scenario: The model runs on CUDA, or a model was already loaded in this process
+        #     Given the worker pool is enabled for the whisper engine
+        #     When the start_transcription_pool function is called on a CUDA host, and on a CPU host after a model load
+        #     Then the workers should be spawned rather than forked
+        #     And each should load the model itself instead of the parent loading it
+        # Pass Criteria:
+        #   A spawn context is used both times, the config is passed to the workers and the parent loads nothing.
+        self.test_config['transcription_engine'] = 'whisper'
+        mock_device.return_value = "cuda"
+        start_transcription_pool(self.test_config, 4)
+        mock_device.return_value = "cpu"
+        mock_model_loaded.return_value = True
+        start_transcription_pool(self.test_config, 4)
+        self.assertEqual([call.args for call in mock_get_context.call_args_list], [("spawn",), ("spawn",)])
+        self.assertIs(mock_get_context.return_value.Pool.call_args.kwargs['initargs'][2], self.test_config)
+        mock_load_model.assert_not_called()
+    @patch('Scripts.worker_pool.multiprocessing.get_context')
+    @patch('Scripts.worker_pool.model_loaded_in_process', return_value=False)
+    @patch('Scripts.worker_pool.resolve_transcription_device', return_value="cpu")
+    @patch('Scripts.worker_pool.load_transcription_model')
+    def test_faster_whisper_never_forks(self, mock_load_model, mock_device, mock_model_loaded, mock_get_context):
+        # BDD:
+        #   Scenario: Worker pool for the faster_whisper engine on the CPU
+        #     Given the worker pool is enabled and no model has been loaded yet
+        #     When the start_transcription_pool function is called
+        #     Then the workers should be spawned, since CTranslate2's thread pools don't survive a fork
+        #     And each worker's model should use only its share of the cores
+        # Pass Criteria:
+        #   A spawn context is used, the parent loads nothing, and an 'auto' cpu_threads is split between the workers.
+        with patch('Scripts.worker_pool.os.cpu_count', return_value=8):
+            start_transcription_pool(self.test_config, 4)
+        self.assertEqual([call.args for call in mock_get_context.call_args_list], [("spawn",)])
+        mock_load_model.assert_not_called()
+        threads = mock_get_context.return_value.Pool.call_args.kwargs['initargs'][1]
+        self.assertEqual(threads, 4)
+        self.assertEqual(split_threads(self.test_config, threads)['faster_whisper']['cpu_threads'], 4)
+        explicit = {**self.test_config, 'faster_whisper': {'cpu_threads': 2}}
+        self.assertIs(split_threads(explicit, threads), explicit)
+
+if __name__ == '__main__':
+    unittest.main()